@@ -1,5 +1,7 @@
+import asyncio
 import os
 import secrets
+from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,7 +10,9 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
 from src import exception, settings
 from src.api.routers import all_routers
+from src.graph import workflows
 from src.models.api.standard_output import StandardOutputModel
+from src.services.job.job_worker import JobWorker
 
 settings.setup(verbose=True)
 
@@ -54,8 +58,33 @@ async def verify_basic_auth(credentials: HTTPBasicCredentials = Depends(security
     return credentials.username
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WORKFLOW_PRELOAD:
+        # Compiled graphs and their models are shared by every request
+        await asyncio.to_thread(
+            workflows.preload_workflows,
+            workflows.DocsPreprocessingWorkflow,
+            workflows.TestCaseGenerationWorkflow,
+        )
+
+    job_worker = job_worker_task = None
+    if settings.JOB_WORKER_IN_PROCESS:
+        # Generation and execution jobs run on the event loop of the API
+        job_worker = JobWorker()
+        job_worker_task = asyncio.create_task(job_worker.run())
+
+    yield
+
+    if job_worker is not None:
+        # Its running jobs are queued again for the next worker
+        job_worker.stop()
+        await job_worker_task
+
+
 # 2. Khởi tạo App với Global Dependency
 app = FastAPI(
+    lifespan=lifespan,
     docs_url="/agent-service/agent/api/docs",
     redoc_url="/agent-service/agent/api/redoc",
     openapi_url="/agent-service/agent/api/openapi.json",
@@ -5,6 +5,7 @@ from sqlmodel import SQLModel
 
 # from src.cache.agent_state_cache_wrapper import agent_state_cache_wrapper
 from src.graph.workflows.simple_qa import SimpleQAWorkflow
+from src.graph.workflows.workflow_registry import get_workflow
 
 # from src.models.agent.agent_state_model import AgentStateModel
 from src.models import DocsPreProcessingStateModel
@@ -46,6 +47,6 @@ def ai_agent_v2_api(
     """
     # Load conversation from cache
 
-    workflow = SimpleQAWorkflow()
+    workflow = get_workflow(SimpleQAWorkflow)
 
     return workflow.invoke(request)
@@ -3,7 +3,12 @@ import logging
 from fastapi import APIRouter
 from fastapi.responses import RedirectResponse
 
-from src.settings import get_redis_client
+from src.base.service.base_agent_service import llm_limiter
+from src.cache.cache_metrics import cache_metrics, get_cache_memory_report
+from src.cache.local_cache import local_cache
+from src.common.api_key_pool import google_key_pool
+from src.common.pool_metrics import get_engine_pool_status, get_redis_pool_status
+from src.settings import get_db_engine, get_redis_client
 
 router = APIRouter(prefix="/common", tags=["Common"])
 
@@ -20,4 +25,50 @@ def clear_cache():
     """
     logging.info("Clearing Redis cache...")
     get_redis_client().flushdb()
+    if local_cache is not None:
+        # Only this process's tier, the others expire theirs by TTL
+        local_cache.clear()
     return {"status": "Cache cleared"}
+
+
+@router.get("/pool-metrics")
+def pool_metrics():
+    """
+    Connection pool usage of this process: open and checked-out connections,
+    new connections, checkout timeouts and how long checkouts waited, plus the
+    LLM requests in flight against LLM_MAX_IN_FLIGHT and, per Google API key,
+    the requests and tokens of the last minute, 429s and remaining cooldown.
+    """
+    return {
+        "database": get_engine_pool_status(get_db_engine()),
+        "redis": get_redis_pool_status(get_redis_client().connection_pool),
+        "llm": llm_limiter.snapshot(),
+        "google_api_keys": google_key_pool.snapshot(),
+    }
+
+
+@router.get("/cache-metrics")
+def get_cache_metrics():
+    """
+    Per cached function: hits (Redis and local tier), misses, calls coalesced
+    with a concurrent identical call (in process, or waiting on another
+    process's lock), serialized bytes stored, results too large to store,
+    entries of an unreadable format and the cost of building cache keys
+    (count, mean/max/total microseconds), plus the size, hits, misses and
+    evictions of this process's local tier. Semantic caches report per agent
+    class ("semantic.<class>") their hit rate, mean hit similarity and the
+    false-hit rate of the sampled hits that were verified.
+    """
+    return {
+        "functions": cache_metrics.snapshot(),
+        "local": local_cache.stats() if local_cache is not None else None,
+    }
+
+
+@router.get("/cache-memory")
+def get_cache_memory():
+    """
+    Redis memory used by cached function results, per namespace. Scans every
+    cache key, so it is meant for occasional inspection.
+    """
+    return get_cache_memory_report(get_redis_client())
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.exc import NoResultFound
@@ -5,7 +7,7 @@ from sqlalchemy.exc import NoResultFound
 from src import repositories
 from src.enums import enums
 from src.graph import nodes
-from src.graph.workflows.docs_preprocessing import DocsPreprocessingWorkflow
+from src.graph.workflows import DocsPreprocessingWorkflow, get_workflow
 from src.models import DocsPreProcessingStateModel
 
 router = APIRouter(prefix="/document", tags=["Document"])
@@ -16,12 +18,17 @@ class DocsPreProcessingResponseModel(BaseModel):
 
 
 @router.post("/docs-preprocessing")
-def docs_preprocessing(
+async def docs_preprocessing(
     item: DocsPreProcessingStateModel,
+    job_id: Optional[str] = None,
 ) -> DocsPreProcessingResponseModel:
-    workflow = DocsPreprocessingWorkflow()
+    """
+    Preprocess a document. Sending the request again with the same `job_id`
+    after an interruption resumes from the last completed step.
+    """
+    workflow = get_workflow(DocsPreprocessingWorkflow)
 
-    result = workflow.invoke(item)
+    result = await workflow.ainvoke(item, job_id=job_id)
     return DocsPreProcessingResponseModel(doc_id=result["extra_parameters"]["doc_id"])
 
 
@@ -1,28 +1,138 @@
 import uuid
+from typing import Optional
 
-from fastapi import APIRouter, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
 from src import repositories
-from src.models import StandardOutputModel
-from src.services.test_case.execute_test_case import execute_test_suite
+from src.enums.enums import ExecutionModeEnum, JobTypeEnum
+from src.models import LoadTestConfigModel, StandardOutputModel
+from src.services.job.job_queue import MAX_PRIORITY, MIN_PRIORITY, submit_job
+from src.services.test_case.execution_queue import get_shard_progress
+from src.services.test_case.report_delta import get_report_delta
 
 router = APIRouter(prefix="/execute-and-report", tags=["Execution and Reporting"])
 
 
 class ExecuteTestSuiteModel(BaseModel):
     test_suite_id: str
+    concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=512,
+        description="Maximum number of in-flight requests, defaults to EXECUTION_CONCURRENCY.",
+    )
+    mode: ExecutionModeEnum = Field(
+        default=ExecutionModeEnum.FUNCTIONAL,
+        description="'functional' runs each case once, 'load' replays them for a duration.",
+    )
+    seed: Optional[int] = Field(
+        default=None,
+        description="Seed of the random request body placeholders, defaults to EXECUTION_RANDOM_SEED.",
+    )
+    load_test: LoadTestConfigModel = Field(
+        default_factory=LoadTestConfigModel,
+        description="Load-test parameters, only used when mode is 'load'.",
+    )
+    priority: int = Field(
+        default=0,
+        ge=MIN_PRIORITY,
+        le=MAX_PRIORITY,
+        description="Jobs of a higher priority start first.",
+    )
 
 
 @router.post("/execute")
-async def execute_test_suite_api(
-    items: ExecuteTestSuiteModel, background_tasks: BackgroundTasks
+def execute_test_suite_api(items: ExecuteTestSuiteModel) -> StandardOutputModel:
+
+    test_suite_report_id = str(uuid.uuid4())
+    # Run by a job worker, which executes the suite itself or through the
+    # execution queue depending on EXECUTION_BACKEND
+    if items.mode == ExecutionModeEnum.LOAD:
+        job = submit_job(
+            job_type=JobTypeEnum.LOAD_TEST.value,
+            payload={
+                "test_suite_report_id": test_suite_report_id,
+                "test_suite_id": items.test_suite_id,
+                "config": items.load_test.model_dump(mode="json"),
+                "seed": items.seed,
+            },
+            priority=items.priority,
+            result={"test_suite_report_id": test_suite_report_id},
+        )
+    else:
+        job = submit_job(
+            job_type=JobTypeEnum.TEST_EXECUTION.value,
+            payload={
+                "test_suite_report_id": test_suite_report_id,
+                "test_suite_id": items.test_suite_id,
+                "concurrency": items.concurrency,
+                "seed": items.seed,
+            },
+            priority=items.priority,
+            result={"test_suite_report_id": test_suite_report_id},
+        )
+    response = StandardOutputModel(
+        result={
+            "code": ["0000"],
+            "description": "Work in progress!",
+        },
+        data={
+            "test_suite_report_id": test_suite_report_id,
+            "job_id": job.job_id,
+        },
+    )
+    return response
+
+
+class RerunTestSuiteReportModel(BaseModel):
+    test_suite_report_id: str = Field(
+        description="Report whose failed and errored test cases are executed again.",
+    )
+    concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=512,
+        description="Maximum number of in-flight requests, defaults to EXECUTION_CONCURRENCY.",
+    )
+    priority: int = Field(
+        default=0,
+        ge=MIN_PRIORITY,
+        le=MAX_PRIORITY,
+        description="Jobs of a higher priority start first.",
+    )
+
+
+@router.post("/rerun")
+def rerun_test_suite_report_api(
+    items: RerunTestSuiteReportModel,
 ) -> StandardOutputModel:
+    """
+    Execute only the unsuccessful test cases of a report into a new report
+    linked to it through `parent_report_id`.
+    """
+    parent_report = repositories.TestSuiteReportRepository.get_by_id(
+        test_suite_report_id=items.test_suite_report_id
+    )
+    if parent_report is None:
+        raise HTTPException(status_code=404, detail="Test suite report not found")
+    if parent_report.mode != ExecutionModeEnum.FUNCTIONAL:
+        raise HTTPException(
+            status_code=400, detail="Only functional reports can be re-run"
+        )
 
     test_suite_report_id = str(uuid.uuid4())
-    background_tasks.add_task(
-        execute_test_suite,
-        test_suite_report_id=test_suite_report_id,
-        test_suite_id=items.test_suite_id,
+    job = submit_job(
+        job_type=JobTypeEnum.TEST_EXECUTION.value,
+        payload={
+            "test_suite_report_id": test_suite_report_id,
+            "test_suite_id": parent_report.test_suite_id,
+            "concurrency": items.concurrency,
+            "parent_report_id": parent_report.id,
+            # Same generated request bodies as the run it is compared to
+            "seed": parent_report.seed,
+        },
+        priority=items.priority,
+        result={"test_suite_report_id": test_suite_report_id},
     )
     response = StandardOutputModel(
         result={
@@ -31,6 +141,8 @@ async def execute_test_suite_api(
         },
         data={
             "test_suite_report_id": test_suite_report_id,
+            "parent_report_id": parent_report.id,
+            "job_id": job.job_id,
         },
     )
     return response
@@ -54,3 +166,72 @@ def get_test_suite_report(test_suite_report_id: str) -> StandardOutputModel:
         data=data,
     )
     return response
+
+
+@router.get("/report/{test_suite_report_id}/summary")
+def get_test_suite_report_summary(test_suite_report_id: str) -> StandardOutputModel:
+    """Status and running pass/fail/error counters of a (possibly running) report."""
+    test_suite_report = repositories.TestSuiteReportRepository.get_by_id(
+        test_suite_report_id=test_suite_report_id
+    )
+    if test_suite_report is None:
+        raise HTTPException(status_code=404, detail="Test suite report not found")
+
+    response = StandardOutputModel(
+        result={
+            "code": ["0000"],
+            "description": "Report summary fetched successfully.",
+        },
+        data=test_suite_report.model_dump(),
+    )
+    return response
+
+
+@router.get("/report/{test_suite_report_id}/delta")
+def get_test_suite_report_delta(test_suite_report_id: str) -> StandardOutputModel:
+    """Which test cases a re-run fixed, which still fail and which regressed."""
+    test_suite_report = repositories.TestSuiteReportRepository.get_by_id(
+        test_suite_report_id=test_suite_report_id
+    )
+    if test_suite_report is None:
+        raise HTTPException(status_code=404, detail="Test suite report not found")
+    if test_suite_report.parent_report_id is None:
+        raise HTTPException(status_code=400, detail="Test suite report is not a re-run")
+
+    response = StandardOutputModel(
+        result={
+            "code": ["0000"],
+            "description": "Report delta fetched successfully.",
+        },
+        data=get_report_delta(test_suite_report),
+    )
+    return response
+
+
+@router.get("/report/{test_suite_report_id}/shards")
+def get_test_suite_report_shards(test_suite_report_id: str) -> StandardOutputModel:
+    """Per-shard progress of a report executed by the queue workers."""
+    response = StandardOutputModel(
+        result={
+            "code": ["0000"],
+            "description": "Shard progress fetched successfully.",
+        },
+        data=get_shard_progress(test_suite_report_id=test_suite_report_id),
+    )
+    return response
+
+
+@router.get("/load-test-report/{test_suite_report_id}")
+def get_load_test_report(test_suite_report_id: str) -> StandardOutputModel:
+    """Per-endpoint latency percentiles, error rate and throughput of a load test."""
+    data = repositories.LoadTestReportRepository.get_all_by_test_suite_report_id(
+        test_suite_report_id=test_suite_report_id
+    )
+    response = StandardOutputModel(
+        result={
+            "code": ["0000"],
+            "description": "Load test report fetched successfully.",
+        },
+        data=[report.model_dump() for report in data],
+    )
+    return response
@@ -0,0 +1,63 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src import repositories
+from src.enums.enums import JobTypeEnum
+from src.models import StandardOutputModel
+from src.repositories.job.job_repository import FINAL_STATUSES
+from src.services.job.job_queue import request_cancel
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str) -> StandardOutputModel:
+    """Status, progress, per-node timings and results pointer of a job."""
+    job = repositories.JobRepository.get_by_id(job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StandardOutputModel(
+        result={"code": ["0000"], "description": "Success"},
+        data={"job": job},
+    )
+
+
+@router.get("")
+def get_jobs(
+    job_type: Optional[JobTypeEnum] = None,
+    status: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+) -> StandardOutputModel:
+    """Latest jobs first."""
+    jobs = repositories.JobRepository.get_all(
+        job_type=job_type.value if job_type else None,
+        status=status,
+        limit=limit,
+    )
+
+    return StandardOutputModel(
+        result={"code": ["0000"], "description": "Success"},
+        data={"jobs": jobs},
+    )
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str) -> StandardOutputModel:
+    """
+    Cancel a job. A queued job is cancelled right away, a running one once
+    its worker sees the request: poll the job until its status is final.
+    """
+    job = repositories.JobRepository.get_by_id(job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in FINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is already {job.status}")
+
+    job = request_cancel(job_id=job_id)
+
+    return StandardOutputModel(
+        result={"code": ["0000"], "description": "Cancellation requested"},
+        data={"job": job},
+    )
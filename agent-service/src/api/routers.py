@@ -3,6 +3,7 @@ from .common.common_api import router as common_router
 from .document.document_api import router as document_router
 from .execute_and_report.execute_and_report import router as execute_and_report_router
 from .file.file import router as router_file
+from .job.job_api import router as job_router
 from .project.project import router as project_router
 from .test_entities.test_entities_api import (
     router as test_entities_router,
@@ -16,4 +17,5 @@ all_routers = [
     project_router,
     test_entities_router,
     execute_and_report_router,
+    job_router,
 ]
@@ -1,29 +1,93 @@
-from fastapi import APIRouter, BackgroundTasks
-from pydantic import BaseModel
+from graphlib import CycleError, TopologicalSorter
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
 
 from src import models, repositories
-from src.graph.workflows import TestCaseGenerationWorkflow
+from src.enums.enums import JobTypeEnum
+from src.services.job.job_queue import MAX_PRIORITY, MIN_PRIORITY, submit_job
+from src.services.test_case.dependency_graph import build_dependency_graph
 
 router = APIRouter(prefix="/test-entities", tags=["Test Entities"])
 
 
+def submit_test_generation(
+    item: models.TestcasesGenStateModel, priority: int
+) -> repositories.JobRepository:
+    # Run by a job worker, checkpointed under the run
+    return submit_job(
+        job_type=JobTypeEnum.TEST_GENERATION.value,
+        payload=item.model_dump(mode="json"),
+        priority=priority,
+        result={"run_id": item.run_id},
+    )
+
+
 @router.post("/generate")
 def docs_preprocessing(
-    item: models.TestcasesGenStateModel, background_tasks: BackgroundTasks
+    item: models.TestcasesGenStateModel,
+    priority: int = Query(default=0, ge=MIN_PRIORITY, le=MAX_PRIORITY),
 ) -> models.StandardOutputModel:
-    workflow = TestCaseGenerationWorkflow()
-
-    background_tasks.add_task(
-        workflow.invoke,
-        input_data=item,
-    )
+    run = repositories.TestGenerationRunRepository(
+        project_id=item.project_id,
+        lang=item.lang.value,
+    ).create()
+    item.run_id = run.run_id
+    job = submit_test_generation(item, priority)
 
     return {
         "result": {"code": ["0000"], "description": "Work in progress!"},
-        "data": {},
+        "data": {"run_id": run.run_id, "job_id": job.job_id},
     }
 
 
+@router.get("/generation-runs/{run_id}")
+def get_generation_run(run_id: str) -> models.StandardOutputModel:
+    """Status of a generation run and of each of its FR groups."""
+    run = repositories.TestGenerationRunRepository.get_by_id(run_id=run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Generation run not found")
+
+    return models.StandardOutputModel(
+        result={"code": ["0000"], "description": "Success"},
+        data={"generation_run": run},
+    )
+
+
+@router.post("/generation-runs/{run_id}/resume")
+def resume_generation_run(
+    run_id: str,
+    force: bool = False,
+    priority: int = Query(default=0, ge=MIN_PRIORITY, le=MAX_PRIORITY),
+) -> models.StandardOutputModel:
+    """
+    Generate the test cases of the FR groups the run did not complete, the
+    completed ones keep their test suites. `force` resumes a run still marked
+    running, e.g. after the process running it stopped.
+    """
+    run = repositories.TestGenerationRunRepository.get_by_id(run_id=run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Generation run not found")
+    if run.status == "running" and not force:
+        raise HTTPException(status_code=409, detail="Generation run is still running")
+
+    item = models.TestcasesGenStateModel(
+        project_id=run.project_id,
+        lang=run.lang,
+        run_id=run.run_id,
+    )
+    job = submit_test_generation(item, priority)
+
+    return models.StandardOutputModel(
+        result={"code": ["0000"], "description": "Work in progress!"},
+        data={
+            "run_id": run.run_id,
+            "job_id": job.job_id,
+            "completed_fr_info_ids": sorted(run.get_completed_fr_info_ids()),
+        },
+    )
+
+
 @router.get("/test-suites/{project_id}")
 def get_test_suites_by_project_id(
     project_id: str,
@@ -70,3 +134,56 @@ def select_test_cases_for_execution(
         result={"code": ["0000"], "description": "Success"},
         data={"test_cases": test_cases},
     )
+
+
+class SetTestCaseDependenciesModel(BaseModel):
+    test_case_id: str
+    depends_on: list[str] = Field(
+        default_factory=list,
+        description="IDs of test cases of the same suite that have to pass first.",
+    )
+    extract: dict[str, str] = Field(
+        default_factory=dict,
+        description="Variables to read from the response, name -> path or header:<name>.",
+    )
+
+
+@router.post("/test-cases/dependencies")
+def set_test_case_dependencies(
+    item: SetTestCaseDependenciesModel,
+) -> models.StandardOutputModel:
+    test_cases = repositories.TestCaseRepository.get_all_by_ids([item.test_case_id])
+    if not test_cases:
+        raise HTTPException(status_code=404, detail="Test case not found")
+
+    suite_test_cases = repositories.TestCaseRepository.get_all_by_test_suite_id(
+        test_suite_id=test_cases[0].test_suite_id,
+    )
+    suite_test_case_ids = {test_case.id for test_case in suite_test_cases}
+    unknown = [id for id in item.depends_on if id not in suite_test_case_ids]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown test cases in depends_on: {', '.join(unknown)}",
+        )
+
+    for test_case in suite_test_cases:
+        if test_case.id == item.test_case_id:
+            test_case.depends_on = item.depends_on
+    try:
+        TopologicalSorter(build_dependency_graph(suite_test_cases)).prepare()
+    except CycleError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Dependency cycle: {' -> '.join(e.args[1])}"
+        )
+
+    test_case = repositories.TestCaseRepository.set_dependencies(
+        test_case_id=item.test_case_id,
+        depends_on=item.depends_on,
+        extract=item.extract,
+    )
+
+    return models.StandardOutputModel(
+        result={"code": ["0000"], "description": "Success"},
+        data={"test_case": test_case},
+    )
@@ -1,20 +1,57 @@
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional, Union
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Union
 
 from langchain.chat_models import init_chat_model
 
 # from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAI
 from langchain_ollama import OllamaLLM
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field, model_validator, validate_call
 
 from src.cache import cache_func_wrapper
-from src.common.common import split_by_size
+from src.cache.semantic_cache import (
+    find_similar_response,
+    get_semantic_scope,
+    record_verification,
+    store_response,
+)
+from src.common.api_key_pool import (
+    acall_with_key,
+    call_with_key,
+    estimate_tokens,
+    google_key_pool,
+)
+from src.common.in_flight_limiter import InFlightLimiter
 from src.enums.enums import LanguageEnum, ModelTypeEnum
-from src.settings import ENVIRONMENT, OLLAMA_BASE_URL, VLLM_API_KEY, VLLM_BASE_URL
+from src.settings import (
+    ENVIRONMENT,
+    LLM_MAX_IN_FLIGHT,
+    OLLAMA_BASE_URL,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_VERIFY_RATE,
+    VLLM_API_KEY,
+    VLLM_BASE_URL,
+)
+
+# Shared by every agent service of the process
+llm_limiter = InFlightLimiter(LLM_MAX_IN_FLIGHT)
+
+
+def _estimate_prompt_tokens(messages: List[AnyMessage]) -> int:
+    return sum(estimate_tokens(message.text) for message in messages)
+
+
+def _count_response_tokens(response: AIMessage) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    return usage["total_tokens"] if usage else None
 
 
 class BaseAgentService(BaseModel):
@@ -55,10 +92,24 @@ class BaseAgentService(BaseModel):
 
     model_type: str = ModelTypeEnum.embedding.value
 
+    semantic_cache: bool = Field(
+        default=False,
+        description="Reuse the response of a near-duplicate prompt with the same settings, system prompt and chat history.",
+    )
+    semantic_cache_threshold: float = Field(
+        default=SEMANTIC_CACHE_THRESHOLD,
+        ge=0.0,
+        le=1.0,
+        description="Cosine similarity from which a prompt reuses a cached response.",
+    )
+
     # Private attributes with type hints
     _agent: Union[ChatGoogleGenerativeAI, GoogleGenerativeAI, OllamaLLM]
+    # Gemini/Gemma models, one per key of the Google API key pool
+    _agents: dict[str, ChatGoogleGenerativeAI]
     _system_prompts: dict[LanguageEnum, SystemMessage]
-    _language: LanguageEnum = LanguageEnum.EN
+    # Set per request (task or thread), instances are shared by concurrent runs
+    _language: ContextVar[LanguageEnum]
 
     @model_validator(mode="after")
     def __after_init(self):
@@ -70,6 +121,10 @@ class BaseAgentService(BaseModel):
         }
 
         llm: Union[ChatGoogleGenerativeAI, GoogleGenerativeAI, OllamaLLM]
+        self._agents = {}
+        self._language = ContextVar(
+            f"{type(self).__qualname__}.language", default=LanguageEnum.EN
+        )
 
         model_type = self.llm_model.split("-")[0]
 
@@ -86,7 +141,16 @@ class BaseAgentService(BaseModel):
             _model_params["thinking_budget"] = self.llm_thinking_budget
             _model_params["model"] = "google_genai:" + self.llm_model
 
-            llm = init_chat_model(**_model_params)
+            if len(google_key_pool) > 1:
+                # A 429 moves on to another key instead of backing off on this one
+                _model_params["max_retries"] = 1
+            for key in google_key_pool.keys:
+                self._agents[key] = init_chat_model(**_model_params, google_api_key=key)
+
+            if self._agents:
+                llm = next(iter(self._agents.values()))
+            else:
+                llm = init_chat_model(**_model_params)
         elif model_type == "vllm":
             _model_params = model_params.copy()
 
@@ -105,6 +169,9 @@ class BaseAgentService(BaseModel):
 
         if self.tools:
             self._agent = llm.bind_tools(self.tools)
+            self._agents = {
+                key: agent.bind_tools(self.tools) for key, agent in self._agents.items()
+            }
         else:
             self._agent = llm
 
@@ -136,62 +203,264 @@ class BaseAgentService(BaseModel):
         if lang not in self._system_prompts:
             raise ValueError(f"System prompt for language {lang} not loaded.")
 
-        self._language = lang
+        self._language.set(lang)
+
+    def get_system_lang(self) -> LanguageEnum:
+        return self._language.get()
 
     def _get_messages(
         self, human: str, chat_history: List[AnyMessage] = []
     ) -> List[AnyMessage]:
-        messages = [self._system_prompts[self._language]]
+        messages = [self._system_prompts[self.get_system_lang()]]
         messages.extend(chat_history)
         messages.append(HumanMessage(human))
 
         return messages
 
+    def _invoke(self, agent, messages: List[AnyMessage]) -> AIMessage:
+        # Process-wide cap on LLM requests in flight
+        with llm_limiter:
+            return agent.invoke(messages)
+
     @cache_func_wrapper
     def _run(self, messages: List[AnyMessage]) -> AIMessage:
-        agent = self._get_agent()
+        if not self._agents:
+            return self._invoke(self._get_agent(), messages)
 
-        response = agent.invoke(messages)
-        return response
+        # Spread over the Google API keys, a rate limited key hands over to the next
+        return call_with_key(
+            google_key_pool,
+            lambda key: self._invoke(self._agents[key], messages),
+            tokens=_estimate_prompt_tokens(messages),
+            count_tokens=_count_response_tokens,
+        )
 
     @validate_call
     def run(
-        self, human: str, chat_history: List[AnyMessage] = [], no_cache: bool = False
+        self,
+        human: str,
+        chat_history: List[AnyMessage] = [],
+        no_cache: bool = False,
+        semantic_key: Optional[str] = None,
     ) -> AIMessage:
         messages = self._get_messages(human, chat_history)
-        response = self._run(messages, no_cache=no_cache)
+        response = self._respond(messages, no_cache, semantic_key)
+
+        return response
+
+    def _respond(
+        self,
+        messages: List[AnyMessage],
+        no_cache: bool,
+        semantic_key: Optional[str] = None,
+    ) -> AIMessage:
+        if self.semantic_cache and SEMANTIC_CACHE_ENABLED and not no_cache:
+            return self._run_semantic(messages, semantic_key)
+        return self._run(messages, no_cache=no_cache)
 
+    def _run_semantic(
+        self, messages: List[AnyMessage], semantic_key: Optional[str] = None
+    ) -> AIMessage:
+        """
+        `_run` behind the semantic cache, keyed by the final human message.
+        Only prompts with the same `semantic_key` can share a response.
+        A sample of hits is answered by the LLM anyway to count false hits.
+        """
+        scope = get_semantic_scope(self, messages[:-1], semantic_key)
+        prompt = messages[-1].content
+
+        try:
+            hit = find_similar_response(scope, prompt, self.semantic_cache_threshold)
+        except Exception as e:
+            logging.warning(f"Semantic cache lookup failed: {e}")
+            return self._run(messages)
+
+        if hit is not None:
+            cached_response, similarity = hit
+            if random.random() >= SEMANTIC_CACHE_VERIFY_RATE:
+                logging.info(f"Semantic cache hit ({similarity:.4f}) for {scope}")
+                return cached_response
+            response = self._run(messages)
+            record_verification(scope, cached_response, response)
+            return response
+
+        response = self._run(messages)
+        try:
+            store_response(scope, prompt, response)
+        except Exception as e:
+            logging.warning(f"Semantic cache store failed: {e}")
         return response
 
+    async def _ainvoke(self, agent, messages: List[AnyMessage]) -> AIMessage:
+        async with llm_limiter:
+            return await agent.ainvoke(messages)
+
+    @cache_func_wrapper(shares_with=_run)
+    async def _arun(self, messages: List[AnyMessage]) -> AIMessage:
+        if not self._agents:
+            return await self._ainvoke(self._get_agent(), messages)
+
+        return await acall_with_key(
+            google_key_pool,
+            lambda key: self._ainvoke(self._agents[key], messages),
+            tokens=_estimate_prompt_tokens(messages),
+            count_tokens=_count_response_tokens,
+        )
+
     @validate_call
-    def runs(
+    async def arun(
         self,
-        humans: List[str],
-        chat_histories: List[List[AnyMessage]] = [],
-        batch_size: int = -1,
-    ):
-        if len(chat_histories) != len(humans):
-            raise ValueError("Length of chat_histories must match length of humans.")
+        human: str,
+        chat_history: List[AnyMessage] = [],
+        no_cache: bool = False,
+        semantic_key: Optional[str] = None,
+    ) -> AIMessage:
+        """Async `run`: the LLM call does not hold a thread while it waits."""
+        messages = self._get_messages(human, chat_history)
+        response = await self._arespond(messages, no_cache, semantic_key)
+
+        return response
 
+    async def _arespond(
+        self,
+        messages: List[AnyMessage],
+        no_cache: bool,
+        semantic_key: Optional[str] = None,
+    ) -> AIMessage:
+        if self.semantic_cache and SEMANTIC_CACHE_ENABLED and not no_cache:
+            return await self._arun_semantic(messages, semantic_key)
+        return await self._arun(messages, no_cache=no_cache)
+
+    async def _arun_semantic(
+        self, messages: List[AnyMessage], semantic_key: Optional[str] = None
+    ) -> AIMessage:
+        """Async `_run_semantic`, its database and embedding calls run in threads."""
+        scope = get_semantic_scope(self, messages[:-1], semantic_key)
+        prompt = messages[-1].content
+
+        try:
+            hit = await asyncio.to_thread(
+                find_similar_response, scope, prompt, self.semantic_cache_threshold
+            )
+        except Exception as e:
+            logging.warning(f"Semantic cache lookup failed: {e}")
+            return await self._arun(messages)
+
+        if hit is not None:
+            cached_response, similarity = hit
+            if random.random() >= SEMANTIC_CACHE_VERIFY_RATE:
+                logging.info(f"Semantic cache hit ({similarity:.4f}) for {scope}")
+                return cached_response
+            response = await self._arun(messages)
+            record_verification(scope, cached_response, response)
+            return response
+
+        response = await self._arun(messages)
+        try:
+            await asyncio.to_thread(store_response, scope, prompt, response)
+        except Exception as e:
+            logging.warning(f"Semantic cache store failed: {e}")
+        return response
+
+    def run_until_valid(
+        self, human: str, parse: Callable[[str], Any], max_retries: int = 3
+    ) -> tuple[str, Any]:
+        """
+        `run` until `parse` accepts the response content, retrying without the
+        cache up to `max_retries` times. Returns the content and parsed value.
+        """
+        no_cache = False
+        for retry_count in range(max_retries + 1):
+            content = self.run(human=human, no_cache=no_cache).content
+            logging.debug(f"{type(self).__name__} response: \n{content}")
+            try:
+                return content, parse(content)
+            except Exception as e:
+                if retry_count == max_retries:
+                    raise e
+                no_cache = True
+                logging.warning(
+                    f"{type(self).__name__} response error: {e}. Retrying..."
+                )
+
+    async def arun_until_valid(
+        self, human: str, parse: Callable[[str], Any], max_retries: int = 3
+    ) -> tuple[str, Any]:
+        """Async `run_until_valid`."""
+        no_cache = False
+        for retry_count in range(max_retries + 1):
+            content = (await self.arun(human=human, no_cache=no_cache)).content
+            logging.debug(f"{type(self).__name__} response: \n{content}")
+            try:
+                return content, parse(content)
+            except Exception as e:
+                if retry_count == max_retries:
+                    raise e
+                no_cache = True
+                logging.warning(
+                    f"{type(self).__name__} response error: {e}. Retrying..."
+                )
+
+    def _get_messages_list(
+        self, humans: List[str], chat_histories: List[List[AnyMessage]]
+    ) -> List[List[AnyMessage]]:
         if len(chat_histories) == 0:
             chat_histories = [[] for _ in humans]
 
-        messages_list = []
-        for human, chat_history in zip(humans, chat_histories):
-            messages = self._get_messages(human, chat_history)
-            messages_list.append(messages)
+        if len(chat_histories) != len(humans):
+            raise ValueError("Length of chat_histories must match length of humans.")
 
-        # Handle batch_size = -1 as "all in one batch"
-        if batch_size == -1:
-            batches = [messages_list]
-        else:
-            batches = split_by_size(messages_list, batch_size)
+        return [
+            self._get_messages(human, chat_history)
+            for human, chat_history in zip(humans, chat_histories)
+        ]
 
-        responses = []
-        for batch in batches:
-            agent = self._get_agent()
-            _responses = agent.batch_as_completed(batch)
-            responses.extend(_responses)
+    def runs_as_completed(
+        self,
+        humans: List[str],
+        chat_histories: List[List[AnyMessage]] = [],
+        batch_size: int = -1,
+        no_cache: bool = False,
+    ) -> Iterator[tuple[int, AIMessage]]:
+        """
+        Yield `(index, response)` for every human message as soon as it is
+        answered. Each one goes through the cache on its own; at most
+        `batch_size` (-1: all) are in flight, within the process-wide cap.
+        """
+        messages_list = self._get_messages_list(humans, chat_histories)
+        if not messages_list:
+            return
+
+        # More threads than LLM slots would only wait
+        max_workers = min(len(messages_list), LLM_MAX_IN_FLIGHT)
+        if batch_size > 0:
+            max_workers = min(max_workers, batch_size)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                executor.submit(self._respond, messages, no_cache): index
+                for index, messages in enumerate(messages_list)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @validate_call
+    def runs(
+        self,
+        humans: List[str],
+        chat_histories: List[List[AnyMessage]] = [],
+        batch_size: int = -1,
+        no_cache: bool = False,
+    ) -> List[AIMessage]:
+        """Responses to `humans`, in their order. See `runs_as_completed`."""
+        responses = [None] * len(humans)
+        for index, response in self.runs_as_completed(
+            humans, chat_histories, batch_size=batch_size, no_cache=no_cache
+        ):
+            responses[index] = response
 
         return responses
 
@@ -202,19 +471,65 @@ class BaseAgentService(BaseModel):
         chat_histories: List[List[AnyMessage]] = [],
         batch_size: int = -1,
         max_workers: int = 3,
-    ):
-        if len(chat_histories) != len(humans):
-            raise ValueError("Length of chat_histories must match length of humans.")
+    ) -> List[AIMessage]:
+        """`runs` with `max_workers` batches of `batch_size` in flight."""
+        if batch_size > 0:
+            batch_size *= max_workers
 
-        if len(chat_histories) == 0:
-            chat_histories = [[] for _ in humans]
+        return self.runs(humans, chat_histories, batch_size=batch_size)
 
-        batches = split_by_size(zip(humans, chat_histories), batch_size)
+    async def aruns_as_completed(
+        self,
+        humans: List[str],
+        chat_histories: List[List[AnyMessage]] = [],
+        batch_size: int = -1,
+        no_cache: bool = False,
+    ) -> AsyncIterator[tuple[int, AIMessage]]:
+        """Async `runs_as_completed`, without a thread per request."""
+        messages_list = self._get_messages_list(humans, chat_histories)
+        batch_slots = asyncio.Semaphore(
+            batch_size if batch_size > 0 else max(len(messages_list), 1)
+        )
+
+        async def _respond(index: int, messages: List[AnyMessage]):
+            async with batch_slots:
+                return index, await self._arespond(messages, no_cache)
+
+        tasks = [
+            asyncio.ensure_future(_respond(index, messages))
+            for index, messages in enumerate(messages_list)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
 
-        responses = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results_iterator = executor.map(self.runs, batches)
-            for result in results_iterator:
-                responses.extend(result)
+    @validate_call
+    async def aruns(
+        self,
+        humans: List[str],
+        chat_histories: List[List[AnyMessage]] = [],
+        batch_size: int = -1,
+        no_cache: bool = False,
+    ) -> List[AIMessage]:
+        """Async `runs`, responses are in the order of `humans`."""
+        responses = [None] * len(humans)
+        async for index, response in self.aruns_as_completed(
+            humans, chat_histories, batch_size=batch_size, no_cache=no_cache
+        ):
+            responses[index] = response
 
         return responses
+
+    async def acall(self, state):
+        """
+        Async counterpart of `__call__`, used when the graph runs with
+        `ainvoke`. Nodes without their own run `__call__` in a thread.
+        """
+        return await asyncio.to_thread(self, state)
+
+    def as_node(self) -> RunnableLambda:
+        """Graph node running `__call__` under `invoke` and `acall` under `ainvoke`."""
+        return RunnableLambda(self.__call__, afunc=self.acall, name=type(self).__name__)
@@ -1,8 +1,17 @@
+from functools import lru_cache
 from typing import Optional
 
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from pydantic import Field, model_validator
 
+from src.common.api_key_pool import call_with_key, estimate_tokens, google_key_pool
+
+
+@lru_cache(maxsize=None)
+def _get_key_embeddings(model: str, key: str) -> GoogleGenerativeAIEmbeddings:
+    # One client per model and key, shared by every embedding service
+    return GoogleGenerativeAIEmbeddings(model=model, google_api_key=key)
+
 
 class BaseEmbeddingService(GoogleGenerativeAIEmbeddings):
     model: str = Field(default="gemini-embedding-001", min_length=5, max_length=100)
@@ -18,13 +27,32 @@ class BaseEmbeddingService(GoogleGenerativeAIEmbeddings):
         return self
 
     def embed_query(self, text: str) -> list[float]:
-        embedding = super().embed_query(text, output_dimensionality=self.embedding_dim)
+        if not len(google_key_pool):
+            return super().embed_query(text, output_dimensionality=self.embedding_dim)
+
+        # Spread over the Google API keys, a rate limited key hands over to the next
+        embedding = call_with_key(
+            google_key_pool,
+            lambda key: _get_key_embeddings(self.model, key).embed_query(
+                text, output_dimensionality=self.embedding_dim
+            ),
+            tokens=estimate_tokens(text),
+        )
 
         return embedding
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        embeddings = super().embed_documents(
-            texts, output_dimensionality=self.embedding_dim
+        if not len(google_key_pool):
+            return super().embed_documents(
+                texts, output_dimensionality=self.embedding_dim
+            )
+
+        embeddings = call_with_key(
+            google_key_pool,
+            lambda key: _get_key_embeddings(self.model, key).embed_documents(
+                texts, output_dimensionality=self.embedding_dim
+            ),
+            tokens=sum(estimate_tokens(text) for text in texts),
         )
 
         return embeddings
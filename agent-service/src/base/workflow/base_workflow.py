@@ -0,0 +1,163 @@
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import StateGraph
+from pydantic import BaseModel, Field
+
+from src.base.workflow.redis_checkpoint_saver import RedisCheckpointSaver
+from src.settings import WORKFLOW_CHECKPOINT_ENABLED, logger
+
+
+class BaseWorkflow(BaseModel):
+    """
+    Graph over `agent_state` built by the `_add_nodes` and `_setup_edges` of
+    the subclasses.
+
+    Runs given a `job_id` are checkpointed in Redis after every node: running
+    the same job again after an interruption resumes from the last completed
+    node instead of starting over. The checkpoints of a job are deleted once
+    its run completes.
+    """
+
+    agent_state: BaseModel = Field(
+        description="State of the AI agent, including user input and intent",
+    )
+    # `extra_parameters` entries left out of checkpoints once the entry they
+    # were turned into exists
+    transient_parameters: dict[str, str] = Field(default_factory=dict)
+    # These fields will be set during initialization
+    workflow: Optional[StateGraph] = Field(default=None, exclude=True)
+    graph: Optional[object] = Field(default=None, exclude=True)
+    checkpointer: Optional[BaseCheckpointSaver] = Field(default=None, exclude=True)
+    checkpointed_graph: Optional[object] = Field(default=None, exclude=True)
+
+    class Config:
+        arbitrary_types_allowed = True
+        validate_assignment = True
+
+    def __init__(self, **data):
+        super().__init__(**data)
+        self._setup_workflow()
+
+    def _setup_workflow(self):
+        """Initialize and configure the workflow graph"""
+        self.workflow = StateGraph(self.agent_state)
+        self._add_nodes()
+        self._setup_edges()
+        self.graph = self.workflow.compile()
+
+        if WORKFLOW_CHECKPOINT_ENABLED:
+            self.checkpointer = RedisCheckpointSaver(
+                transient_parameters=self.transient_parameters
+            )
+            self.checkpointed_graph = self.workflow.compile(
+                checkpointer=self.checkpointer
+            )
+
+    def _add_nodes(self):
+        """Add all nodes to the workflow"""
+        raise NotImplementedError
+
+    def _setup_edges(self):
+        """Configure all edges and entry point"""
+        raise NotImplementedError
+
+    def get_graph(self):
+        """Get the compiled graph"""
+        return self.graph
+
+    def _get_config(self) -> dict:
+        """Config of every run of the graph"""
+        return {}
+
+    def _get_run(self, job_id: Optional[str]) -> tuple[Any, dict]:
+        if not self.graph:
+            raise ValueError(
+                "Graph not initialized. Please ensure workflow setup is complete."
+            )
+        if job_id is None or self.checkpointed_graph is None:
+            return self.graph, self._get_config()
+
+        config = {**self._get_config(), "configurable": {"thread_id": job_id}}
+        return self.checkpointed_graph, config
+
+    def _get_input(self, input_data, job_id: Optional[str], next_nodes: tuple):
+        # A job stopped before its end goes on from its checkpoint
+        if next_nodes:
+            logger.info(f"Resuming job {job_id} at {', '.join(next_nodes)}")
+            return None
+        return input_data
+
+    def invoke(self, input_data, job_id: Optional[str] = None):
+        """Execute the agent workflow, resuming the job `job_id` if interrupted"""
+        graph, config = self._get_run(job_id)
+        if graph is self.checkpointed_graph:
+            input_data = self._get_input(
+                input_data, job_id, graph.get_state(config).next
+            )
+
+        result = graph.invoke(input_data, config=config)
+
+        if graph is self.checkpointed_graph:
+            self.checkpointer.delete_thread(job_id)
+        return result
+
+    async def ainvoke(self, input_data, job_id: Optional[str] = None):
+        """Execute the agent workflow, LLM nodes run natively async"""
+        graph, config = self._get_run(job_id)
+        if graph is self.checkpointed_graph:
+            input_data = self._get_input(
+                input_data, job_id, (await graph.aget_state(config)).next
+            )
+
+        result = await graph.ainvoke(input_data, config=config)
+
+        if graph is self.checkpointed_graph:
+            await self.checkpointer.adelete_thread(job_id)
+        return result
+
+    def stream(self, input_data, job_id: Optional[str] = None, **kwargs) -> Iterator:
+        """Stream the agent workflow execution, `kwargs` go to the graph's `stream`"""
+        graph, config = self._get_run(job_id)
+        if graph is not self.checkpointed_graph:
+            return graph.stream(input_data, config=config, **kwargs)
+
+        input_data = self._get_input(input_data, job_id, graph.get_state(config).next)
+        return self._stream_job(graph, input_data, config, job_id, **kwargs)
+
+    def _stream_job(
+        self, graph, input_data, config: dict, job_id: str, **kwargs
+    ) -> Iterator:
+        yield from graph.stream(input_data, config=config, **kwargs)
+        self.checkpointer.delete_thread(job_id)
+
+    async def astream(
+        self, input_data, job_id: Optional[str] = None, **kwargs
+    ) -> AsyncIterator:
+        """Async `stream`, LLM nodes run natively async"""
+        graph, config = self._get_run(job_id)
+        if graph is self.checkpointed_graph:
+            input_data = self._get_input(
+                input_data, job_id, (await graph.aget_state(config)).next
+            )
+
+        async for chunk in graph.astream(input_data, config=config, **kwargs):
+            yield chunk
+
+        if graph is self.checkpointed_graph:
+            await self.checkpointer.adelete_thread(job_id)
+
+    def get_node_count(self) -> int:
+        """Number of nodes of the graph, the first step of a progress estimate"""
+        return len(self.workflow.nodes)
+
+    def reset_workflow(self):
+        """Reset and reinitialize the workflow"""
+        self._setup_workflow()
+
+    def update_config(self, **kwargs):
+        """Update configuration and reinitialize workflow"""
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+        self._setup_workflow()
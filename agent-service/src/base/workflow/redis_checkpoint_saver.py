@@ -0,0 +1,345 @@
+import asyncio
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from redis import Redis
+
+from src.cache.serialization import CacheFormatError, deserialize, serialize
+from src.settings import (
+    WORKFLOW_CHECKPOINT_KEEP_LAST,
+    WORKFLOW_CHECKPOINT_TTL,
+    get_redis_client,
+)
+
+
+class CacheSerializer:
+    """LangGraph serializer storing values in the function cache's format."""
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        return "cache", serialize(obj)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        return deserialize(data[1])
+
+
+def _get_index_key(thread_id: str, checkpoint_ns: str) -> str:
+    return f"checkpoints:{thread_id}:{checkpoint_ns}"
+
+
+def _get_checkpoint_key(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+    return f"checkpoint:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+
+def _get_writes_key(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+    return f"checkpoint_writes:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+
+def _get_namespaces_key(thread_id: str) -> str:
+    return f"checkpoint_namespaces:{thread_id}"
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer keeping the latest `keep_last` checkpoints of each
+    thread (job) in Redis for `ttl` seconds, enough to resume an interrupted
+    run from its last completed step.
+
+    Values are stored in the function cache's compressed format. Entries of
+    `extra_parameters` named in `transient_parameters` are left out once the
+    entry they were turned into exists, e.g. the extracted text once the
+    normalized text is there.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Redis] = None,
+        ttl: int = WORKFLOW_CHECKPOINT_TTL,
+        keep_last: int = WORKFLOW_CHECKPOINT_KEEP_LAST,
+        transient_parameters: Optional[dict[str, str]] = None,
+    ):
+        super().__init__(serde=CacheSerializer())
+        self._redis_client = redis_client
+        self.ttl = ttl
+        self.keep_last = max(keep_last, 1)
+        self.transient_parameters = transient_parameters or {}
+
+    @property
+    def redis_client(self) -> Redis:
+        # Shared client of the process unless one was given
+        return self._redis_client or get_redis_client()
+
+    def _compact(self, checkpoint: Checkpoint) -> Checkpoint:
+        channel_values = checkpoint["channel_values"]
+        extra_parameters = channel_values.get("extra_parameters")
+        if not isinstance(extra_parameters, dict):
+            return checkpoint
+
+        dropped = {
+            key
+            for key, replaced_by in self.transient_parameters.items()
+            if key in extra_parameters and replaced_by in extra_parameters
+        }
+        if not dropped:
+            return checkpoint
+
+        # Copied, the checkpoint's values are the running graph's state
+        return {
+            **checkpoint,
+            "channel_values": {
+                **channel_values,
+                "extra_parameters": {
+                    key: value
+                    for key, value in extra_parameters.items()
+                    if key not in dropped
+                },
+            },
+        }
+
+    def _load_tuple(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> Optional[CheckpointTuple]:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.hgetall(_get_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id))
+        pipeline.hvals(_get_writes_key(thread_id, checkpoint_ns, checkpoint_id))
+        saved, raw_writes = pipeline.execute()
+        if not saved:
+            return None
+
+        try:
+            checkpoint = deserialize(saved[b"checkpoint"])
+            metadata = deserialize(saved[b"metadata"])
+            writes = [deserialize(raw_write) for raw_write in raw_writes]
+        except CacheFormatError:
+            # Written by another version, the run starts over
+            return None
+
+        # Same order as the writes were made: by task, then index
+        writes.sort(key=lambda write: (write[3], write[0], write[4]))
+        parent_id = saved[b"parent_id"].decode()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=checkpoint,
+            metadata=metadata,
+            pending_writes=[
+                (task_id, channel, value) for task_id, channel, value, _, _ in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = self.redis_client.zrevrange(
+                _get_index_key(thread_id, checkpoint_ns), 0, 0
+            )
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode()
+
+        return self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # Checkpoints are only looked up by thread
+        if config is None:
+            return
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        before_id = get_checkpoint_id(before) if before else None
+
+        checkpoint_ids = self.redis_client.zrevrange(
+            _get_index_key(thread_id, checkpoint_ns), 0, -1
+        )
+        for checkpoint_id in checkpoint_ids:
+            checkpoint_id = checkpoint_id.decode()
+            if before_id and checkpoint_id >= before_id:
+                continue
+            checkpoint_tuple = self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+            if checkpoint_tuple is None:
+                continue
+            if filter and any(
+                checkpoint_tuple.metadata.get(key) != value
+                for key, value in filter.items()
+            ):
+                continue
+
+            yield checkpoint_tuple
+            if limit is not None:
+                limit -= 1
+                if limit <= 0:
+                    return
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = checkpoint["id"]
+        index_key = _get_index_key(thread_id, checkpoint_ns)
+        checkpoint_key = _get_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id)
+        namespaces_key = _get_namespaces_key(thread_id)
+
+        pipeline = self.redis_client.pipeline()
+        pipeline.hset(
+            checkpoint_key,
+            mapping={
+                "checkpoint": serialize(self._compact(checkpoint)),
+                "metadata": serialize(get_checkpoint_metadata(config, metadata)),
+                "parent_id": config["configurable"].get("checkpoint_id") or "",
+            },
+        )
+        # Checkpoint IDs sort in creation order
+        pipeline.zadd(index_key, {checkpoint_id: 0})
+        pipeline.sadd(namespaces_key, checkpoint_ns)
+        for key in (checkpoint_key, index_key, namespaces_key):
+            pipeline.expire(key, self.ttl)
+        pipeline.zrange(index_key, 0, -self.keep_last - 1)
+        stale_ids = pipeline.execute()[-1]
+
+        if stale_ids:
+            self._delete_checkpoints(
+                thread_id, checkpoint_ns, [stale_id.decode() for stale_id in stale_ids]
+            )
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        writes_key = _get_writes_key(thread_id, checkpoint_ns, checkpoint_id)
+
+        pipeline = self.redis_client.pipeline()
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            field = f"{task_id}:{write_idx}"
+            write = serialize((task_id, channel, value, task_path, write_idx))
+            # Regular writes are kept from the first attempt, special ones
+            # (errors, interrupts) are replaced
+            if write_idx >= 0:
+                pipeline.hsetnx(writes_key, field, write)
+            else:
+                pipeline.hset(writes_key, field, write)
+        pipeline.expire(writes_key, self.ttl)
+        pipeline.execute()
+
+    def _delete_checkpoints(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_ids: Sequence[str]
+    ):
+        pipeline = self.redis_client.pipeline()
+        for checkpoint_id in checkpoint_ids:
+            pipeline.delete(
+                _get_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id),
+                _get_writes_key(thread_id, checkpoint_ns, checkpoint_id),
+            )
+        pipeline.zrem(_get_index_key(thread_id, checkpoint_ns), *checkpoint_ids)
+        pipeline.execute()
+
+    def delete_thread(self, thread_id: str) -> None:
+        namespaces_key = _get_namespaces_key(thread_id)
+        for checkpoint_ns in self.redis_client.smembers(namespaces_key):
+            checkpoint_ns = checkpoint_ns.decode()
+            index_key = _get_index_key(thread_id, checkpoint_ns)
+            checkpoint_ids = self.redis_client.zrange(index_key, 0, -1)
+            if checkpoint_ids:
+                self._delete_checkpoints(
+                    thread_id,
+                    checkpoint_ns,
+                    [checkpoint_id.decode() for checkpoint_id in checkpoint_ids],
+                )
+            self.redis_client.delete(index_key)
+        self.redis_client.delete(namespaces_key)
+
+    # Async versions, Redis calls run in threads
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: [
+                *self.list(config, filter=filter, before=before, limit=limit),
+            ]
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
@@ -15,8 +15,9 @@ def agent_state_cache_wrapper(func):
     @wraps(func)
     @validate_call
     def wrapper(agent_state: AgentStateModel):
+        redis_client = get_redis_client()
         cache_key = f"conversation[{agent_state.user_id}:{agent_state.session_id}]"
-        cached_agent_state = get_redis_client().get(cache_key)
+        cached_agent_state = redis_client.get(cache_key)
 
         if cached_agent_state:  # Cache hit
             logging.info(f"Cache hit for {cache_key}")
@@ -41,7 +42,7 @@ def agent_state_cache_wrapper(func):
         result = func(cached_agent_state)
 
         logging.info(f"Cached {cache_key}")
-        get_redis_client().setex(cache_key, 600, result.model_dump_json())
+        redis_client.setex(cache_key, 600, result.model_dump_json())
         number_of_added_messages = len(result.messages) - len(
             cached_agent_state.messages
         )
@@ -1,65 +1,255 @@
-import hashlib
+import asyncio
 import inspect
 import logging
-import pickle
+import time
 from functools import wraps
+from typing import Any, Optional
 
-from src.settings import get_redis_client
+from src.cache.cache_key import (
+    get_function_namespace,
+    make_cache_key,
+    make_function_fingerprint,
+)
+from src.cache.cache_metrics import cache_metrics
+from src.cache.local_cache import local_cache
+from src.cache.serialization import CacheFormatError, deserialize, serialize
+from src.cache.single_flight import (
+    acquire_lock,
+    async_single_flight,
+    await_result,
+    release_lock,
+    single_flight,
+    wait_for_result,
+)
+from src.settings import (
+    CACHE_LOCK_POLL_INTERVAL,
+    CACHE_MAX_VALUE_BYTES,
+    CACHE_LOCK_TIMEOUT,
+    LOCAL_CACHE_TTL,
+    get_redis_client,
+)
 
+# Stands for a cached value that could not be read
+MISSING = object()
 
-def __make_cache_key(func, args, kwargs):
-    """
-    Generate a unique cache key based on the function source code and its arguments.
-    Avoids pickling non-pickle-able objects.
-    """
-    # Get function source code as bytes
-    src_func = inspect.getsource(func).encode()
-    # Safely serialize arguments, fallback to str if pickle fails
-    try:
-        args_bytes = pickle.dumps(args)
-    except Exception:
-        args_bytes = str(args).encode()
+
+def _load(namespace: str, serialized: bytes) -> Any:
+    """Cached value, or `MISSING` for bytes written in another format."""
     try:
-        kwargs_bytes = pickle.dumps(tuple(sorted(kwargs.items())))
-    except Exception:
-        kwargs_bytes = str(tuple(sorted(kwargs.items()))).encode()
-    # Combine all parts and hash for uniqueness
-    key_bytes = src_func + args_bytes + kwargs_bytes
-    key_hash = hashlib.md5(key_bytes).hexdigest()
-    return key_hash
+        return deserialize(serialized)
+    except CacheFormatError:
+        cache_metrics.increment(namespace, "format_misses")
+        return MISSING
 
 
-def cache_func_wrapper(func=None, *, ex=3600):
+def cache_func_wrapper(
+    func=None, *, ex=3600, max_bytes=None, local=True, coalesce=True, shares_with=None
+):
     """
     Decorator to cache function results in Redis using a key generated from function source and arguments.
+    Coroutine functions get an async wrapper that keeps Redis calls off the event loop.
     ex: expiration time in seconds (default 3600s = 1 hour)
+    max_bytes: largest serialized result stored (default CACHE_MAX_VALUE_BYTES)
+    local: also keep results in the in-process LRU tier, checked before Redis
+    coalesce: on a miss, only one caller (across threads and processes) computes
+        a key while concurrent identical calls wait for its result
+    shares_with: cached function whose entries are reused, e.g. the sync
+        version of an async function
     """
+    max_value_bytes = max_bytes or CACHE_MAX_VALUE_BYTES
 
     def decorator(inner_func):
-        @wraps(inner_func)
-        def wrapper(*args, **kwargs):
-            # Check for no_cache flag in kwargs
-            no_cache = kwargs.pop("no_cache", False)
-            # Get Redis client instance
-            redis_client = get_redis_client()
+        # Computed once here instead of reading the source on every call
+        if shares_with is not None:
+            namespace = shares_with.cache_namespace
+            fingerprint = shares_with.cache_fingerprint
+        else:
+            namespace = get_function_namespace(inner_func)
+            fingerprint = make_function_fingerprint(inner_func)
+        local_ttl = min(ex, LOCAL_CACHE_TTL)
+
+        def _make_key(args, kwargs) -> str:
             # Generate cache key for current function and arguments
-            cache_key = __make_cache_key(inner_func, args, kwargs)
-            if not no_cache:
-                # Try to get cached result from Redis
-                cached_result = redis_client.get(cache_key)
+            started_at = time.perf_counter()
+            cache_key = make_cache_key(namespace, fingerprint, args, kwargs)
+            cache_metrics.record_key_cost(namespace, time.perf_counter() - started_at)
+            return cache_key
+
+        def _get_local(cache_key: str) -> Any:
+            # Results seen by this process are served without a Redis round trip
+            if local and local_cache is not None:
+                cached_result = local_cache.get(cache_key)
                 if cached_result is not None:
+                    cache_metrics.increment(namespace, "local_hits")
+                    return deserialize(cached_result)
+            return MISSING
+
+        def _keep_local(cache_key: str, serialized: bytes):
+            if local and local_cache is not None and len(serialized) <= max_value_bytes:
+                local_cache.set(cache_key, serialized, local_ttl)
+
+        def _get_redis(redis_client, cache_key: str) -> Any:
+            # Try to get cached result from Redis
+            cached_result = redis_client.get(cache_key)
+            if cached_result is not None:
+                result = _load(namespace, cached_result)
+                if result is not MISSING:
                     logging.info(f"Cache hit for key: {cache_key}")
+                    cache_metrics.increment(namespace, "hits")
+                    _keep_local(cache_key, cached_result)
                     # Return cached result if available
-                    return pickle.loads(cached_result)
-
-            # Call the original function if cache miss
-            result = inner_func(*args, **kwargs)
+                    return result
+            cache_metrics.increment(namespace, "misses")
+            return MISSING
 
-            if not no_cache:
-                # Store result in Redis with expiration time
-                redis_client.set(cache_key, pickle.dumps(result), ex=ex)
+        def _load_waited(serialized: Optional[bytes]) -> Any:
+            # Result of the same call computed by another process
+            if serialized is None:
+                return MISSING
+            result = _load(namespace, serialized)
+            if result is not MISSING:
+                cache_metrics.increment(namespace, "lock_waits")
             return result
 
+        def _store(redis_client, cache_key: str, result: Any) -> bytes:
+            serialized = serialize(result)
+            cache_metrics.increment(namespace, "stored_bytes", len(serialized))
+            # Store result in Redis with expiration time, unless too large
+            if len(serialized) <= max_value_bytes:
+                redis_client.set(cache_key, serialized, ex=ex)
+            else:
+                cache_metrics.increment(namespace, "oversized")
+            return serialized
+
+        def _share(serialized: bytes) -> Any:
+            # Same call made by another caller, each caller gets a copy
+            cache_metrics.increment(namespace, "coalesced")
+            return deserialize(serialized)
+
+        if inspect.iscoroutinefunction(inner_func):
+
+            @wraps(inner_func)
+            async def async_wrapper(*args, **kwargs):
+                # Check for no_cache flag in kwargs
+                no_cache = kwargs.pop("no_cache", False)
+                if no_cache:
+                    return await inner_func(*args, **kwargs)
+
+                cache_key = _make_key(args, kwargs)
+                result = _get_local(cache_key)
+                if result is not MISSING:
+                    return result
+
+                # Shared client, every call reuses the pooled connections
+                redis_client = get_redis_client()
+                result = await asyncio.to_thread(_get_redis, redis_client, cache_key)
+                if result is not MISSING:
+                    return result
+
+                async def compute():
+                    lock_token = None
+                    if coalesce:
+                        lock_token = await asyncio.to_thread(
+                            acquire_lock, redis_client, cache_key, CACHE_LOCK_TIMEOUT
+                        )
+                        if lock_token is None:
+                            # Another process is computing it, wait for its result
+                            serialized = await await_result(
+                                redis_client,
+                                cache_key,
+                                CACHE_LOCK_TIMEOUT,
+                                CACHE_LOCK_POLL_INTERVAL,
+                            )
+                            result = _load_waited(serialized)
+                            if result is not MISSING:
+                                return result, serialized
+                    try:
+                        # Call the original function if cache miss
+                        result = await inner_func(*args, **kwargs)
+                        serialized = await asyncio.to_thread(
+                            _store, redis_client, cache_key, result
+                        )
+                    finally:
+                        if lock_token is not None:
+                            await asyncio.to_thread(
+                                release_lock, redis_client, cache_key, lock_token
+                            )
+                    return result, serialized
+
+                if not coalesce:
+                    result, serialized = await compute()
+                else:
+                    (result, serialized), shared = await async_single_flight.do(
+                        cache_key, compute
+                    )
+                    if shared:
+                        return _share(serialized)
+
+                _keep_local(cache_key, serialized)
+                return result
+
+            wrapper = async_wrapper
+        else:
+
+            @wraps(inner_func)
+            def sync_wrapper(*args, **kwargs):
+                # Check for no_cache flag in kwargs
+                no_cache = kwargs.pop("no_cache", False)
+                if no_cache:
+                    return inner_func(*args, **kwargs)
+
+                cache_key = _make_key(args, kwargs)
+                result = _get_local(cache_key)
+                if result is not MISSING:
+                    return result
+
+                # Shared client, every call reuses the pooled connections
+                redis_client = get_redis_client()
+                result = _get_redis(redis_client, cache_key)
+                if result is not MISSING:
+                    return result
+
+                def compute():
+                    lock_token = None
+                    if coalesce:
+                        lock_token = acquire_lock(
+                            redis_client, cache_key, CACHE_LOCK_TIMEOUT
+                        )
+                        if lock_token is None:
+                            # Another process is computing it, wait for its result
+                            serialized = wait_for_result(
+                                redis_client,
+                                cache_key,
+                                CACHE_LOCK_TIMEOUT,
+                                CACHE_LOCK_POLL_INTERVAL,
+                            )
+                            result = _load_waited(serialized)
+                            if result is not MISSING:
+                                return result, serialized
+                    try:
+                        # Call the original function if cache miss
+                        result = inner_func(*args, **kwargs)
+                        serialized = _store(redis_client, cache_key, result)
+                    finally:
+                        if lock_token is not None:
+                            release_lock(redis_client, cache_key, lock_token)
+                    return result, serialized
+
+                if not coalesce:
+                    result, serialized = compute()
+                else:
+                    (result, serialized), shared = single_flight.do(cache_key, compute)
+                    if shared:
+                        return _share(serialized)
+
+                _keep_local(cache_key, serialized)
+                return result
+
+            wrapper = sync_wrapper
+
+        # Lets other cached functions share these entries
+        wrapper.cache_namespace = namespace
+        wrapper.cache_fingerprint = fingerprint
         return wrapper
 
     if func is None:
@@ -0,0 +1,74 @@
+import hashlib
+import inspect
+import json
+from enum import Enum
+from typing import Any, Callable
+
+from langchain_core.messages import BaseMessage
+from pydantic import BaseModel
+
+# Message fields that define a prompt; ids and provider metadata are left out
+_MESSAGE_FIELDS = ("type", "content", "name", "tool_calls", "tool_call_id")
+
+
+def get_function_namespace(func: Callable) -> str:
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def make_function_fingerprint(func: Callable) -> str:
+    """
+    Hash of a function's source, computed once when it is decorated so that
+    editing the function invalidates its cached results.
+    """
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        source = func.__code__.co_code
+    return hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+def canonicalize(value: Any) -> Any:
+    """
+    Convert arguments into a JSON-serializable structure that is equal for
+    equal inputs, without pickling. Pydantic models contribute their class and
+    field values, LangChain messages only their prompt-relevant fields.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    if isinstance(value, dict):
+        return [
+            [str(key), canonicalize(item)]
+            for key, item in sorted(value.items(), key=lambda pair: str(pair[0]))
+        ]
+    if isinstance(value, (set, frozenset)):
+        return sorted(
+            (canonicalize(item) for item in value),
+            key=lambda item: json.dumps(item, sort_keys=True, default=str),
+        )
+    if isinstance(value, BaseMessage):
+        return [
+            "message",
+            *(canonicalize(getattr(value, field, None)) for field in _MESSAGE_FIELDS),
+        ]
+    if isinstance(value, BaseModel):
+        return [type(value).__qualname__, canonicalize(value.__dict__)]
+    if isinstance(value, bytes):
+        return hashlib.blake2b(value, digest_size=16).hexdigest()
+    if callable(value) and hasattr(value, "__qualname__"):
+        return get_function_namespace(value)
+    return f"{type(value).__qualname__}:{value!r}"
+
+
+def make_cache_key(namespace: str, fingerprint: str, args: tuple, kwargs: dict) -> str:
+    payload = json.dumps(
+        [canonicalize(args), canonicalize(kwargs)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    ).encode()
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return f"cache:{namespace}:{fingerprint}:{digest}"
@@ -0,0 +1,104 @@
+import threading
+from collections import defaultdict
+
+from redis import Redis
+
+
+class CacheMetrics:
+    """Thread-safe counters of the cache wrappers, per cached function."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def increment(self, namespace: str, counter: str, amount: float = 1):
+        with self._lock:
+            self._counters[namespace][counter] += amount
+
+    def record_key_cost(self, namespace: str, seconds: float):
+        """Time spent building one cache key."""
+        key_us = seconds * 1_000_000
+        with self._lock:
+            counters = self._counters[namespace]
+            counters["keys"] += 1
+            counters["key_us_total"] += key_us
+            counters["key_us_max"] = max(counters["key_us_max"], key_us)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            result = {}
+            for namespace, counters in self._counters.items():
+                result[namespace] = {
+                    name: round(value, 3) for name, value in counters.items()
+                }
+                if counters.get("keys"):
+                    result[namespace]["key_us_mean"] = round(
+                        counters["key_us_total"] / counters["keys"], 3
+                    )
+                # Semantic cache
+                if counters.get("lookups"):
+                    result[namespace]["hit_rate"] = round(
+                        counters["hits"] / counters["lookups"], 3
+                    )
+                if counters.get("hits"):
+                    result[namespace]["hit_similarity_mean"] = round(
+                        counters["hit_similarity_total"] / counters["hits"], 4
+                    )
+                if counters.get("verified"):
+                    result[namespace]["false_hit_rate"] = round(
+                        counters["false_hits"] / counters["verified"], 3
+                    )
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+cache_metrics = CacheMetrics()
+
+
+def get_cache_memory_report(redis_client: Redis, batch_size: int = 500) -> dict:
+    """
+    Redis memory used by the function cache, per namespace: keys, bytes and
+    the number of function fingerprints (more than one means entries of older
+    versions of the function are still waiting to expire).
+    """
+    namespaces: dict[str, dict] = defaultdict(
+        lambda: {"keys": 0, "bytes": 0, "fingerprints": set()}
+    )
+
+    def _measure(keys: list[bytes]):
+        pipeline = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.memory_usage(key)
+        for key, size in zip(keys, pipeline.execute()):
+            # Keys are "cache:{namespace}:{fingerprint}:{digest}"
+            _, namespace, fingerprint, _ = key.decode().split(":", 3)
+            usage = namespaces[namespace]
+            usage["keys"] += 1
+            usage["bytes"] += size or 0
+            usage["fingerprints"].add(fingerprint)
+
+    keys = []
+    for key in redis_client.scan_iter(match="cache:*", count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            _measure(keys)
+            keys = []
+    if keys:
+        _measure(keys)
+
+    report = {
+        namespace: {**usage, "fingerprints": len(usage["fingerprints"])}
+        for namespace, usage in sorted(
+            namespaces.items(), key=lambda item: item[1]["bytes"], reverse=True
+        )
+    }
+    return {
+        "keys": sum(usage["keys"] for usage in report.values()),
+        "bytes": sum(usage["bytes"] for usage in report.values()),
+        "namespaces": report,
+    }
@@ -0,0 +1,119 @@
+import difflib
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+
+from src.base.service.base_embedding_service import BaseEmbeddingService
+from src.cache.cache_func_wrapper import cache_func_wrapper
+from src.cache.cache_key import canonicalize
+from src.cache.cache_metrics import cache_metrics
+from src.cache.serialization import deserialize, serialize
+from src.repositories.agent.semantic_cache_repository import SemanticCacheRepository
+from src.settings import SEMANTIC_CACHE_MIN_AGREEMENT, SEMANTIC_CACHE_TTL
+
+# Seconds between two deletions of the expired entries by this process
+PRUNE_INTERVAL = 3600
+_next_prune_at = 0.0
+
+
+def get_semantic_scope(owner: Any, context: list, key: Optional[str] = None) -> str:
+    """
+    Scope of the prompts that may share responses: the same agent class and
+    settings, with the same messages (system prompt, chat history) before them.
+    `key` keeps apart prompts that must never share a response however close
+    they are, e.g. the same documents asked about two different functions.
+    """
+    scoped = [owner, context] if key is None else [owner, context, key]
+    payload = json.dumps(
+        canonicalize(scoped), separators=(",", ":"), default=str
+    ).encode()
+    digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return f"{type(owner).__qualname__}:{digest}"
+
+
+def get_scope_namespace(scope: str) -> str:
+    """Metrics namespace of a scope, one per agent class."""
+    return f"semantic.{scope.split(':')[0]}"
+
+
+@cache_func_wrapper(ex=SEMANTIC_CACHE_TTL)
+def embed_prompt(prompt: str) -> list[float]:
+    return BaseEmbeddingService().embed_query(prompt)
+
+
+def find_similar_response(
+    scope: str, prompt: str, threshold: float
+) -> Optional[tuple[Any, float]]:
+    """
+    Cached response of the closest prompt in `scope`, with its cosine
+    similarity, when it is at least `threshold`.
+    """
+    namespace = get_scope_namespace(scope)
+    cache_metrics.increment(namespace, "lookups")
+
+    nearest = SemanticCacheRepository.get_nearest(
+        scope=scope, vector=embed_prompt(prompt), max_age=SEMANTIC_CACHE_TTL
+    )
+    similarity = 1 - nearest[1] if nearest else None
+    if similarity is None or similarity < threshold:
+        cache_metrics.increment(namespace, "misses")
+        return None
+
+    cache_metrics.increment(namespace, "hits")
+    cache_metrics.increment(namespace, "hit_similarity_total", similarity)
+    return deserialize(nearest[0].response), similarity
+
+
+def store_response(scope: str, prompt: str, response: Any):
+    SemanticCacheRepository(
+        scope=scope,
+        prompt=prompt,
+        vector=embed_prompt(prompt),
+        response=serialize(response),
+    ).create()
+    cache_metrics.increment(get_scope_namespace(scope), "stores")
+    prune_expired_responses()
+
+
+def prune_expired_responses(force: bool = False) -> int:
+    """
+    Delete the entries past SEMANTIC_CACHE_TTL, at most once per
+    PRUNE_INTERVAL unless `force`. Lookups skip them already, but they would
+    grow the table and the scan of every lookup forever.
+    """
+    global _next_prune_at
+    if not force and time.monotonic() < _next_prune_at:
+        return 0
+    _next_prune_at = time.monotonic() + PRUNE_INTERVAL
+
+    deleted = SemanticCacheRepository.delete_expired(max_age=SEMANTIC_CACHE_TTL)
+    if deleted:
+        logging.info(f"Deleted {deleted} expired semantic cache entries")
+    return deleted
+
+
+def _get_text(response: Any) -> str:
+    if isinstance(response, BaseMessage):
+        return response.text
+    return str(response)
+
+
+def record_verification(scope: str, cached_response: Any, response: Any) -> bool:
+    """
+    Compare a semantic hit with the response of its actual prompt. Counts a
+    false hit when their texts agree less than SEMANTIC_CACHE_MIN_AGREEMENT.
+    """
+    agreement = difflib.SequenceMatcher(
+        None, _get_text(cached_response), _get_text(response), autojunk=False
+    ).ratio()
+    false_hit = agreement < SEMANTIC_CACHE_MIN_AGREEMENT
+
+    namespace = get_scope_namespace(scope)
+    cache_metrics.increment(namespace, "verified")
+    if false_hit:
+        cache_metrics.increment(namespace, "false_hits")
+    return false_hit
@@ -0,0 +1,107 @@
+import json
+import pickle
+from typing import Any
+
+import zstandard
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from src.settings import CACHE_COMPRESSION_LEVEL
+
+# Bumped whenever the stored layout changes; entries of other versions are misses
+CACHE_FORMAT_VERSION = 1
+# Payload encodings and codecs, one byte each after the version
+_JSON, _PICKLE = b"j", b"p"
+_RAW, _ZSTD = b"-", b"z"
+# Smaller payloads are not worth compressing
+_COMPRESS_MIN_BYTES = 256
+# Markers of the JSON values that are not plain JSON
+_TUPLE, _MESSAGE = "__tuple__", "__message__"
+
+
+class CacheFormatError(ValueError):
+    """Raised for cached bytes written in another format or version."""
+
+
+def _compact_message(message: BaseMessage) -> dict:
+    # Unset fields take their defaults again when loaded
+    message_dict = message_to_dict(message)
+    message_dict["data"] = {
+        key: value
+        for key, value in message_dict["data"].items()
+        if key == "content" or value not in (None, [], {})
+    }
+    return message_dict
+
+
+def _encode(value: Any) -> Any:
+    """
+    Convert `value` into plain JSON, keeping LangChain messages as their
+    stable dict form. Raises `TypeError` for anything else.
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {_TUPLE: [_encode(item) for item in value]}
+    if isinstance(value, BaseMessage):
+        return {_MESSAGE: _compact_message(value)}
+    if (
+        isinstance(value, dict)
+        and all(isinstance(key, str) for key in value)
+        and _TUPLE not in value
+        and _MESSAGE not in value
+    ):
+        return {key: _encode(item) for key, item in value.items()}
+    raise TypeError(f"{type(value).__qualname__} is not JSON serializable")
+
+
+def _decode_object(value: dict) -> Any:
+    if len(value) == 1 and _TUPLE in value:
+        return tuple(value[_TUPLE])
+    if len(value) == 1 and _MESSAGE in value:
+        return messages_from_dict([value[_MESSAGE]])[0]
+    return value
+
+
+def serialize(value: Any) -> bytes:
+    """
+    Versioned bytes of a cached result: JSON when possible (messages, plain
+    containers), pickle otherwise, compressed with zstd when large enough.
+    """
+    try:
+        kind = _JSON
+        payload = json.dumps(
+            _encode(value), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    except TypeError:
+        kind = _PICKLE
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    codec = _RAW
+    if len(payload) >= _COMPRESS_MIN_BYTES:
+        compressed = zstandard.compress(payload, CACHE_COMPRESSION_LEVEL)
+        if len(compressed) < len(payload):
+            codec, payload = _ZSTD, compressed
+    return bytes([CACHE_FORMAT_VERSION]) + kind + codec + payload
+
+
+def deserialize(data: bytes) -> Any:
+    if len(data) < 3 or data[0] != CACHE_FORMAT_VERSION:
+        raise CacheFormatError("Unknown cache format version")
+    kind, codec, payload = data[1:2], data[2:3], data[3:]
+
+    try:
+        if codec == _ZSTD:
+            payload = zstandard.decompress(payload)
+        elif codec != _RAW:
+            raise CacheFormatError(f"Unknown cache codec {codec!r}")
+        if kind == _JSON:
+            return json.loads(payload, object_hook=_decode_object)
+        if kind == _PICKLE:
+            return pickle.loads(payload)
+    except CacheFormatError:
+        raise
+    except Exception as e:
+        raise CacheFormatError(f"Unreadable cached value: {e}") from e
+    raise CacheFormatError(f"Unknown cache encoding {kind!r}")
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from redis import Redis
+
+# Deletes a lock only while it still holds the owner's token
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key within this process: the first
+    caller runs the function, the others wait and get its result (or error).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> tuple[Any, bool]:
+        """Returns the result and whether it came from another caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """
+    `SingleFlight` for coroutines: concurrent calls for the same key on the
+    same event loop await the first one's task.
+    """
+
+    def __init__(self):
+        self._tasks: dict[tuple[int, str], asyncio.Future] = {}
+
+    async def do(
+        self, key: str, func: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """Returns the result and whether it came from another caller."""
+        task_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(task_key)
+        if task is not None:
+            # Shielded so that a cancelled follower does not cancel the call
+            return await asyncio.shield(task), True
+
+        task = self._tasks[task_key] = asyncio.ensure_future(func())
+        try:
+            return await asyncio.shield(task), False
+        finally:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+
+
+def get_lock_key(cache_key: str) -> str:
+    return f"lock:{cache_key}"
+
+
+def acquire_lock(redis_client: Redis, cache_key: str, timeout: float) -> Optional[str]:
+    """
+    Mark `cache_key` as being computed, across processes.
+    Returns the lock token, or None when another process holds it.
+    """
+    token = uuid.uuid4().hex
+    acquired = redis_client.set(
+        get_lock_key(cache_key), token, nx=True, px=int(timeout * 1000)
+    )
+    return token if acquired else None
+
+
+def release_lock(redis_client: Redis, cache_key: str, token: str):
+    redis_client.eval(_RELEASE_SCRIPT, 1, get_lock_key(cache_key), token)
+
+
+def poll_result(redis_client: Redis, cache_key: str) -> tuple[Optional[bytes], bool]:
+    """The value of `cache_key` if stored, and whether it is still locked."""
+    # The owner stores the value before releasing, so check the lock first
+    locked = redis_client.exists(get_lock_key(cache_key))
+    return redis_client.get(cache_key), bool(locked)
+
+
+def wait_for_result(
+    redis_client: Redis, cache_key: str, timeout: float, poll_interval: float
+) -> Optional[bytes]:
+    """
+    Poll for the value another process is computing. Returns None once its
+    lock is gone without a value (it failed) or after `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        value, locked = poll_result(redis_client, cache_key)
+        if value is not None or not locked or time.monotonic() >= deadline:
+            return value
+        time.sleep(poll_interval)
+
+
+async def await_result(
+    redis_client: Redis, cache_key: str, timeout: float, poll_interval: float
+) -> Optional[bytes]:
+    """`wait_for_result` that sleeps on the event loop between polls."""
+    deadline = time.monotonic() + timeout
+    while True:
+        value, locked = await asyncio.to_thread(poll_result, redis_client, cache_key)
+        if value is not None or not locked or time.monotonic() >= deadline:
+            return value
+        await asyncio.sleep(poll_interval)
+
+
+# Shared by every cache wrapper of the process
+single_flight = SingleFlight()
+async_single_flight = AsyncSingleFlight()
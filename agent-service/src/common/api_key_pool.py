@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from google.api_core.exceptions import ResourceExhausted
+
+from src.settings import (
+    GOOGLE_API_KEYS,
+    GOOGLE_KEY_COOLDOWN,
+    GOOGLE_KEY_RPM,
+    GOOGLE_KEY_TPM,
+)
+
+T = TypeVar("T")
+
+# Seconds covered by the per-minute request and token counts
+_WINDOW = 60.0
+
+_RETRY_DELAY_PATTERN = re.compile(r"retry[_ ]?delay\D{0,20}(\d+(?:\.\d+)?)", re.I)
+
+
+class _KeyState:
+    def __init__(self, key: str):
+        self.key = key
+        # [started_at, tokens] of the requests of the last minute
+        self.window: deque[list[float]] = deque()
+        self.window_tokens = 0.0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.tokens = 0
+        self.rate_limited = 0
+
+
+class KeyLease:
+    """A key handed out for one request, and how long to wait before sending it."""
+
+    def __init__(self, key: str, wait: float, state: _KeyState, entry: list[float]):
+        self.key = key
+        self.wait = wait
+        self._state = state
+        self._entry = entry
+
+
+class ApiKeyPool:
+    """
+    Spreads requests over several API keys, each with its own per-minute
+    request (`rpm`) and token (`tpm`) quota, 0 meaning unlimited.
+
+    `reserve` hands out the key that can send soonest, the least busy one
+    among those ready, and how long to wait when every key is at its quota.
+    A key answered with 429 rests for the delay the API asked for, or
+    `cooldown` seconds, while the other keys take its requests.
+    """
+
+    def __init__(
+        self, keys: list[str], rpm: int = 0, tpm: int = 0, cooldown: float = 60.0
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.cooldown = cooldown
+        self._states = [_KeyState(key) for key in dict.fromkeys(keys)]
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self) -> list[str]:
+        return [state.key for state in self._states]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _prune(self, state: _KeyState, now: float):
+        while state.window and state.window[0][0] <= now - _WINDOW:
+            state.window_tokens -= state.window.popleft()[1]
+
+    def _ready_at(self, state: _KeyState, now: float, tokens: float) -> float:
+        # Called with the lock held, on a pruned window
+        ready_at = max(now, state.cooldown_until)
+        if self.rpm and len(state.window) >= self.rpm:
+            ready_at = max(ready_at, state.window[-self.rpm][0] + _WINDOW)
+        if self.tpm and state.window and state.window_tokens + tokens > self.tpm:
+            # Wait for enough of the window's tokens to age out, a request
+            # larger than the whole quota waits for an empty window
+            remaining = state.window_tokens
+            for started_at, entry_tokens in state.window:
+                remaining -= entry_tokens
+                if remaining + tokens <= self.tpm:
+                    break
+            ready_at = max(ready_at, started_at + _WINDOW)
+        return ready_at
+
+    def reserve(self, tokens: float = 0) -> KeyLease:
+        """Take a key for a request of about `tokens` tokens, see `KeyLease`."""
+        with self._lock:
+            if not self._states:
+                raise ValueError("The API key pool has no keys.")
+
+            now = time.monotonic()
+            # Start from a rotating offset so that ties go round-robin
+            candidates = []
+            for offset in range(len(self._states)):
+                state = self._states[(self._next + offset) % len(self._states)]
+                self._prune(state, now)
+                ready_at = self._ready_at(state, now, tokens)
+                candidates.append(
+                    ((ready_at, state.in_flight, len(state.window)), state)
+                )
+            self._next = (self._next + 1) % len(self._states)
+            (ready_at, _, _), state = min(candidates, key=lambda c: c[0])
+
+            entry = [ready_at, tokens]
+            state.window.append(entry)
+            state.window_tokens += tokens
+            state.in_flight += 1
+            state.requests += 1
+            return KeyLease(state.key, ready_at - now, state, entry)
+
+    def release(self, lease: KeyLease, tokens: Optional[float] = None):
+        """End the request of `lease`, counting the `tokens` it actually used."""
+        with self._lock:
+            state = lease._state
+            state.in_flight -= 1
+            if tokens is None:
+                tokens = lease._entry[1]
+            state.tokens += int(tokens)
+            if any(entry is lease._entry for entry in state.window):
+                state.window_tokens += tokens - lease._entry[1]
+            lease._entry[1] = tokens
+
+    def mark_rate_limited(self, lease: KeyLease, retry_after: Optional[float] = None):
+        """Rest the key of `lease` after a 429."""
+        with self._lock:
+            state = lease._state
+            state.rate_limited += 1
+            state.cooldown_until = max(
+                state.cooldown_until,
+                time.monotonic() + (retry_after or self.cooldown),
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            keys = []
+            for state in self._states:
+                self._prune(state, now)
+                keys.append(
+                    {
+                        "key": f"...{state.key[-4:]}",
+                        "requests_last_minute": len(state.window),
+                        "tokens_last_minute": int(state.window_tokens),
+                        "in_flight": state.in_flight,
+                        "requests": state.requests,
+                        "tokens": state.tokens,
+                        "rate_limited": state.rate_limited,
+                        "cooldown_seconds": round(
+                            max(0.0, state.cooldown_until - now), 3
+                        ),
+                    }
+                )
+            return {"rpm": self.rpm, "tpm": self.tpm, "keys": keys}
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether `error`, or an error it was raised from, is a 429."""
+    while error is not None:
+        if isinstance(error, ResourceExhausted) or "RESOURCE_EXHAUSTED" in str(error):
+            return True
+        error = error.__cause__
+    return False
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Retry delay a 429 asked for, when it says."""
+    while error is not None:
+        match = _RETRY_DELAY_PATTERN.search(str(error))
+        if match:
+            return float(match.group(1))
+        error = error.__cause__
+    return None
+
+
+def call_with_key(
+    pool: ApiKeyPool,
+    call: Callable[[str], T],
+    tokens: float = 0,
+    count_tokens: Optional[Callable[[T], Optional[float]]] = None,
+) -> T:
+    """
+    `call(key)` with a key of `pool`, moving on to another key when it is
+    rate limited, up to one attempt per key. `tokens` is the request's
+    estimated size, `count_tokens` reads the actual one from the result.
+    """
+    for attempt in range(len(pool)):
+        lease = pool.reserve(tokens)
+        if lease.wait > 0:
+            time.sleep(lease.wait)
+
+        used = tokens
+        try:
+            result = call(lease.key)
+            if count_tokens is not None:
+                used = count_tokens(result) or tokens
+            return result
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            pool.mark_rate_limited(lease, get_retry_after(e))
+            logging.warning(f"API key ...{lease.key[-4:]} is rate limited: {e}")
+            if attempt == len(pool) - 1:
+                raise
+        finally:
+            pool.release(lease, used)
+
+
+async def acall_with_key(
+    pool: ApiKeyPool,
+    call: Callable[[str], Awaitable[T]],
+    tokens: float = 0,
+    count_tokens: Optional[Callable[[T], Optional[float]]] = None,
+) -> T:
+    """Async `call_with_key`, waiting for a key on the event loop."""
+    for attempt in range(len(pool)):
+        lease = pool.reserve(tokens)
+        if lease.wait > 0:
+            await asyncio.sleep(lease.wait)
+
+        used = tokens
+        try:
+            result = await call(lease.key)
+            if count_tokens is not None:
+                used = count_tokens(result) or tokens
+            return result
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            pool.mark_rate_limited(lease, get_retry_after(e))
+            logging.warning(f"API key ...{lease.key[-4:]} is rate limited: {e}")
+            if attempt == len(pool) - 1:
+                raise
+        finally:
+            pool.release(lease, used)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of `text`, about four characters per token."""
+    return len(text) // 4 + 1
+
+
+# Shared by every Gemini/Gemma agent service and embedding service of the process
+google_key_pool = ApiKeyPool(
+    GOOGLE_API_KEYS,
+    rpm=GOOGLE_KEY_RPM,
+    tpm=GOOGLE_KEY_TPM,
+    cooldown=GOOGLE_KEY_COOLDOWN,
+)
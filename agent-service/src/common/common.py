@@ -1,4 +1,5 @@
 import hashlib
+import math
 import re
 
 from pydantic import (
@@ -21,6 +22,17 @@ def merge_chunks(chunks):
     return [item for sublist in chunks for item in sublist]
 
 
+def percentile(sorted_values, q: float) -> float:
+    """Linearly interpolated `q`-th percentile (0-100) of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
 @validate_call
 def create_unique_id(text: str = Field(min_length=1)) -> str:
     """Create a unique id with text as a seed"""
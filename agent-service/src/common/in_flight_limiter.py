@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Union
+
+_Waiter = Union[threading.Event, tuple[asyncio.AbstractEventLoop, asyncio.Future]]
+
+
+class InFlightLimiter:
+    """
+    Caps the calls in flight across all threads and event loops of a process.
+    Use `with limiter:` in threads and `async with limiter:` in coroutines;
+    released slots go to waiters in arrival order.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._waiters: deque[_Waiter] = deque()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.acquired = 0
+        self.waits = 0
+
+    def _try_acquire(self) -> bool:
+        # Called with the lock held
+        if self.in_flight >= self.limit or self._waiters:
+            self.waits += 1
+            return False
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.acquired += 1
+        return True
+
+    def acquire(self):
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        # Set once `release` hands its slot over
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was already handed over, pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def _hand_over(self, future: asyncio.Future):
+        # Runs on the waiter's loop
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                self.acquired += 1
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                self.acquired -= 1
+            self.in_flight -= 1
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters),
+                "max_in_flight": self.max_in_flight,
+                "acquired": self.acquired,
+                "waits": self.waits,
+            }
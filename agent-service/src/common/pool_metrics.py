@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+
+from redis import BlockingConnectionPool
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from src.common.common import percentile
+
+# Number of most recent checkout waits kept for the percentiles
+_WAIT_SAMPLES = 1024
+
+
+class PoolMetrics:
+    """Thread-safe counters and checkout wait times of a connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits_ms: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+
+    def record_wait(self, seconds: float):
+        wait_ms = seconds * 1000
+        with self._lock:
+            self._waits_ms.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits_ms = sorted(self._waits_ms)
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_p50_ms": round(percentile(waits_ms, 50), 3),
+                "wait_p95_ms": round(percentile(waits_ms, 95), 3),
+                "wait_max_ms": round(self.max_wait_ms, 3),
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    `QueuePool` that records how long callers wait for a connection.
+    Pass it as `poolclass` to `create_engine`, then `instrument_engine`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.metrics = PoolMetrics()
+        super().__init__(*args, **kwargs)
+
+    def recreate(self) -> "MeteredQueuePool":
+        # Keep collecting into the same metrics after a dispose()
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.increment("timeouts")
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started_at)
+
+
+def instrument_engine(engine: Engine):
+    """Count new physical connections and checkouts of a `MeteredQueuePool`."""
+    event.listen(
+        engine, "connect", lambda *_: engine.pool.metrics.increment("connects")
+    )
+    event.listen(
+        engine, "checkout", lambda *_: engine.pool.metrics.increment("checkouts")
+    )
+
+
+def get_engine_pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **pool.metrics.snapshot(),
+    }
+
+
+class MeteredBlockingConnectionPool(BlockingConnectionPool):
+    """Redis `BlockingConnectionPool` that records checkouts and their waits."""
+
+    def __init__(self, *args, **kwargs):
+        self.metrics = PoolMetrics()
+        super().__init__(*args, **kwargs)
+
+    def get_connection(self, *args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except RedisConnectionError as e:
+            # Raised both for an exhausted pool and for an unreachable server
+            if "No connection available" in str(e):
+                self.metrics.increment("timeouts")
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started_at)
+        self.metrics.increment("checkouts")
+        return connection
+
+    def make_connection(self):
+        self.metrics.increment("connects")
+        return super().make_connection()
+
+
+def get_redis_pool_status(pool: MeteredBlockingConnectionPool) -> dict:
+    created = len(pool._connections)
+    idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    return {
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": created - idle,
+        **pool.metrics.snapshot(),
+    }
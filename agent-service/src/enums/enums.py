@@ -9,3 +9,14 @@ class ModelTypeEnum(str, Enum):
 class LanguageEnum(str, Enum):
     VI = "vi"
     EN = "en"
+
+
+class ExecutionModeEnum(str, Enum):
+    FUNCTIONAL = "functional"
+    LOAD = "load"
+
+
+class JobTypeEnum(str, Enum):
+    TEST_GENERATION = "test_generation"
+    TEST_EXECUTION = "test_execution"
+    LOAD_TEST = "load_test"
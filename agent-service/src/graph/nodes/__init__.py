@@ -23,7 +23,8 @@ from .testcase_generator.document_standardizer import (
 )
 from .testcase_generator.testcase_generator import TestCaseGenerator
 from .testcase_generator.api_info_collector import APIInfoCollector
-from .testcase_generator.testcase_generator_job import (
-    TestcaseGeneratorJob,
-    orchestrate_job,
+from .testcase_generator.testcase_generator_job import TestcaseGeneratorJob
+from .testcase_generator.fr_group_generator import (
+    FrGroupGenerator,
+    dispatch_fr_groups,
 )
@@ -48,7 +48,7 @@ class MetaDataRemovalNode(BaseAgentService):
             chunks, batch_size=self.batch_size, max_workers=self.max_workers
         )
 
-        result_text += "\n".join(responses) + "\n"
+        result_text += "\n".join(response.content for response in responses) + "\n"
 
         logging.info("MetaDataRemoval node called")
 
@@ -1,4 +1,5 @@
 # src.graph.nodes.testcase_generator.document_collector
+import asyncio
 from typing import Any, Dict, Optional
 
 from langchain_core.output_parsers import JsonOutputParser
@@ -18,29 +19,59 @@ class DocumentCollector(BaseAgentService):
     llm_temperature: float = 0
 
     llm_thinking_budget: Optional[int] = -1
+    # Prompts often differ only slightly between re-ingestions; the table of
+    # contents is the same for every function of a project, so responses are
+    # only shared between prompts about the same function
+    semantic_cache: bool = True
 
     path_to_prompt: dict[LanguageEnum, str] = {
         LanguageEnum.VI: "src/graph/nodes/testcase_generator/prompts/document_collector_vi.md",
         LanguageEnum.EN: "src/graph/nodes/testcase_generator/prompts/document_collector_en.md",
     }
 
-    @validate_call
-    def __call__(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
-        lang = state.lang
-
+    def _get_target_function(self, state: TestcasesGenStateModel) -> str:
         all_fr_infos = state.extra_parameters["all_fr_infos"]
         current_fr_index = state.extra_parameters.get("current_fr_index", -1)
-        current_fr = all_fr_infos[current_fr_index].get_fr_group_name()
-        current_fr_id = all_fr_infos[current_fr_index].fr_info_id
+        return all_fr_infos[current_fr_index].get_fr_group_name()
+
+    def _get_human(self, state: TestcasesGenStateModel) -> str:
+        current_fr = self._get_target_function(state)
 
         all_docs_toc = state.extra_parameters["all_docs_toc"]
-        self.set_system_lang(lang)
+        self.set_system_lang(state.lang)
 
         input_data = (
             f"<Target Function>'{current_fr}'</Target Function>\n{all_docs_toc}"
         )
         logger.debug(f"Document Collector Input Data: \n{input_data}")
-        response = self.run(human=input_data).content
+        return input_data
+
+    @validate_call
+    def __call__(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
+        response = self.run(
+            human=self._get_human(state),
+            semantic_key=self._get_target_function(state),
+        ).content
+        return self._collect_documents(state, response)
+
+    @validate_call
+    async def acall(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
+        response = (
+            await self.arun(
+                human=self._get_human(state),
+                semantic_key=self._get_target_function(state),
+            )
+        ).content
+        # Database lookups and vector searches
+        return await asyncio.to_thread(self._collect_documents, state, response)
+
+    def _collect_documents(
+        self, state: TestcasesGenStateModel, response: str
+    ) -> TestcasesGenStateModel:
+        all_fr_infos = state.extra_parameters["all_fr_infos"]
+        current_fr_index = state.extra_parameters.get("current_fr_index", -1)
+        current_fr_id = all_fr_infos[current_fr_index].fr_info_id
+
         logger.debug(f"Document Collector Raw Response: \n{response}")
         json_parser = JsonOutputParser()
         response = json_parser.parse(response)
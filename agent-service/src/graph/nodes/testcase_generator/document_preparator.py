@@ -8,6 +8,31 @@ from src.settings import get_db_engine, logger
 
 
 class DocumentPreparator(BaseModel):
+    def _skip_completed(
+        self,
+        run_id: str,
+        all_fr_infos: list[repositories.DocumentFRInfoRepository],
+    ) -> list[repositories.DocumentFRInfoRepository]:
+        """FR groups the generation run has yet to complete, now pending."""
+        run = repositories.TestGenerationRunRepository.start(
+            run_id=run_id,
+            fr_info_ids=[fr_info.fr_info_id for fr_info in all_fr_infos],
+        )
+        if run is None:
+            raise ValueError(f"Generation run '{run_id}' not found")
+
+        completed_fr_info_ids = run.get_completed_fr_info_ids()
+        if completed_fr_info_ids:
+            logger.info(
+                f"Resuming generation run {run_id}, "
+                f"{len(completed_fr_info_ids)} FR groups already completed"
+            )
+        return [
+            fr_info
+            for fr_info in all_fr_infos
+            if fr_info.fr_info_id not in completed_fr_info_ids
+        ]
+
     @validate_call
     def __call__(self, state: TestcasesGenStateModel) -> TestcasesGenStateModel:
         project_id = state.project_id
@@ -19,6 +44,9 @@ class DocumentPreparator(BaseModel):
             session=session,
         )
 
+        if state.run_id:
+            all_fr_infos = self._skip_completed(state.run_id, all_fr_infos)
+
         docs_metadata = repositories.DocumentMetadataRepository.get_by_project_id(
             project_id=project_id,
             session=session,
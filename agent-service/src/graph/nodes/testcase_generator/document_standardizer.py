@@ -52,14 +52,15 @@ class DocumentStandardizer(BaseAgentService):
     llm_temperature: float = 0
 
     llm_thinking_budget: Optional[int] = -1
+    # Prompts often differ only slightly between re-ingestions
+    semantic_cache: bool = True
 
     path_to_prompt: dict[LanguageEnum, str] = {
         LanguageEnum.VI: "src/graph/nodes/testcase_generator/prompts/document_standardizer_vi.md",
         LanguageEnum.EN: "src/graph/nodes/testcase_generator/prompts/document_standardizer_en.md",
     }
 
-    @validate_call
-    def __call__(self, state: TestcasesGenStateModel) -> TestcasesGenStateModel:
+    def _get_human(self, state: TestcasesGenStateModel) -> str:
         collected_documents = state.extra_parameters.get("collected_documents", None)
 
         all_fr_infos = state.extra_parameters["all_fr_infos"]
@@ -68,29 +69,19 @@ class DocumentStandardizer(BaseAgentService):
 
         if not collected_documents:
             raise ValueError("No collected documents found in state.extra_parameters")
-        lang = state.lang
-        self.set_system_lang(lang)
-
-        no_cache = False
-        retry_count = 0
-        while True:
-            standardized_documents = self.run(
-                human=f"<Raw Data>{collected_documents[current_fr_id]}</Raw Data>",
-                no_cache=no_cache,
-            ).content
-            logger.debug(f"Standardized Documents: \n{standardized_documents}")
-            try:
-                api_info = extract_api_info(standardized_documents)
-                break
-            except Exception as e:
-                no_cache = True
-                retry_count += 1
-
-                if retry_count > 3:
-                    raise e
-
-                logger.warning(f"API info extraction error: {e}. Retrying...")
-                continue
+        self.set_system_lang(state.lang)
+
+        return f"<Raw Data>{collected_documents[current_fr_id]}</Raw Data>"
+
+    def _update_state(
+        self,
+        state: TestcasesGenStateModel,
+        standardized_documents: str,
+        api_info: models.ApiInfoModel,
+    ) -> TestcasesGenStateModel:
+        all_fr_infos = state.extra_parameters["all_fr_infos"]
+        current_fr_index = state.extra_parameters.get("current_fr_index", -1)
+        current_fr_id = all_fr_infos[current_fr_index].fr_info_id
 
         state.extra_parameters["standardized_documents"][
             current_fr_id
@@ -99,6 +90,20 @@ class DocumentStandardizer(BaseAgentService):
         logger.info("Document standardization completed!")
         return state
 
+    @validate_call
+    def __call__(self, state: TestcasesGenStateModel) -> TestcasesGenStateModel:
+        standardized_documents, api_info = self.run_until_valid(
+            human=self._get_human(state), parse=extract_api_info
+        )
+        return self._update_state(state, standardized_documents, api_info)
+
+    @validate_call
+    async def acall(self, state: TestcasesGenStateModel) -> TestcasesGenStateModel:
+        standardized_documents, api_info = await self.arun_until_valid(
+            human=self._get_human(state), parse=extract_api_info
+        )
+        return self._update_state(state, standardized_documents, api_info)
+
 
 if __name__ == "__main__":
     from .document_collector import DocumentCollector
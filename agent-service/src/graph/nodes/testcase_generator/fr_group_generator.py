@@ -0,0 +1,141 @@
+# src.graph.nodes.testcase_generator.fr_group_generator
+import asyncio
+from typing import Any, Dict, List, Union
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.types import Send
+from pydantic import BaseModel, Field, validate_call
+
+from src import repositories
+from src.models import TestcasesGenStateModel
+from src.settings import logger
+
+from .document_collector import DocumentCollector
+from .document_standardizer import DocumentStandardizer
+from .testcase_generator import TestCaseGenerator
+
+
+class FrGroupGenerator(BaseModel):
+    """
+    Document collector -> standardizer -> test case generator chain of one FR
+    group. Each group sent by `dispatch_fr_groups` runs it concurrently with the
+    others; only the group's test case infos go back to the workflow state.
+
+    The group's test suite and cases are committed as soon as it is done, and
+    its status recorded in the generation run. A failed group is recorded
+    without stopping the others, so that resuming the run only redoes it. A
+    group the run completed already is not generated again: a run resumed
+    from a checkpoint taken before the group's commit sends it once more.
+    """
+
+    document_collector: DocumentCollector = Field(default_factory=DocumentCollector)
+    document_standardizer: DocumentStandardizer = Field(
+        default_factory=DocumentStandardizer
+    )
+    testcase_generator: TestCaseGenerator = Field(default_factory=TestCaseGenerator)
+
+    def _get_fr_info(
+        self, state: TestcasesGenStateModel
+    ) -> repositories.DocumentFRInfoRepository:
+        return state.extra_parameters["all_fr_infos"][
+            state.extra_parameters["current_fr_index"]
+        ]
+
+    def _is_completed(self, state: TestcasesGenStateModel) -> bool:
+        if not state.run_id:
+            return False
+        run = repositories.TestGenerationRunRepository.get_by_id(run_id=state.run_id)
+        fr_info = self._get_fr_info(state)
+        if run is None or fr_info.fr_info_id not in run.get_completed_fr_info_ids():
+            return False
+        logger.info(f"FR group already completed: {fr_info.get_fr_group_name()}")
+        return True
+
+    def _complete(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
+        fr_info = self._get_fr_info(state)
+        test_entities = state.test_case_infos[fr_info.fr_info_id]
+        test_suite = test_entities["test_suite"].create_with_test_cases(
+            test_entities["test_cases"]
+        )
+
+        if state.run_id:
+            repositories.TestGenerationRunRepository.set_fr_status(
+                run_id=state.run_id,
+                fr_info_id=fr_info.fr_info_id,
+                status="completed",
+                test_suite_id=test_suite.test_suite_id,
+            )
+        logger.info(f"FR group completed: {fr_info.get_fr_group_name()}")
+        return {"test_case_infos": state.test_case_infos}
+
+    def _fail(self, state: TestcasesGenStateModel, error: Exception) -> Dict[str, Any]:
+        fr_info = self._get_fr_info(state)
+        logger.exception(f"FR group failed: {fr_info.get_fr_group_name()}")
+
+        if state.run_id:
+            repositories.TestGenerationRunRepository.set_fr_status(
+                run_id=state.run_id,
+                fr_info_id=fr_info.fr_info_id,
+                status="failed",
+                error=str(error),
+            )
+        return {"test_case_infos": {}}
+
+    @validate_call
+    def __call__(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
+        if self._is_completed(state):
+            return {"test_case_infos": {}}
+        try:
+            state = self.document_collector(state)
+            state = self.document_standardizer(state)
+            state = self.testcase_generator(state)
+            return self._complete(state)
+        except Exception as e:
+            return self._fail(state, e)
+
+    @validate_call
+    async def acall(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
+        if await asyncio.to_thread(self._is_completed, state):
+            return {"test_case_infos": {}}
+        try:
+            state = await self.document_collector.acall(state)
+            state = await self.document_standardizer.acall(state)
+            state = await self.testcase_generator.acall(state)
+            # Database writes
+            return await asyncio.to_thread(self._complete, state)
+        except Exception as e:
+            return await asyncio.to_thread(self._fail, state, e)
+
+    def as_node(self) -> RunnableLambda:
+        """Graph node running `__call__` under `invoke` and `acall` under `ainvoke`."""
+        return RunnableLambda(self.__call__, afunc=self.acall, name=type(self).__name__)
+
+
+def dispatch_fr_groups(state: TestcasesGenStateModel) -> Union[List[Send], str]:
+    """
+    Send every selected FR group to `fr_group_generator` with a state of its
+    own, or go straight to `testcase_generator_job` when there is none.
+    """
+    all_fr_infos = state.extra_parameters["all_fr_infos"]
+    if not all_fr_infos:
+        return "testcase_generator_job"
+
+    logger.info(f"Generating test cases for {len(all_fr_infos)} FR groups")
+    return [
+        Send(
+            "fr_group_generator",
+            TestcasesGenStateModel(
+                project_id=state.project_id,
+                lang=state.lang,
+                run_id=state.run_id,
+                extra_parameters={
+                    "all_docs_toc": state.extra_parameters["all_docs_toc"],
+                    "all_fr_infos": all_fr_infos,
+                    "current_fr_index": current_fr_index,
+                    "collected_documents": {},
+                    "standardized_documents": {},
+                },
+            ),
+        )
+        for current_fr_index in range(len(all_fr_infos))
+    ]
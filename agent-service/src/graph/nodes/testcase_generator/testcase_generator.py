@@ -34,58 +34,62 @@ class TestCaseGenerator(BaseAgentService):
 
         return data
 
+    def parse_testcases(self, raw_text: str) -> tuple[dict, list, list]:
+        """
+        Request body, basic validation and business logic cases of a response.
+        Raises `ValueError` when one of them is missing.
+        """
+        generated_testcases = self.extract_clean_json_from_text(raw_text)
+        request_body = generated_testcases.get("request_body", None)
+        testcases = generated_testcases.get("testcases", None)
+        if request_body is None or testcases is None:
+            raise ValueError(
+                "Generated testcases missing 'request_body' or 'testcases'"
+            )
+        basic_validation_cases = testcases.get("basic_validation", None)
+        business_logic_cases = testcases.get("business_logic", None)
+
+        if basic_validation_cases is None or business_logic_cases is None:
+            raise ValueError(
+                "Generated testcases missing 'basic_validation' or 'business_logic' cases"
+            )
+
+        return request_body, basic_validation_cases, business_logic_cases
+
+    def _get_human(self, state: TestcasesGenStateModel) -> str:
+        all_fr_infos = state.extra_parameters["all_fr_infos"]
+        current_fr_index = state.extra_parameters.get("current_fr_index", -1)
+        current_fr = all_fr_infos[current_fr_index]
+
+        self.set_system_lang(state.lang)
+        return state.extra_parameters["standardized_documents"][current_fr.fr_info_id]
+
     @validate_call
     def __call__(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
-        lang = state.lang
+        _, parsed = self.run_until_valid(
+            human=self._get_human(state), parse=self.parse_testcases
+        )
+        return self._update_state(state, *parsed)
 
+    @validate_call
+    async def acall(self, state: TestcasesGenStateModel) -> Dict[str, Any]:
+        _, parsed = await self.arun_until_valid(
+            human=self._get_human(state), parse=self.parse_testcases
+        )
+        return self._update_state(state, *parsed)
+
+    def _update_state(
+        self,
+        state: TestcasesGenStateModel,
+        request_body: dict,
+        basic_validation_cases: list,
+        business_logic_cases: list,
+    ) -> TestcasesGenStateModel:
         all_fr_infos = state.extra_parameters["all_fr_infos"]
         current_fr_index = state.extra_parameters.get("current_fr_index", -1)
         current_fr = all_fr_infos[current_fr_index]
         api_info = state.test_case_infos[current_fr.fr_info_id]["api_info"]
 
-        standardized_documents = state.extra_parameters["standardized_documents"][
-            current_fr.fr_info_id
-        ]
-        self.set_system_lang(lang)
-
-        no_cache = False
-        retry_count = 0
-        while True:
-            generated_testcases = self.run(
-                human=standardized_documents, no_cache=no_cache
-            ).content
-
-            logger.debug(f"Generated Testcases Raw Output: \n{generated_testcases}")
-
-            try:
-                generated_testcases = self.extract_clean_json_from_text(
-                    generated_testcases
-                )
-                request_body = generated_testcases.get("request_body", None)
-                testcases = generated_testcases.get("testcases", None)
-                if request_body is None or testcases is None:
-                    raise ValueError(
-                        "Generated testcases missing 'request_body' or 'testcases'"
-                    )
-                basic_validation_cases = testcases.get("basic_validation", None)
-                business_logic_cases = testcases.get("business_logic", None)
-
-                if basic_validation_cases is None or business_logic_cases is None:
-                    raise ValueError(
-                        "Generated testcases missing 'basic_validation' or 'business_logic' cases"
-                    )
-
-                break
-            except Exception as e:
-                no_cache = True
-                retry_count += 1
-
-                if retry_count > 3:
-                    raise e
-
-                logger.warning(f"Test case generation error: {e}. Retrying...")
-                continue
-
         test_suite = repositories.TestSuiteRepository(
             fr_info_id=current_fr.fr_info_id,
             test_suite_name=current_fr.fr_group,
@@ -1,4 +1,6 @@
 # src.graph.nodes.text_extractor.text_extractor
+import threading
+
 from docling.datamodel.accelerator_options import (
     AcceleratorDevice,
     AcceleratorOptions,
@@ -52,6 +54,9 @@ class TextExtractorNode(BaseAgentService):
                 )
             }
         )
+        # The node is shared by concurrent runs, its models convert one
+        # document at a time
+        self.__converter_lock = threading.Lock()
 
         self.__text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size,
@@ -68,15 +73,16 @@ class TextExtractorNode(BaseAgentService):
 
         chunks = self.__text_splitter.split_text(text)
 
-        responses = self.runs_parallel(chunks, batch_size=self.batch_size)
+        responses = self.runs(chunks, batch_size=self.batch_size)
 
-        corrected_text += "\n".join(responses)
+        corrected_text += "\n".join(response.content for response in responses)
 
         return corrected_text
 
     @cache.cache_func_wrapper
     def __extract(self, data):
-        conversion_result = self.__converter.convert(data)
+        with self.__converter_lock:
+            conversion_result = self.__converter.convert(data)
         doc = conversion_result.document
 
         text = doc.export_to_text()
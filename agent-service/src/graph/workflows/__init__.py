@@ -1,5 +1,6 @@
 # ruff: noqa # disable ruff validate
 from src.graph.workflows.docs_preprocessing import DocsPreprocessingWorkflow
 from .testcase_generation import TestCaseGenerationWorkflow
+from .workflow_registry import get_workflow, preload_workflows
 
 # from src.graph.workflows.simple_qa import SimpleQAWorkflow
@@ -1,35 +1,20 @@
-from typing import Optional
-
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END
 from pydantic import BaseModel, Field
 
+from src.base.workflow.base_workflow import BaseWorkflow
 from src.graph import nodes
 from src.models import DocsPreProcessingStateModel
 
 
-class DocsPreprocessingWorkflow(BaseModel):
+class DocsPreprocessingWorkflow(BaseWorkflow):
     agent_state: BaseModel = Field(
         default=DocsPreProcessingStateModel,
         description="State of the AI agent, including user input and intent",
     )
-    # These fields will be set during initialization
-    workflow: Optional[StateGraph] = Field(default=None, exclude=True)
-    graph: Optional[object] = Field(default=None, exclude=True)
-
-    class Config:
-        arbitrary_types_allowed = True
-        validate_assignment = True
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        self._setup_workflow()
-
-    def _setup_workflow(self):
-        """Initialize and configure the workflow graph"""
-        self.workflow = StateGraph(self.agent_state)
-        self._add_nodes()
-        self._setup_edges()
-        self.graph = self.workflow.compile()
+    # The extracted text is only read by the normalization
+    transient_parameters: dict[str, str] = Field(
+        default={"extracted_text": "normalized_text"}
+    )
 
     def _add_nodes(self):
         """Add all nodes to the workflow"""
@@ -44,11 +29,11 @@ class DocsPreprocessingWorkflow(BaseModel):
         )
         self.workflow.add_node(
             "text_extractor",
-            nodes.TextExtractorNode(),
+            nodes.TextExtractorNode().as_node(),
         )
         self.workflow.add_node(
             "document_description",
-            nodes.DocumentDescriptionNode(),
+            nodes.DocumentDescriptionNode().as_node(),
         )
 
     def _setup_edges(self):
@@ -58,34 +43,3 @@ class DocsPreprocessingWorkflow(BaseModel):
         self.workflow.add_edge("document_normalization", "document_description")
         self.workflow.add_edge("document_description", "document_chunking")
         self.workflow.add_edge("document_chunking", END)
-
-    def get_graph(self):
-        """Get the compiled graph"""
-        return self.graph
-
-    def invoke(self, input_data) -> DocsPreProcessingStateModel:
-        """Execute the agent workflow"""
-        if not self.graph:
-            raise ValueError(
-                "Graph not initialized. Please ensure workflow setup is complete."
-            )
-        return self.graph.invoke(input_data)
-
-    def stream(self, input_data):
-        """Stream the agent workflow execution"""
-        if not self.graph:
-            raise ValueError(
-                "Graph not initialized. Please ensure workflow setup is complete."
-            )
-        return self.graph.stream(input_data)
-
-    def reset_workflow(self):
-        """Reset and reinitialize the workflow"""
-        self._setup_workflow()
-
-    def update_config(self, **kwargs):
-        """Update configuration and reinitialize workflow"""
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-        self._setup_workflow()
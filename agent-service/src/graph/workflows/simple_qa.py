@@ -1,36 +1,17 @@
-from typing import Optional
-
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END
 from langgraph.prebuilt import ToolNode
 from pydantic import BaseModel, Field
 
+from src.base.workflow.base_workflow import BaseWorkflow
 from src.graph import actions, nodes, tools
 from src.models import DocsPreProcessingStateModel
 
 
-class SimpleQAWorkflow(BaseModel):
+class SimpleQAWorkflow(BaseWorkflow):
     agent_state: BaseModel = Field(
         default=DocsPreProcessingStateModel,
         description="State of the AI agent, including user input and intent",
     )
-    # These fields will be set during initialization
-    workflow: Optional[StateGraph] = Field(default=None, exclude=True)
-    graph: Optional[object] = Field(default=None, exclude=True)
-
-    class Config:
-        arbitrary_types_allowed = True
-        validate_assignment = True
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        self._setup_workflow()
-
-    def _setup_workflow(self):
-        """Initialize and configure the workflow graph"""
-        self.workflow = StateGraph(self.agent_state)
-        self._add_nodes()
-        self._setup_edges()
-        self.graph = self.workflow.compile()
 
     def _add_nodes(self):
         """Add all nodes to the workflow"""
@@ -65,34 +46,3 @@ class SimpleQAWorkflow(BaseModel):
             },
         )
         self.workflow.add_edge("document_tool", "simple_qa")
-
-    def get_graph(self):
-        """Get the compiled graph"""
-        return self.graph
-
-    def invoke(self, input_data):
-        """Execute the agent workflow"""
-        if not self.graph:
-            raise ValueError(
-                "Graph not initialized. Please ensure workflow setup is complete."
-            )
-        return self.graph.invoke(input_data)
-
-    def stream(self, input_data):
-        """Stream the agent workflow execution"""
-        if not self.graph:
-            raise ValueError(
-                "Graph not initialized. Please ensure workflow setup is complete."
-            )
-        return self.graph.stream(input_data)
-
-    def reset_workflow(self):
-        """Reset and reinitialize the workflow"""
-        self._setup_workflow()
-
-    def update_config(self, **kwargs):
-        """Update configuration and reinitialize workflow"""
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-        self._setup_workflow()
@@ -0,0 +1,39 @@
+import threading
+from typing import Type, TypeVar
+
+from src.base.workflow.base_workflow import BaseWorkflow
+from src.settings import logger
+
+WorkflowT = TypeVar("WorkflowT", bound=BaseWorkflow)
+
+# One compiled instance per workflow class, shared by every request of the
+# process. Its nodes keep no per-request state.
+_workflows: dict[type, BaseWorkflow] = {}
+_lock = threading.Lock()
+
+
+def get_workflow(workflow_class: Type[WorkflowT]) -> WorkflowT:
+    """Process-wide instance of `workflow_class`, built on first use."""
+    workflow = _workflows.get(workflow_class)
+    if workflow is not None:
+        return workflow
+
+    # Built once even when the first requests arrive together
+    with _lock:
+        workflow = _workflows.get(workflow_class)
+        if workflow is None:
+            logger.info(f"Building workflow {workflow_class.__name__}")
+            workflow = _workflows[workflow_class] = workflow_class()
+    return workflow
+
+
+def preload_workflows(*workflow_classes: Type[BaseWorkflow]):
+    """
+    Build the workflows before the first request. A workflow that fails to
+    build is logged and built again on first use.
+    """
+    for workflow_class in workflow_classes:
+        try:
+            get_workflow(workflow_class)
+        except Exception:
+            logger.exception(f"Failed to preload workflow {workflow_class.__name__}")
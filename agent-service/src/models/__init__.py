@@ -16,4 +16,10 @@ from .test_entity.test_case_report_model import (
 )
 from .test_entity.test_suite_model import TestSuiteModel
 from .test_entity.test_suite_report_model import TestSuiteReportModel
+from .test_entity.test_generation_run_model import TestGenerationRunModel
+from .test_entity.load_test_report_model import (
+    LoadTestConfigModel,
+    LoadTestReportModel,
+)
 from .project.project_model import ProjectModel
+from .job.job_model import JobModel
@@ -1,10 +1,17 @@
-from typing import Any
+from typing import Annotated, Any, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from src.enums.enums import LanguageEnum
 
 
+def merge_test_case_infos(
+    left: dict[str, Any], right: dict[str, Any]
+) -> dict[str, Any]:
+    """Combine the test case infos of FR groups generated in parallel."""
+    return {**left, **right}
+
+
 class TestcasesGenStateModel(BaseModel):
     """
     Represents the state of an AI agent, including its name, description, and current status.
@@ -19,7 +26,12 @@ class TestcasesGenStateModel(BaseModel):
         description="Language of the document",
     )
 
-    test_case_infos: dict[str, Any] = Field(
+    run_id: Optional[str] = Field(
+        default=None,
+        description="Generation run recording the status of each FR group, FR groups it already completed are skipped.",
+    )
+
+    test_case_infos: Annotated[dict[str, Any], merge_test_case_infos] = Field(
         default_factory=dict,
         description="List of generated test cases mapped by functional requirement",
     )
@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+from src.settings import get_now_vn
+
+
+class JobModel(SQLModel):
+    """A long-running task run by the job workers, and how far it got."""
+
+    job_id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        description="Job ID, must be unique.",
+        max_length=64,
+        primary_key=True,
+    )
+
+    job_type: str = Field(
+        description="What the job runs. (e.g., test_generation, test_execution, load_test)",
+        max_length=32,
+        index=True,
+    )
+
+    status: str = Field(
+        default="queued",
+        description="Status of the job. (e.g., queued, running, completed, failed, cancelled)",
+        max_length=32,
+        index=True,
+    )
+
+    priority: int = Field(
+        default=0,
+        description="Queued jobs with a higher priority are started first.",
+    )
+
+    payload: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description="Arguments of the job, given to its handler.",
+    )
+
+    progress: float = Field(
+        default=0.0,
+        description="Percent of the job done, 100 once it completed.",
+    )
+
+    node_timings: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description="Step (workflow node) -> runs, total and max seconds from scheduled to done.",
+    )
+
+    result: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description="Where the results are, e.g. the generation run or suite report ID.",
+    )
+
+    error: Optional[str] = Field(
+        default=None,
+        description="Error the job failed with.",
+    )
+
+    worker_id: Optional[str] = Field(
+        default=None,
+        description="Worker running the job, unset while it is queued.",
+        max_length=128,
+    )
+
+    attempts: int = Field(
+        default=0,
+        description="Times a worker started the job, more than 1 once resumed after a worker died.",
+    )
+
+    created_at: datetime = Field(
+        default_factory=get_now_vn,
+        description="Creation timestamp",
+    )
+
+    started_at: Optional[datetime] = Field(
+        default=None,
+        description="Time a worker last started the job.",
+    )
+
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="Time the job finished, unset while it is queued or running.",
+    )
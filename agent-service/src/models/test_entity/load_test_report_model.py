@@ -0,0 +1,106 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from pydantic import model_validator
+from sqlmodel import Field, SQLModel
+
+from src.settings import get_now_vn
+
+# Requests a load test may send, whatever its model; the latencies of all of
+# them are kept for the percentiles
+MAX_LOAD_TEST_REQUESTS = 1_000_000
+
+
+class LoadTestConfigModel(SQLModel):
+    """Parameters of a load-test run."""
+
+    duration_seconds: float = Field(
+        default=60,
+        gt=0,
+        le=3600,
+        description="How long the selected requests are replayed.",
+    )
+
+    target_rps: Optional[float] = Field(
+        default=None,
+        gt=0,
+        le=10000,
+        description="Requests per second to send (open model). "
+        "When unset, `concurrency` virtual users send back-to-back (closed model).",
+    )
+
+    concurrency: int = Field(
+        default=10,
+        ge=1,
+        le=1024,
+        description="Virtual users, or the in-flight cap when `target_rps` is set.",
+    )
+
+    @model_validator(mode="after")
+    def check_budget(self):
+        if (
+            self.target_rps
+            and self.target_rps * self.duration_seconds > MAX_LOAD_TEST_REQUESTS
+        ):
+            raise ValueError(
+                f"A load test may send at most {MAX_LOAD_TEST_REQUESTS:,} requests."
+            )
+        return self
+
+
+class LoadTestReportModel(SQLModel):
+    """Latency and error statistics of one endpoint during a load-test run."""
+
+    id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        description="Load Test Report ID, must be unique.",
+        max_length=64,
+        primary_key=True,
+    )
+
+    test_suite_report_id: str = Field(
+        description="Test Suite Report ID of the run.",
+        max_length=64,
+        foreign_key="test_suite_report.id",
+    )
+
+    endpoint: str = Field(
+        description="HTTP method and URL (without query) of the endpoint.",
+        max_length=1024,
+    )
+
+    total_requests: int = Field(
+        description="Number of requests sent to the endpoint.",
+    )
+
+    error_requests: int = Field(
+        description="Requests that raised or did not return the expected status code.",
+    )
+
+    error_rate: float = Field(
+        description="error_requests / total_requests.",
+    )
+
+    throughput_rps: float = Field(
+        description="Completed requests per second over the run duration.",
+    )
+
+    latency_mean_ms: float = Field(description="Mean latency in milliseconds.")
+    latency_p50_ms: float = Field(description="Median latency in milliseconds.")
+    latency_p90_ms: float = Field(
+        description="90th percentile latency in milliseconds."
+    )
+    latency_p99_ms: float = Field(
+        description="99th percentile latency in milliseconds."
+    )
+    latency_max_ms: float = Field(description="Maximum latency in milliseconds.")
+
+    duration_seconds: float = Field(
+        description="Measured duration of the run in seconds.",
+    )
+
+    created_at: datetime = Field(
+        default_factory=get_now_vn,
+        description="Creation timestamp",
+    )
@@ -88,3 +88,19 @@ class TestCaseModel(SQLModel):
         default=False,
         description="Indicates whether the test case should be executed.",
     )
+
+    depends_on: list = Field(
+        default_factory=list,
+        sa_column=Column(JSON),
+        description="IDs of the test cases that have to pass before this one runs.",
+    )
+
+    extract: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description=(
+            "Variables to read from the response for dependent test cases, "
+            "name -> response path (e.g. $.data.token) or header:<name>. "
+            "They are used as {{name}} in the URL, headers and request body."
+        ),
+    )
@@ -59,6 +59,12 @@ class TestCaseReportModel(SQLModel):
         max_length=128,
     )
 
+    assertion_results: list = Field(
+        default_factory=list,
+        sa_column=Column(JSON),
+        description="Result of every response_mapping assertion (path, expected, passed, actual).",
+    )
+
     start_time: datetime = Field(
         description="Start time of the test case execution.",
     )
@@ -67,6 +73,13 @@ class TestCaseReportModel(SQLModel):
         description="End time of the test case execution.",
     )
 
+    timings: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description="Monotonic timing breakdown of the request in milliseconds "
+        "(wait, connect, tls, send, ttfb, download, total, overhead).",
+    )
+
 
 class TestCaseReportReadModel(TestCaseReportModel):
 
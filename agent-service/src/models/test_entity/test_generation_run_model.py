@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+from src.enums.enums import LanguageEnum
+from src.settings import get_now_vn
+
+
+class TestGenerationRunModel(SQLModel):
+    """One test case generation run of a project, and how far each FR group got."""
+
+    run_id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        description="Generation run ID, must be unique.",
+        max_length=64,
+        primary_key=True,
+    )
+
+    project_id: str = Field(
+        description="Project the test cases are generated for.",
+        max_length=64,
+        foreign_key="project.project_id",
+    )
+
+    lang: str = Field(
+        default=LanguageEnum.EN.value,
+        description="Language of the document, used again when the run is resumed.",
+        max_length=8,
+    )
+
+    status: str = Field(
+        default="running",
+        description="Status of the run. (e.g., running, completed, failed)",
+        max_length=32,
+    )
+
+    fr_statuses: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description="fr_info_id -> status (pending, completed, failed), test_suite_id and error of each FR group.",
+    )
+
+    created_at: datetime = Field(
+        default_factory=get_now_vn,
+        description="Creation timestamp",
+    )
+
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="Time the run finished, unset while it is running.",
+    )
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
+from typing import Optional
 
+from sqlalchemy import JSON, Column
 from sqlmodel import Field, SQLModel
 
 from src.settings import get_now_vn
@@ -23,7 +25,67 @@ class TestSuiteReportModel(SQLModel):
         # unique=True,
     )
 
+    parent_report_id: Optional[str] = Field(
+        default=None,
+        description="Report this run re-executes the unsuccessful test cases of.",
+        max_length=64,
+        foreign_key="test_suite_report.id",
+    )
+
     created_at: datetime = Field(
         default_factory=get_now_vn,
         description="Creation timestamp",
     )
+
+    mode: str = Field(
+        default="functional",
+        description="Execution mode of the run. (e.g., functional, load)",
+        max_length=32,
+    )
+
+    seed: Optional[int] = Field(
+        default=None,
+        description="Seed of the random request body placeholders, a re-run uses it again.",
+    )
+
+    status: str = Field(
+        default="running",
+        description="Status of the suite execution. (e.g., running, completed, failed)",
+        max_length=32,
+    )
+
+    total_test_cases: int = Field(
+        default=0,
+        description="Number of test cases selected for the execution.",
+    )
+
+    passed_test_cases: int = Field(
+        default=0,
+        description="Number of executed test cases that passed so far.",
+    )
+
+    failed_test_cases: int = Field(
+        default=0,
+        description="Number of executed test cases that failed so far.",
+    )
+
+    errored_test_cases: int = Field(
+        default=0,
+        description="Number of executed test cases that raised an error so far.",
+    )
+
+    skipped_test_cases: int = Field(
+        default=0,
+        description="Number of test cases skipped so far, e.g. as a prerequisite did not pass.",
+    )
+
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="Time the execution finished, unset while it is running.",
+    )
+
+    timing_summary: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON),
+        description="Mean/p50/p95/max of every request timing phase in milliseconds.",
+    )
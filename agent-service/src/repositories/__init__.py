@@ -6,6 +6,7 @@ from .document.document_content_repository import (
     DocumentContentRepository,
 )
 from .project.project_repository import ProjectRepository
+from .agent.semantic_cache_repository import SemanticCacheRepository
 from .document.document_fr_info_repository import (
     DocumentFRInfoRepository,
 )
@@ -17,3 +18,8 @@ from .test_entity.test_case_repository import TestCaseRepository
 from .test_entity.test_suite_repository import TestSuiteRepository
 from .test_entity.test_case_report_repository import TestCaseReportRepository
 from .test_entity.test_suite_report_repository import TestSuiteReportRepository
+from .test_entity.load_test_report_repository import LoadTestReportRepository
+from .test_entity.test_generation_run_repository import (
+    TestGenerationRunRepository,
+)
+from .job.job_repository import JobRepository
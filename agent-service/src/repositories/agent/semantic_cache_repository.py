@@ -0,0 +1,98 @@
+# src.repositories.agent.semantic_cache_repository
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, Index, LargeBinary, delete
+from sqlmodel import Field, Session, SQLModel, select
+
+from src.settings import EMBEDDING_DIM, get_db_engine, get_now_vn
+
+
+class SemanticCacheRepository(SQLModel, table=True):
+    """LLM responses of agent services, looked up by prompt similarity."""
+
+    __tablename__ = "semantic_cache"
+    # Vectors this wide cannot be indexed, a lookup scans the live entries of
+    # its scope
+    __table_args__ = (
+        Index("ix_semantic_cache_scope_created_at", "scope", "created_at"),
+    )
+
+    entry_id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        max_length=64,
+        primary_key=True,
+    )
+
+    scope: str = Field(
+        description="agent service, its settings, system prompt and chat history the response applies to.",
+        max_length=256,
+    )
+
+    prompt: str = Field(description="final human message of the cached call.")
+
+    vector: list[float] = Field(
+        sa_column=Column(Vector(EMBEDDING_DIM)),
+        description="embedding of the prompt.",
+    )
+
+    response: bytes = Field(
+        sa_column=Column(LargeBinary, nullable=False),
+        description="serialized response, see src.cache.serialization.",
+    )
+
+    created_at: datetime = Field(
+        default_factory=get_now_vn,
+        description="Creation timestamp",
+        index=True,
+    )
+
+    def create(self):
+        with Session(get_db_engine()) as session:
+            session.add(self)
+            session.commit()
+            session.refresh(self)
+
+        return self
+
+    @classmethod
+    def get_nearest(
+        cls,
+        scope: str,
+        vector: list[float],
+        max_age: int,
+        session: Optional[Session] = None,
+    ) -> Optional[tuple["SemanticCacheRepository", float]]:
+        """
+        Entry of `scope` closest to `vector`, newer than `max_age` seconds,
+        with its cosine distance.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            distance = cls.vector.cosine_distance(vector)
+            statement = (
+                select(cls, distance)
+                .where(cls.scope == scope)
+                .where(cls.created_at >= get_now_vn() - timedelta(seconds=max_age))
+                .order_by(distance)
+                .limit(1)
+            )
+            result = session.exec(statement).first()
+            return tuple(result) if result else None
+
+    @classmethod
+    def delete_expired(cls, max_age: int, session: Optional[Session] = None) -> int:
+        """Delete the entries older than `max_age` seconds, returns how many."""
+        session = session or Session(get_db_engine())
+
+        with session:
+            result = session.exec(
+                delete(cls).where(
+                    cls.created_at < get_now_vn() - timedelta(seconds=max_age)
+                )
+            )
+            session.commit()
+            return result.rowcount
@@ -0,0 +1,167 @@
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from src.models import JobModel
+from src.settings import get_db_engine, get_now_vn
+
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobRepository(JobModel, table=True):
+    """Repository for Job operations."""
+
+    __tablename__ = "job"
+
+    def create(self):
+        """
+        Add a new Job record to the database.
+        Returns:
+            JobRepository: The instance added to the database.
+        """
+        with Session(get_db_engine()) as session:
+            session.add(self)
+            session.commit()
+            session.refresh(self)
+
+        return self
+
+    @classmethod
+    def get_by_id(
+        cls,
+        job_id: str,
+        session: Optional[Session] = None,
+    ) -> Optional["JobRepository"]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            return session.get(cls, job_id)
+
+    @classmethod
+    def get_all(
+        cls,
+        job_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        session: Optional[Session] = None,
+    ) -> list["JobRepository"]:
+        """Latest jobs first, optionally of one type and status."""
+        session = session or Session(get_db_engine())
+
+        statement = select(cls)
+        if job_type is not None:
+            statement = statement.where(cls.job_type == job_type)
+        if status is not None:
+            statement = statement.where(cls.status == status)
+        statement = statement.order_by(cls.created_at.desc()).limit(limit)
+
+        with session:
+            return list(session.exec(statement).all())
+
+    @classmethod
+    def get_all_by_status(
+        cls,
+        status: str,
+        session: Optional[Session] = None,
+    ) -> list["JobRepository"]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            return list(session.exec(select(cls).where(cls.status == status)).all())
+
+    @classmethod
+    def _set_status(
+        cls,
+        job_id: str,
+        from_statuses: tuple[str, ...],
+        session: Optional[Session] = None,
+        **fields,
+    ) -> Optional["JobRepository"]:
+        """
+        Update a job still in one of `from_statuses`. The row is locked, so
+        of two workers racing for the same job only one gets it.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            job = session.exec(
+                select(cls).where(cls.job_id == job_id).with_for_update()
+            ).first()
+            if job is None or job.status not in from_statuses:
+                return None
+
+            for key, value in fields.items():
+                setattr(job, key, value)
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    @classmethod
+    def start(cls, job_id: str, worker_id: str) -> Optional["JobRepository"]:
+        """Hand a queued job to `worker_id`, None if it is not queued anymore."""
+        job = cls.get_by_id(job_id=job_id)
+        if job is None:
+            return None
+
+        return cls._set_status(
+            job_id,
+            ("queued",),
+            status="running",
+            worker_id=worker_id,
+            attempts=job.attempts + 1,
+            started_at=get_now_vn(),
+        )
+
+    @classmethod
+    def requeue(cls, job_id: str) -> Optional["JobRepository"]:
+        """Queue a job again whose worker died while running it."""
+        return cls._set_status(job_id, ("running",), status="queued", worker_id=None)
+
+    @classmethod
+    def cancel(cls, job_id: str) -> Optional["JobRepository"]:
+        """Cancel a job that did not start yet."""
+        return cls._set_status(
+            job_id, ("queued",), status="cancelled", finished_at=get_now_vn()
+        )
+
+    @classmethod
+    def update_progress(
+        cls,
+        job_id: str,
+        progress: float,
+        node_timings: dict,
+        session: Optional[Session] = None,
+    ) -> None:
+        session = session or Session(get_db_engine())
+
+        with session:
+            job = session.get(cls, job_id)
+            if job is None:
+                return
+
+            job.progress = progress
+            # Reassigned, changes inside a JSON column are not tracked
+            job.node_timings = dict(node_timings)
+            session.add(job)
+            session.commit()
+
+    @classmethod
+    def finish(
+        cls,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> Optional["JobRepository"]:
+        """End a running job with `status`, merging `result` into its results."""
+        job = cls.get_by_id(job_id=job_id)
+        if job is None:
+            return None
+
+        fields = {"status": status, "error": error, "finished_at": get_now_vn()}
+        if status == "completed":
+            fields["progress"] = 100.0
+        if result:
+            fields["result"] = {**job.result, **result}
+        return cls._set_status(job_id, ("running",), **fields)
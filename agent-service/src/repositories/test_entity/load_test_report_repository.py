@@ -0,0 +1,29 @@
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from src.models import LoadTestReportModel
+from src.settings import get_db_engine
+
+
+class LoadTestReportRepository(LoadTestReportModel, table=True):
+    """Repository for Load Test Report operations."""
+
+    __tablename__ = "load_test_report"
+
+    @classmethod
+    def get_all_by_test_suite_report_id(
+        cls,
+        test_suite_report_id: str,
+        session: Optional[Session] = None,
+    ) -> list["LoadTestReportRepository"]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = (
+                select(cls)
+                .where(cls.test_suite_report_id == test_suite_report_id)
+                .order_by(cls.endpoint)
+            )
+            results = session.exec(statement).all()
+        return results
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import joinedload
 from sqlmodel import Relationship, Session, select
 
@@ -15,6 +16,28 @@ class TestCaseReportRepository(TestCaseReportModel, table=True):
 
     test_case: TestCaseRepository = Relationship()
 
+    @classmethod
+    def bulk_insert(
+        cls,
+        reports: list["TestCaseReportRepository"],
+        session: Optional[Session] = None,
+    ) -> None:
+        """
+        Insert many reports with a single executemany INSERT.
+        Skips the ORM unit of work, so the instances are not attached to the session.
+        """
+        if not reports:
+            return
+
+        session = session or Session(get_db_engine())
+
+        with session:
+            session.execute(
+                insert(cls),
+                [report.model_dump(exclude={"test_case"}) for report in reports],
+            )
+            session.commit()
+
     @classmethod
     def get_all_by_test_suite_report_id(
         cls,
@@ -36,3 +59,86 @@ class TestCaseReportRepository(TestCaseReportModel, table=True):
         for result in results_set:
             results.append(TestCaseReportReadModel.model_validate(result))
         return results
+
+    @classmethod
+    def get_all_previous(
+        cls,
+        test_suite_report_id: str,
+        session: Optional[Session] = None,
+    ) -> list["TestCaseReportRepository"]:
+        """
+        Reports already written in a suite report, to resume it from. Unlike
+        `get_all_by_test_suite_report_id`, without their test cases.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = select(cls).where(
+                cls.test_suite_report_id == test_suite_report_id
+            )
+            return list(session.exec(statement).all())
+
+    @classmethod
+    def get_all_by_test_case_ids(
+        cls,
+        test_suite_report_id: str,
+        test_case_ids: list[str],
+        session: Optional[Session] = None,
+    ) -> list["TestCaseReportRepository"]:
+        """Reports already written in a suite report for `test_case_ids`."""
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = select(cls).where(
+                cls.test_suite_report_id == test_suite_report_id,
+                cls.test_case_id.in_(test_case_ids),
+            )
+            return list(session.exec(statement).all())
+
+    @classmethod
+    def get_statuses_by_test_suite_report_id(
+        cls,
+        test_suite_report_id: str,
+        session: Optional[Session] = None,
+    ) -> dict[str, str]:
+        """Map every test case of a suite report to the status it ended with."""
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = select(cls.test_case_id, cls.status).where(
+                cls.test_suite_report_id == test_suite_report_id
+            )
+            return dict(session.exec(statement).all())
+
+    @classmethod
+    def get_unsuccessful_test_case_ids(
+        cls,
+        test_suite_report_id: str,
+        session: Optional[Session] = None,
+    ) -> list[str]:
+        """
+        Test cases of a suite report that did not pass: failed, ended with an
+        error, or were skipped as a prerequisite did not pass.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = select(cls.test_case_id).where(
+                (cls.test_suite_report_id == test_suite_report_id)
+                & (cls.status != "passed")
+            )
+            return list(session.exec(statement).all())
+
+    @classmethod
+    def get_timings_by_test_suite_report_id(
+        cls,
+        test_suite_report_id: str,
+        session: Optional[Session] = None,
+    ) -> list[dict]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = select(cls.timings).where(
+                cls.test_suite_report_id == test_suite_report_id
+            )
+            return list(session.exec(statement).all())
@@ -29,6 +29,19 @@ class TestCaseRepository(TestCaseModel, table=True):
             results = session.exec(statement).all()
         return results
 
+    @classmethod
+    def get_all_by_ids(
+        cls,
+        test_case_ids: list[str],
+        session: Optional[Session] = None,
+    ) -> list["TestCaseRepository"]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            statement = select(cls).where(cls.id.in_(test_case_ids))
+            results = session.exec(statement).all()
+        return results
+
     @classmethod
     def select_for_execution(
         cls, test_case_ids: list[str], execute: bool, session: Optional[Session] = None
@@ -48,3 +61,24 @@ class TestCaseRepository(TestCaseModel, table=True):
             logging.info(f"Selecting {len(results)} test cases for execution={execute}")
 
             return results
+
+    @classmethod
+    def set_dependencies(
+        cls,
+        test_case_id: str,
+        depends_on: list[str],
+        extract: dict,
+        session: Optional[Session] = None,
+    ) -> Optional["TestCaseRepository"]:
+        session = session or Session(get_db_engine())
+        with session:
+            test_case = session.get(cls, test_case_id)
+            if test_case is None:
+                return None
+
+            test_case.depends_on = depends_on
+            test_case.extract = extract
+            session.add(test_case)
+            session.commit()
+            session.refresh(test_case)
+            return test_case
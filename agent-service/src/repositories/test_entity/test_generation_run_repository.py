@@ -0,0 +1,143 @@
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from src.models import TestGenerationRunModel
+from src.settings import get_db_engine, get_now_vn
+
+
+class TestGenerationRunRepository(TestGenerationRunModel, table=True):
+    """Repository for Test Generation Run operations."""
+
+    __tablename__ = "test_generation_run"
+
+    def create(self):
+        """
+        Add a new Test Generation Run record to the database.
+        Returns:
+            TestGenerationRunRepository: The instance added to the database.
+        """
+        with Session(get_db_engine()) as session:
+            session.add(self)
+            session.commit()
+            session.refresh(self)
+
+        return self
+
+    def get_completed_fr_info_ids(self) -> set[str]:
+        return {
+            fr_info_id
+            for fr_info_id, fr_status in self.fr_statuses.items()
+            if fr_status["status"] == "completed"
+        }
+
+    @classmethod
+    def get_by_id(
+        cls,
+        run_id: str,
+        session: Optional[Session] = None,
+    ) -> Optional["TestGenerationRunRepository"]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            return session.get(cls, run_id)
+
+    @classmethod
+    def start(
+        cls,
+        run_id: str,
+        fr_info_ids: list[str],
+        session: Optional[Session] = None,
+    ) -> Optional["TestGenerationRunRepository"]:
+        """
+        Mark the run as running again, with `fr_info_ids` pending unless
+        they were already completed by an earlier attempt.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            run = session.exec(
+                select(cls).where(cls.run_id == run_id).with_for_update()
+            ).first()
+            if run is None:
+                return None
+
+            fr_statuses = dict(run.fr_statuses)
+            for fr_info_id in fr_info_ids:
+                if fr_statuses.get(fr_info_id, {}).get("status") != "completed":
+                    fr_statuses[fr_info_id] = {"status": "pending"}
+
+            run.fr_statuses = fr_statuses
+            run.status = "running"
+            run.finished_at = None
+            session.add(run)
+            session.commit()
+            session.refresh(run)
+            return run
+
+    @classmethod
+    def set_fr_status(
+        cls,
+        run_id: str,
+        fr_info_id: str,
+        status: str,
+        test_suite_id: Optional[str] = None,
+        error: Optional[str] = None,
+        session: Optional[Session] = None,
+    ) -> None:
+        """
+        Record how an FR group ended. The row is locked while it is updated,
+        so FR groups finishing at the same time never lose each other's status.
+        """
+        session = session or Session(get_db_engine())
+
+        fr_status = {"status": status}
+        if test_suite_id is not None:
+            fr_status["test_suite_id"] = test_suite_id
+        if error is not None:
+            fr_status["error"] = error
+
+        with session:
+            run = session.exec(
+                select(cls).where(cls.run_id == run_id).with_for_update()
+            ).first()
+            if run is None:
+                return
+
+            # Reassigned, changes inside a JSON column are not tracked
+            run.fr_statuses = {**run.fr_statuses, fr_info_id: fr_status}
+            session.add(run)
+            session.commit()
+
+    @classmethod
+    def finish(
+        cls,
+        run_id: str,
+        status: Optional[str] = None,
+        session: Optional[Session] = None,
+    ) -> Optional["TestGenerationRunRepository"]:
+        """
+        End the run with `status`, by default completed when every FR group
+        is and failed otherwise.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            run = session.exec(
+                select(cls).where(cls.run_id == run_id).with_for_update()
+            ).first()
+            if run is None:
+                return None
+
+            fr_statuses = run.fr_statuses.values()
+            if status is not None:
+                run.status = status
+            elif all(fr_status["status"] == "completed" for fr_status in fr_statuses):
+                run.status = "completed"
+            else:
+                run.status = "failed"
+            run.finished_at = get_now_vn()
+            session.add(run)
+            session.commit()
+            session.refresh(run)
+            return run
@@ -1,10 +1,10 @@
 from typing import Optional
 
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update
 
 from src import repositories
 from src.models import TestSuiteReportModel
-from src.settings import get_db_engine
+from src.settings import get_db_engine, get_now_vn
 
 
 class TestSuiteReportRepository(TestSuiteReportModel, table=True):
@@ -12,6 +12,19 @@ class TestSuiteReportRepository(TestSuiteReportModel, table=True):
 
     __tablename__ = "test_suite_report"
 
+    def create(self):
+        """
+        Add a new Test Suite Report record to the database.
+        Returns:
+            TestSuiteReportRepository: The instance added to the database.
+        """
+        with Session(get_db_engine()) as session:
+            session.add(self)
+            session.commit()
+            session.refresh(self)
+
+        return self
+
     @classmethod
     def get_all_by_project_id(
         cls,
@@ -38,3 +51,63 @@ class TestSuiteReportRepository(TestSuiteReportModel, table=True):
             )
             results = session.exec(statement).all()
             return results
+
+    @classmethod
+    def get_by_id(
+        cls,
+        test_suite_report_id: str,
+        session: Optional[Session] = None,
+    ) -> Optional["TestSuiteReportRepository"]:
+        session = session or Session(get_db_engine())
+
+        with session:
+            return session.get(cls, test_suite_report_id)
+
+    @classmethod
+    def increment_counters(
+        cls,
+        test_suite_report_id: str,
+        passed: int = 0,
+        failed: int = 0,
+        errored: int = 0,
+        skipped: int = 0,
+        session: Optional[Session] = None,
+    ) -> None:
+        """
+        Atomically add to the running counters of a report.
+        The increment happens in SQL so concurrent writers never lose updates.
+        """
+        session = session or Session(get_db_engine())
+
+        with session:
+            session.exec(
+                update(cls)
+                .where(cls.id == test_suite_report_id)
+                .values(
+                    passed_test_cases=cls.passed_test_cases + passed,
+                    failed_test_cases=cls.failed_test_cases + failed,
+                    errored_test_cases=cls.errored_test_cases + errored,
+                    skipped_test_cases=cls.skipped_test_cases + skipped,
+                )
+            )
+            session.commit()
+
+    @classmethod
+    def finish(
+        cls,
+        test_suite_report_id: str,
+        status: str = "completed",
+        timing_summary: Optional[dict] = None,
+        session: Optional[Session] = None,
+    ) -> None:
+        session = session or Session(get_db_engine())
+
+        values = {"status": status, "finished_at": get_now_vn()}
+        if timing_summary is not None:
+            values["timing_summary"] = timing_summary
+
+        with session:
+            session.exec(
+                update(cls).where(cls.id == test_suite_report_id).values(**values)
+            )
+            session.commit()
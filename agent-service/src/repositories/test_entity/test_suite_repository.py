@@ -12,6 +12,19 @@ class TestSuiteRepository(TestSuiteModel, table=True):
 
     __tablename__ = "test_suite"
 
+    def create_with_test_cases(
+        self, test_cases: list["repositories.TestCaseRepository"]
+    ) -> "TestSuiteRepository":
+        """Add the test suite and its test cases in one transaction."""
+        # Kept loaded, callers still read them once the session is closed
+        with Session(get_db_engine(), expire_on_commit=False) as session:
+            session.add(self)
+            session.flush()
+            session.add_all(test_cases)
+            session.commit()
+
+        return self
+
     @classmethod
     def get_all_by_project_id(
         cls,
@@ -0,0 +1,282 @@
+# src.services.job.job_handlers
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+from src import models, repositories
+from src.base.workflow.base_workflow import BaseWorkflow
+from src.enums.enums import JobTypeEnum
+from src.services.test_case.execute_test_case import execute_test_suite
+from src.services.test_case import execution_queue
+from src.services.test_case.execution_queue import enqueue_test_suite, get_counters_key
+from src.services.test_case.load_test import run_load_test
+from src.settings import EXECUTION_BACKEND, JOB_POLL_INTERVAL, get_redis_client, logger
+
+
+class JobContext:
+    """
+    What a job handler sees of its job: the payload, progress and step timing
+    reporting, and whether it was asked to stop. Progress never goes back.
+    """
+
+    def __init__(self, job: repositories.JobRepository):
+        self.job_id = job.job_id
+        self.payload = job.payload
+        self.progress = job.progress
+        self.node_timings = dict(job.node_timings)
+        # Set by the worker on a cancel request or when it stops, for the
+        # threads of the job; `interrupted` tells the latter apart
+        self.cancelled = threading.Event()
+        self.interrupted = False
+
+    def update(
+        self,
+        progress: Optional[float] = None,
+        node: Optional[str] = None,
+        seconds: Optional[float] = None,
+    ):
+        """Record progress and a finished step, callable from any thread."""
+        if progress is not None:
+            self.progress = max(self.progress, min(round(progress, 1), 99.9))
+        if node is not None:
+            timings = self.node_timings.get(node, {"runs": 0, "seconds": 0.0})
+            self.node_timings[node] = {
+                "runs": timings["runs"] + 1,
+                "seconds": round(timings["seconds"] + seconds, 3),
+                "max_seconds": round(max(timings.get("max_seconds", 0), seconds), 3),
+            }
+        repositories.JobRepository.update_progress(
+            job_id=self.job_id,
+            progress=self.progress,
+            node_timings=self.node_timings,
+        )
+
+    async def aupdate(self, **kwargs):
+        await asyncio.to_thread(self.update, **kwargs)
+
+    async def run_in_thread(self, func: Callable, /, *args, **kwargs):
+        """Run `func` in a thread, stopped through `cancelled` with the job."""
+        thread = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        try:
+            return await asyncio.shield(thread)
+        except asyncio.CancelledError:
+            await self.stop_thread(thread)
+            raise
+
+    async def stop_thread(self, thread: asyncio.Future):
+        """
+        Set `cancelled` and wait for `thread` to end. A thread cannot be
+        interrupted, and it must be done writing before the job is handed
+        to another worker.
+        """
+        self.cancelled.set()
+        while not thread.done():
+            try:
+                await asyncio.wait([thread])
+            except asyncio.CancelledError:
+                pass
+        if not thread.cancelled() and thread.exception() is not None:
+            logger.warning(
+                f"Thread of stopped job {self.job_id} failed: {thread.exception()!r}"
+            )
+
+    async def run_workflow(
+        self, workflow: BaseWorkflow, input_data, job_id: Optional[str] = None
+    ):
+        """
+        Run `workflow` checkpointed under `job_id`, timing every node from the
+        moment it is scheduled to its end. Progress is the share of finished
+        nodes among those scheduled, plus one per node not reached yet.
+        """
+        scheduled: dict[str, tuple[str, float]] = {}
+        reached, finished = set(), 0
+        node_count = workflow.get_node_count()
+
+        async for task in workflow.astream(
+            input_data, job_id=job_id, stream_mode="tasks"
+        ):
+            name = task["name"]
+            if "result" not in task and "error" not in task:
+                scheduled[task["id"]] = (name, time.monotonic())
+                reached.add(name)
+                continue
+
+            _, scheduled_at = scheduled.get(task["id"], (name, time.monotonic()))
+            finished += 1
+            expected = len(scheduled) + max(node_count - len(reached), 0)
+            await self.aupdate(
+                progress=100 * finished / max(expected, 1),
+                node=name,
+                seconds=time.monotonic() - scheduled_at,
+            )
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict]]
+
+
+async def run_test_generation(context: JobContext) -> dict:
+    # Imported here, the workflows load the agent nodes
+    from src.graph.workflows import TestCaseGenerationWorkflow, get_workflow
+
+    item = models.TestcasesGenStateModel(**context.payload)
+    try:
+        # Checkpointed under the run, a resumed run goes on from its last step
+        await context.run_workflow(
+            get_workflow(TestCaseGenerationWorkflow), item, job_id=item.run_id
+        )
+    except asyncio.CancelledError:
+        # Otherwise the worker is stopping, the run resumes with the requeued job
+        if not context.interrupted:
+            await asyncio.to_thread(
+                repositories.TestGenerationRunRepository.finish,
+                run_id=item.run_id,
+                status="cancelled",
+            )
+        raise
+    except Exception:
+        await asyncio.to_thread(
+            repositories.TestGenerationRunRepository.finish,
+            run_id=item.run_id,
+            status="failed",
+        )
+        raise
+    return {"run_id": item.run_id}
+
+
+async def _wait_for_shards(context: JobContext, test_suite_report_id: str):
+    """Follow the shards of a suite report run by the execution workers."""
+    redis_client = get_redis_client()
+    counters_key = get_counters_key(test_suite_report_id)
+    while True:
+        total, finished = await asyncio.to_thread(
+            redis_client.hmget, counters_key, "total", "finished"
+        )
+        total, finished = int(total or 0), int(finished or 0)
+        if finished >= total:
+            return
+        await context.aupdate(progress=100 * finished / total)
+        await asyncio.sleep(JOB_POLL_INTERVAL * 5)
+
+
+async def run_test_execution(context: JobContext) -> dict:
+    """
+    Execute a suite in a thread of its own, or through the execution queue.
+    A cancelled execution stops once its cases in flight are reported, an
+    interrupted one goes on into the same report when the job runs again.
+    The shards of a cancelled execution stop too, the last one finishes the
+    report; those of an interrupted one are left to the execution workers.
+    """
+    payload = context.payload
+    test_suite_report_id = payload["test_suite_report_id"]
+
+    if EXECUTION_BACKEND == "queue":
+        try:
+            shards = await context.run_in_thread(enqueue_test_suite, **payload)
+            if shards:
+                await _wait_for_shards(context, test_suite_report_id)
+        except asyncio.CancelledError:
+            # Requested along with the job's cancellation already, unless the
+            # worker was asked directly
+            if not context.interrupted:
+                await asyncio.to_thread(
+                    execution_queue.request_cancel, test_suite_report_id
+                )
+            raise
+        return {"test_suite_report_id": test_suite_report_id}
+
+    def _on_flush(reports: list):
+        # Counted on the report, it includes the cases of an earlier attempt
+        test_suite_report = repositories.TestSuiteReportRepository.get_by_id(
+            test_suite_report_id=test_suite_report_id
+        )
+        done = (
+            test_suite_report.passed_test_cases
+            + test_suite_report.failed_test_cases
+            + test_suite_report.errored_test_cases
+            + test_suite_report.skipped_test_cases
+        )
+        context.update(progress=100 * done / max(test_suite_report.total_test_cases, 1))
+
+    try:
+        await context.run_in_thread(
+            execute_test_suite,
+            **payload,
+            on_flush=_on_flush,
+            stop_event=context.cancelled,
+        )
+    except asyncio.CancelledError:
+        if not context.interrupted:
+            await asyncio.to_thread(
+                repositories.TestSuiteReportRepository.finish,
+                test_suite_report_id=test_suite_report_id,
+                status="cancelled",
+            )
+        raise
+    return {"test_suite_report_id": test_suite_report_id}
+
+
+async def run_load_test_job(context: JobContext) -> dict:
+    """Run a load test in a thread of its own, progress follows its duration."""
+    payload = context.payload
+    config = models.LoadTestConfigModel(**payload["config"])
+    load_test = asyncio.create_task(
+        asyncio.to_thread(
+            run_load_test,
+            test_suite_report_id=payload["test_suite_report_id"],
+            test_suite_id=payload["test_suite_id"],
+            config=config,
+            seed=payload.get("seed"),
+            stop_event=context.cancelled,
+        )
+    )
+
+    started_at = time.monotonic()
+    try:
+        while not load_test.done():
+            await asyncio.wait([load_test], timeout=JOB_POLL_INTERVAL * 5)
+            elapsed = time.monotonic() - started_at
+            await context.aupdate(progress=100 * elapsed / config.duration_seconds)
+    except asyncio.CancelledError:
+        await context.stop_thread(load_test)
+        # The load test ends its report as completed, with a cut short window
+        if not context.interrupted:
+            await asyncio.to_thread(
+                repositories.TestSuiteReportRepository.finish,
+                test_suite_report_id=payload["test_suite_report_id"],
+                status="cancelled",
+            )
+        raise
+    # Raises what the load test raised
+    await load_test
+    return {"test_suite_report_id": payload["test_suite_report_id"]}
+
+
+def fail_interrupted_load_test(job: repositories.JobRepository) -> None:
+    """
+    A load test measures a time window, run again it would not pick up where
+    it stopped: the job fails with its report instead.
+    """
+    job = repositories.JobRepository.finish(
+        job_id=job.job_id,
+        status="failed",
+        error="Interrupted by its job worker stopping",
+    )
+    if job is not None:
+        repositories.TestSuiteReportRepository.finish(
+            test_suite_report_id=job.payload["test_suite_report_id"],
+            status="failed",
+        )
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    JobTypeEnum.TEST_GENERATION.value: run_test_generation,
+    JobTypeEnum.TEST_EXECUTION.value: run_test_execution,
+    JobTypeEnum.LOAD_TEST.value: run_load_test_job,
+}
+
+# Job types that cannot be run again after their worker stopped or died, and
+# how to end such a job instead of queueing it again
+JOB_INTERRUPT_HANDLERS: dict[str, Callable[[repositories.JobRepository], None]] = {
+    JobTypeEnum.LOAD_TEST.value: fail_interrupted_load_test,
+}
@@ -0,0 +1,189 @@
+# src.services.job.job_queue
+import time
+from typing import Callable, Iterable, Optional
+
+from redis import Redis
+
+from src import repositories
+from src.enums.enums import JobTypeEnum
+from src.repositories.job.job_repository import FINAL_STATUSES
+from src.services.test_case import execution_queue
+from src.settings import get_redis_client, logger
+
+# Cancel requests of running jobs are dropped after this long
+CANCEL_TTL = 24 * 3600
+# Queued jobs are ordered by priority, then by age; priorities stay within
+# these bounds so that the score keeps sub-millisecond precision
+MIN_PRIORITY, MAX_PRIORITY = -10, 10
+
+
+def get_queue_key(job_type: str) -> str:
+    """Sorted set of the queued job IDs of a type, the lowest score first."""
+    return f"jobs:queue:{job_type}"
+
+
+def get_cancel_key(job_id: str) -> str:
+    return f"jobs:cancel:{job_id}"
+
+
+def get_heartbeat_key(worker_id: str) -> str:
+    return f"jobs:worker:{worker_id}"
+
+
+def get_score(priority: int, queued_at: float) -> float:
+    # Ten billion seconds (300 years) between two priorities
+    return -priority * 1e10 + queued_at
+
+
+def enqueue_job(
+    job: repositories.JobRepository, redis_client: Optional[Redis] = None
+) -> None:
+    redis_client = redis_client or get_redis_client()
+    redis_client.zadd(
+        get_queue_key(job.job_type),
+        {job.job_id: get_score(job.priority, time.time())},
+    )
+
+
+def submit_job(
+    job_type: str,
+    payload: dict,
+    priority: int = 0,
+    result: Optional[dict] = None,
+    redis_client: Optional[Redis] = None,
+) -> repositories.JobRepository:
+    """
+    Record a job and queue it for the workers. `result` points to where its
+    results will be when they are known up front, e.g. the generation run.
+    """
+    job = repositories.JobRepository(
+        job_type=job_type,
+        priority=min(max(priority, MIN_PRIORITY), MAX_PRIORITY),
+        payload=payload,
+        result=result or {},
+    ).create()
+    enqueue_job(job, redis_client)
+
+    logger.info(f"Queued {job_type} job {job.job_id} with priority {job.priority}")
+    return job
+
+
+def pop_job(
+    job_types: Iterable[str], redis_client: Optional[Redis] = None
+) -> Optional[str]:
+    """
+    Take the first job of the queues of `job_types`: the one with the highest
+    priority, the oldest among equals. Returns its ID, None when all are empty.
+    """
+    redis_client = redis_client or get_redis_client()
+    queue_keys = [get_queue_key(job_type) for job_type in job_types]
+
+    while queue_keys:
+        pipeline = redis_client.pipeline(transaction=False)
+        for queue_key in queue_keys:
+            pipeline.zrange(queue_key, 0, 0, withscores=True)
+        heads = [
+            (entries[0][1], queue_key, entries[0][0])
+            for queue_key, entries in zip(queue_keys, pipeline.execute())
+            if entries
+        ]
+        if not heads:
+            return None
+
+        _, queue_key, job_id = min(heads)
+        # Another worker may have taken it meanwhile, then look again
+        if redis_client.zrem(queue_key, job_id):
+            return job_id.decode() if isinstance(job_id, bytes) else job_id
+    return None
+
+
+def request_cancel(
+    job_id: str, redis_client: Optional[Redis] = None
+) -> Optional[repositories.JobRepository]:
+    """
+    Cancel a job: a queued one right away, a running one by asking its worker
+    to stop it. The shards of a running execution are stopped as well, the
+    execution workers run them and not the job's worker. Returns the job, None
+    if it does not exist.
+    """
+    redis_client = redis_client or get_redis_client()
+
+    job = repositories.JobRepository.get_by_id(job_id=job_id)
+    if job is None or job.status in FINAL_STATUSES:
+        return job
+
+    cancelled = repositories.JobRepository.cancel(job_id=job_id)
+    if cancelled is not None:
+        redis_client.zrem(get_queue_key(cancelled.job_type), job_id)
+        logger.info(f"Cancelled queued job {job_id}")
+        return cancelled
+
+    # Started meanwhile, its worker looks for cancel requests
+    redis_client.set(get_cancel_key(job_id), 1, ex=CANCEL_TTL)
+    if job.job_type == JobTypeEnum.TEST_EXECUTION.value:
+        execution_queue.request_cancel(
+            job.payload["test_suite_report_id"], redis_client
+        )
+    logger.info(f"Requested the cancellation of running job {job_id}")
+    return repositories.JobRepository.get_by_id(job_id=job_id)
+
+
+def get_cancel_requests(
+    job_ids: list[str], redis_client: Optional[Redis] = None
+) -> set[str]:
+    """The jobs among `job_ids` asked to stop, in one round-trip."""
+    if not job_ids:
+        return set()
+    redis_client = redis_client or get_redis_client()
+
+    pipeline = redis_client.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipeline.exists(get_cancel_key(job_id))
+    return {
+        job_id for job_id, requested in zip(job_ids, pipeline.execute()) if requested
+    }
+
+
+def requeue_orphaned_jobs(
+    redis_client: Optional[Redis] = None,
+    interrupt_handlers: Optional[
+        dict[str, Callable[[repositories.JobRepository], None]]
+    ] = None,
+) -> int:
+    """
+    Queue again the running jobs whose worker's heartbeat expired, and the
+    queued jobs a worker took from the queue but died before starting.
+    Workflow jobs resume from their last checkpoint. Running jobs of the types
+    of `interrupt_handlers` cannot be run again, they are ended by their
+    handler instead.
+    """
+    interrupt_handlers = interrupt_handlers or {}
+    redis_client = redis_client or get_redis_client()
+
+    queued_jobs = repositories.JobRepository.get_all_by_status(status="queued")
+    pipeline = redis_client.pipeline(transaction=False)
+    for job in queued_jobs:
+        pipeline.zscore(get_queue_key(job.job_type), job.job_id)
+    # A job taken by a live worker at this moment is queued twice, the
+    # second copy is skipped as the job is not queued anymore by then
+    for job, score in zip(queued_jobs, pipeline.execute()):
+        if score is None:
+            enqueue_job(job, redis_client)
+            logger.warning(f"Requeued job {job.job_id} lost between queue and worker")
+
+    requeued = 0
+    for job in repositories.JobRepository.get_all_by_status(status="running"):
+        if job.worker_id and redis_client.exists(get_heartbeat_key(job.worker_id)):
+            continue
+        if job.job_type in interrupt_handlers:
+            interrupt_handlers[job.job_type](job)
+            logger.warning(f"Ended {job.job_type} job {job.job_id} of a dead worker")
+            continue
+        job = repositories.JobRepository.requeue(job_id=job.job_id)
+        if job is not None:
+            enqueue_job(job, redis_client)
+            requeued += 1
+
+    if requeued:
+        logger.warning(f"Requeued {requeued} jobs of dead job workers")
+    return requeued
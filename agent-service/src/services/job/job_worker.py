@@ -0,0 +1,232 @@
+# src.services.job.job_worker
+"""
+Job worker running the queued jobs (test generation, execution, load tests).
+
+One runs inside the API process unless JOB_WORKER_IN_PROCESS is False; more
+can run as separate processes:
+
+    python -m src.services.job.job_worker --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Optional
+
+from src import repositories
+from src.services.job import job_queue
+from src.services.job.job_handlers import (
+    JOB_HANDLERS,
+    JOB_INTERRUPT_HANDLERS,
+    JobContext,
+    JobHandler,
+)
+from src.settings import (
+    JOB_POLL_INTERVAL,
+    JOB_TYPE_CONCURRENCY,
+    JOB_WORKER_CONCURRENCY,
+    JOB_WORKER_HEARTBEAT_TTL,
+    get_redis_client,
+    logger,
+    setup_logging,
+)
+
+
+class JobWorker:
+    """
+    Runs up to `concurrency` jobs at once on its event loop, and at most
+    `type_concurrency[job_type]` of a type, taking the highest priority job
+    of the types it has room for.
+
+    A worker stopped while running jobs queues them again once their threads
+    are done; a worker that dies stops sending heartbeats and another one
+    queues its jobs again. Either way workflow jobs resume from their last
+    checkpoint and executions from their last reported case. The job types of
+    `interrupt_handlers` cannot be run again, they are ended by their handler.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        type_concurrency: Optional[dict[str, int]] = None,
+        handlers: Optional[dict[str, JobHandler]] = None,
+        interrupt_handlers: Optional[
+            dict[str, Callable[[repositories.JobRepository], None]]
+        ] = None,
+    ):
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.concurrency = concurrency
+        self.type_concurrency = (
+            JOB_TYPE_CONCURRENCY if type_concurrency is None else type_concurrency
+        )
+        self.handlers = handlers or JOB_HANDLERS
+        self.interrupt_handlers = (
+            JOB_INTERRUPT_HANDLERS if interrupt_handlers is None else interrupt_handlers
+        )
+        self.redis_client = get_redis_client()
+        self.heartbeat_key = job_queue.get_heartbeat_key(self.worker_id)
+        # job_id -> job type, task and context of the running jobs
+        self._running: dict[str, tuple[str, asyncio.Task, JobContext]] = {}
+        self._stopped = False
+        self._last_beat = 0.0
+
+    def stop(self, *_):
+        logger.info(f"Job worker {self.worker_id} stopping")
+        self._stopped = True
+
+    def _get_free_job_types(self) -> list[str]:
+        if len(self._running) >= self.concurrency:
+            return []
+        running = Counter(job_type for job_type, _, _ in self._running.values())
+        return [
+            job_type
+            for job_type in self.handlers
+            if running[job_type] < self.type_concurrency.get(job_type, self.concurrency)
+        ]
+
+    async def _beat(self):
+        await asyncio.to_thread(
+            self.redis_client.set, self.heartbeat_key, 1, ex=JOB_WORKER_HEARTBEAT_TTL
+        )
+        await asyncio.to_thread(
+            job_queue.requeue_orphaned_jobs,
+            self.redis_client,
+            interrupt_handlers=self.interrupt_handlers,
+        )
+        self._last_beat = time.monotonic()
+
+    async def _cancel_requested_jobs(self):
+        requested = await asyncio.to_thread(
+            job_queue.get_cancel_requests, list(self._running), self.redis_client
+        )
+        for job_id in requested:
+            _, task, context = self._running.get(job_id, (None, None, None))
+            if task is not None and not context.cancelled.is_set():
+                # Threads of the job look at the event, its coroutines are cancelled
+                context.cancelled.set()
+                task.cancel()
+
+    async def _start_jobs(self):
+        while job_types := self._get_free_job_types():
+            job_id = await asyncio.to_thread(
+                job_queue.pop_job, job_types, self.redis_client
+            )
+            if job_id is None:
+                return
+
+            job = await asyncio.to_thread(
+                repositories.JobRepository.start,
+                job_id=job_id,
+                worker_id=self.worker_id,
+            )
+            # Cancelled, or started by another worker after a requeue
+            if job is None:
+                continue
+
+            context = JobContext(job)
+            task = asyncio.create_task(self._run_job(job, context))
+            self._running[job.job_id] = (job.job_type, task, context)
+            task.add_done_callback(
+                lambda _, job_id=job.job_id: self._running.pop(job_id, None)
+            )
+
+    async def _run_job(self, job: repositories.JobRepository, context: JobContext):
+        logger.info(
+            f"Job worker {self.worker_id} started {job.job_type} job {job.job_id}"
+        )
+        status, result, error = "completed", None, None
+        try:
+            result = await self.handlers[job.job_type](context)
+        except asyncio.CancelledError:
+            if context.interrupted:
+                await asyncio.to_thread(self._interrupt_job, job)
+                return
+            status = "cancelled"
+        except Exception as e:
+            logger.exception(f"{job.job_type} job {job.job_id} failed")
+            status, error = "failed", str(e) or type(e).__name__
+
+        await asyncio.to_thread(
+            repositories.JobRepository.finish,
+            job_id=job.job_id,
+            status=status,
+            result=result,
+            error=error,
+        )
+        await asyncio.to_thread(
+            self.redis_client.delete, job_queue.get_cancel_key(job.job_id)
+        )
+        logger.info(f"{job.job_type} job {job.job_id} {status}")
+
+    def _interrupt_job(self, job: repositories.JobRepository):
+        """The worker is stopping: another one takes the job over, if it can."""
+        interrupt_handler = self.interrupt_handlers.get(job.job_type)
+        if interrupt_handler is not None:
+            interrupt_handler(job)
+            logger.warning(f"{job.job_type} job {job.job_id} interrupted")
+            return
+        job = repositories.JobRepository.requeue(job_id=job.job_id)
+        if job is not None:
+            job_queue.enqueue_job(job, self.redis_client)
+
+    async def run(self):
+        logger.info(f"Job worker {self.worker_id} started")
+        try:
+            while not self._stopped:
+                try:
+                    if (
+                        time.monotonic() - self._last_beat
+                        >= JOB_WORKER_HEARTBEAT_TTL / 3
+                    ):
+                        await self._beat()
+                    await self._cancel_requested_jobs()
+                    await self._start_jobs()
+                except Exception:
+                    logger.exception(f"Job worker {self.worker_id} loop failed")
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+        finally:
+            tasks = []
+            for _, task, context in self._running.values():
+                # Unless cancelled already; the threads of the job see the event
+                if not context.cancelled.is_set():
+                    context.interrupted = True
+                    context.cancelled.set()
+                task.cancel()
+                tasks.append(task)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(self.redis_client.delete, self.heartbeat_key)
+            logger.info(f"Job worker {self.worker_id} stopped")
+
+
+async def run_worker(concurrency: int):
+    worker = JobWorker(concurrency=concurrency)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, worker.stop)
+    await worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a background job worker.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=JOB_WORKER_CONCURRENCY,
+        help="Number of jobs run at once.",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
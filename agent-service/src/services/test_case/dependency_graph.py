@@ -0,0 +1,136 @@
+# src.services.test_case.dependency_graph
+import re
+from typing import Any
+
+from src import repositories
+from src.services.test_case.response_assertions import (
+    MISSING,
+    compile_path,
+    resolve_path,
+)
+
+# "{{token}}" in a URL, header or request body value
+_VARIABLE = re.compile(r"\{\{\s*([\w.-]+)\s*\}\}")
+# Extraction sources starting with this prefix read a response header
+HEADER_PREFIX = "header:"
+
+
+def describe_names(names, max_length: int = 64) -> str:
+    """
+    Sorted `names` joined for a status, or the first one and how many more
+    when they are longer than `max_length`: test case IDs are UUIDs, and a
+    status has to fit its column.
+    """
+    names = sorted(names)
+    joined = ", ".join(names)
+    if len(names) <= 1 or len(joined) <= max_length:
+        return joined
+    return f"{names[0]} and {len(names) - 1} more"
+
+
+def substitute_variables(value: Any, variables: dict) -> Any:
+    """
+    Replace `{{name}}` references in the strings of `value` with `variables`.
+    A string that is a single reference takes the variable as is, keeping its
+    type; unknown names are left untouched. Returns new containers.
+    """
+    if not variables:
+        return value
+    if isinstance(value, dict):
+        return {
+            key: substitute_variables(item, variables) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [substitute_variables(item, variables) for item in value]
+    if not isinstance(value, str) or "{{" not in value:
+        return value
+
+    match = _VARIABLE.fullmatch(value)
+    if match is not None and match.group(1) in variables:
+        return variables[match.group(1)]
+    return _VARIABLE.sub(
+        lambda match: str(variables.get(match.group(1), match.group(0))), value
+    )
+
+
+def extract_variables(
+    extract: dict[str, str], response_body: Any, response_headers: dict
+) -> tuple[dict, list[str]]:
+    """
+    Read the variables declared in a test case's `extract` from its response.
+    Sources are response paths (`$.data.token`, `items[0].id`) or
+    `header:<name>`. Returns the variables found and the names that were not.
+    """
+    headers = {key.lower(): value for key, value in response_headers.items()}
+    variables, missing = {}, []
+    for name, source in extract.items():
+        if source.startswith(HEADER_PREFIX):
+            value = headers.get(source[len(HEADER_PREFIX) :].strip().lower(), MISSING)
+        else:
+            values = resolve_path(response_body, compile_path(source))
+            value = values[0] if len(values) == 1 else values
+        if value is MISSING:
+            missing.append(name)
+        else:
+            variables[name] = value
+    return variables, missing
+
+
+def build_dependency_graph(
+    test_cases: list[repositories.TestCaseRepository],
+) -> dict[str, set[str]]:
+    """
+    Map every test case ID to the IDs it depends on, for `graphlib`.
+    Dependencies outside `test_cases` are left out.
+    """
+    test_case_ids = {test_case.id for test_case in test_cases}
+    return {
+        test_case.id: {
+            dependency
+            for dependency in test_case.depends_on or []
+            if dependency in test_case_ids
+        }
+        for test_case in test_cases
+    }
+
+
+def add_dependencies(
+    test_cases: list[repositories.TestCaseRepository],
+    suite_test_cases: list[repositories.TestCaseRepository],
+) -> list[repositories.TestCaseRepository]:
+    """Add the transitive prerequisites of `test_cases`, in suite order."""
+    by_id = {test_case.id: test_case for test_case in suite_test_cases}
+    selected = {test_case.id for test_case in test_cases}
+    pending = list(selected)
+    while pending:
+        test_case = by_id.get(pending.pop())
+        for dependency in (test_case.depends_on or []) if test_case else []:
+            if dependency in by_id and dependency not in selected:
+                selected.add(dependency)
+                pending.append(dependency)
+    return [test_case for test_case in suite_test_cases if test_case.id in selected]
+
+
+def group_dependent_test_cases(
+    test_cases: list[repositories.TestCaseRepository],
+) -> list[list[repositories.TestCaseRepository]]:
+    """
+    Split test cases into groups with no dependency between groups (the
+    connected components of the dependency graph), keeping their order.
+    """
+    parents = {test_case.id: test_case.id for test_case in test_cases}
+
+    def _find(test_case_id: str) -> str:
+        while parents[test_case_id] != test_case_id:
+            parents[test_case_id] = parents[parents[test_case_id]]
+            test_case_id = parents[test_case_id]
+        return test_case_id
+
+    for test_case_id, dependencies in build_dependency_graph(test_cases).items():
+        for dependency in dependencies:
+            parents[_find(dependency)] = _find(test_case_id)
+
+    groups: dict[str, list[repositories.TestCaseRepository]] = {}
+    for test_case in test_cases:
+        groups.setdefault(_find(test_case.id), []).append(test_case)
+    return list(groups.values())
@@ -1,115 +1,175 @@
 # src.services.test_case.execute_test_case
+import asyncio
 import random
-import re
-import string
-
-import requests
-from sqlmodel import Session
+import threading
+import time
+from graphlib import TopologicalSorter
+from typing import Callable, NamedTuple, Optional
 
+import httpx
 from src import repositories
-from src.settings import get_db_engine, get_now_vn
+from src.services.test_case.dependency_graph import (
+    add_dependencies,
+    build_dependency_graph,
+    describe_names,
+    extract_variables,
+    substitute_variables,
+)
+from src.services.test_case.http_client_pool import HostClientPool, get_host_key
+from src.services.test_case.rate_limiter import (
+    OVERLOAD_STATUS_CODES,
+    HostRateLimiter,
+    get_host_rate_limiter,
+    parse_retry_after,
+)
+from src.services.test_case.report_writer import ReportBatchWriter
+from src.services.test_case.request_template import RequestTemplate, make_rng
+from src.services.test_case.request_timing import RequestTiming, TimingAggregator
+from src.services.test_case.response_assertions import CompiledAssertions
+from src.settings import (
+    EXECUTION_CONCURRENCY,
+    EXECUTION_MAX_RETRIES,
+    EXECUTION_RANDOM_SEED,
+    EXECUTION_RETRY_AFTER_MAX,
+    EXECUTION_RETRY_BACKOFF,
+    get_now_vn,
+    logger,
+)
+
+SUPPORTED_METHODS = {"GET", "POST", "PUT", "DELETE", "PATCH"}
+# Length of TestCaseReportModel.status
+STATUS_MAX_LENGTH = 128
 
 
-def replace_value(value):
+async def send_request(
+    client: httpx.AsyncClient,
+    limiter: HostRateLimiter,
+    method: str,
+    url: str,
+    **kwargs,
+) -> tuple[httpx.Response, dict]:
     """
-    Replace special value patterns with actual values using regex.
+    Send a request through the host limiter.
+    429/503 answers shrink the host's concurrency, pause it for `Retry-After`
+    (or an exponential backoff) and are retried up to EXECUTION_MAX_RETRIES times.
+    Returns the final response and the timing breakdown of its attempt, where
+    `wait_ms` is the time spent in the limiter and in retries before it.
     """
-    if value == "N/A":
-        return ""
-    if value == "NULL":
-        return None
-    if isinstance(value, str):
-        # CHARS(n)
-        match = re.fullmatch(r"CHARS\((\d+)\)", value)
-        if match:
-            n = int(match.group(1))
-            return "".join(random.choices(string.ascii_letters, k=n))
-        # NUMS(n)
-        match = re.fullmatch(r"NUMS\((\d+)\)", value)
-        if match:
-            n = int(match.group(1))
-            return "".join(random.choices(string.digits, k=n))
-        # ALPHANUMS(n)
-        match = re.fullmatch(r"ALPHANUMS\((\d+)\)", value)
-        if match:
-            n = int(match.group(1))
-            chars = string.ascii_letters + string.digits
-            return "".join(random.choices(chars, k=n))
-        # EMAIL(n)
-        match = re.fullmatch(r"EMAIL\((\d+)\)", value)
-        if match:
-            n = int(match.group(1))
-            local_len = max(1, n - 10)
-            local = "".join(
-                random.choices(string.ascii_lowercase + string.digits, k=local_len)
+    started_at = time.perf_counter()
+    for attempt in range(EXECUTION_MAX_RETRIES + 1):
+        async with limiter:
+            timing = RequestTiming()
+            response = await client.request(
+                method, url, extensions={"trace": timing}, **kwargs
             )
-            domain = "".join(random.choices(string.ascii_lowercase, k=5))
-            return f"{local}@{domain}.com"
-    return value
+            timing.finish()
+        latency = timing.ended_at - timing.started_at
+
+        if response.status_code not in OVERLOAD_STATUS_CODES:
+            limiter.on_success(latency)
+            break
+        if attempt == EXECUTION_MAX_RETRIES:
+            break
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is None:
+            retry_after = EXECUTION_RETRY_BACKOFF * 2**attempt
+        limiter.on_overload(min(retry_after, EXECUTION_RETRY_AFTER_MAX))
 
+    timings = timing.to_dict()
+    timings["wait_ms"] = (timing.started_at - started_at) * 1000
+    timings["attempts"] = attempt + 1
+    return response, timings
 
-def clean_request_body(request_body):
+
+class CompiledTestCase(NamedTuple):
+    request_template: RequestTemplate
+    assertions: CompiledAssertions
+
+
+def compile_test_case(
+    test_case: repositories.TestCaseRepository,
+) -> Optional[CompiledTestCase]:
     """
-    Remove fields with value 'ABSENT' and replace special values.
-    Support nested dicts and lists.
+    Request body template and response assertions of a test case, compiled
+    once per run. None if they do not compile, executing the case then
+    reports the error.
     """
-    if isinstance(request_body, dict):
-        cleaned = {}
-        for k, v in request_body.items():
-            if v == "ABSENT":
-                continue
-            elif isinstance(v, (dict, list)):
-                cleaned[k] = clean_request_body(v)
-            else:
-                cleaned[k] = replace_value(v)
-        return cleaned
-    elif isinstance(request_body, list):
-        return [
-            (
-                clean_request_body(item)
-                if isinstance(item, (dict, list))
-                else replace_value(item)
-            )
-            for item in request_body
-            if item != "ABSENT"
-        ]
-    else:
-        return replace_value(request_body)
+    try:
+        return CompiledTestCase(
+            request_template=RequestTemplate(test_case.request_body),
+            assertions=CompiledAssertions(
+                test_case.expected_output.get("response_mapping", {})
+            ),
+        )
+    except Exception:
+        return None
 
 
-def execute_test_case(
+async def execute_test_case(
     test_case: repositories.TestCaseRepository,
     test_suite_id: str,
+    client_pool: HostClientPool,
+    rng: Optional[random.Random] = None,
+    variables: Optional[dict] = None,
+    compiled: Optional[CompiledTestCase] = None,
 ) -> repositories.TestCaseReportRepository:
-    url = test_case.api_info.get("url")
+    """
+    Send the request of a test case and check the response against it.
+    `variables` extracted from its prerequisites replace the `{{name}}`
+    references of the URL, headers and request body. Without `compiled`,
+    the request body and assertions are compiled for this one request.
+    """
+    case_started_at = time.perf_counter()
+    url = substitute_variables(test_case.api_info.get("url"), variables)
 
     method = test_case.api_info.get("method", "GET").upper()
-    headers = test_case.api_info.get("headers", {})
-    request_body = clean_request_body(test_case.request_body)
+    headers = substitute_variables(test_case.api_info.get("headers", {}), variables)
+    request_template = (
+        compiled.request_template
+        if compiled is not None
+        else RequestTemplate(test_case.request_body)
+    )
+    request_body = substitute_variables(request_template.render(rng), variables)
     expected_output = test_case.expected_output
 
     expected_status_code = str(expected_output.get("statuscode"))
     expected_response_mapping = expected_output.get("response_mapping", {})
 
     try:
-        start_time = get_now_vn()
-        if method == "GET":
-            response = requests.get(url, headers=headers)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, json=request_body)
-        elif method == "PUT":
-            response = requests.put(url, headers=headers, json=request_body)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers, json=request_body)
-        elif method == "PATCH":
-            response = requests.patch(url, headers=headers, json=request_body)
-        else:
+        if method not in SUPPORTED_METHODS:
             raise ValueError(f"Unsupported HTTP method: {method}")
+        assertions = (
+            compiled.assertions
+            if compiled is not None
+            else CompiledAssertions(expected_response_mapping)
+        )
+
+        start_time = get_now_vn()
+        response, timings = await send_request(
+            client_pool.get_client(url),
+            get_host_rate_limiter(get_host_key(url)),
+            method,
+            url,
+            headers=headers,
+            json=request_body if method != "GET" else None,
+        )
         ended_time = get_now_vn()
         try:
             json_response = response.json()
         except Exception:
             json_response = {}
+        response_body = json_response if response.content else {}
+        assertions_passed, assertion_results = assertions.evaluate(response_body)
+
+        # Everything this process spent outside the limiter and the HTTP exchange
+        timings["overhead_ms"] = max(
+            0.0,
+            (time.perf_counter() - case_started_at) * 1000
+            - timings["wait_ms"]
+            - timings["total_ms"],
+        )
+        timings = {key: round(value, 3) for key, value in timings.items()}
 
         execution_result = repositories.TestCaseReportRepository(
             test_suite_report_id=test_suite_id,  # This should be set appropriately
@@ -117,26 +177,29 @@ def execute_test_case(
             request_header=headers,
             request_body=request_body,
             response_header=dict(response.headers),
-            response_body=json_response if response.content else {},
+            response_body=response_body,
             response_status_code=response.status_code,
             status=(
                 "passed"
                 if str(response.status_code) == expected_status_code
+                and assertions_passed
                 else "failed"
             ),
+            assertion_results=assertion_results,
             start_time=start_time,
             end_time=ended_time,
+            timings=timings,
         )
 
     except Exception as e:
         execution_result = repositories.TestCaseReportRepository(
             test_suite_report_id=test_suite_id,
             test_case_id=test_case.id,
-            status=f"error: {str(e)}",
+            status=clip_status(f"error: {str(e)}"),
             start_time=get_now_vn(),
             end_time=get_now_vn(),
-            request_body=clean_request_body(test_case.request_body),
-            request_header=test_case.api_info.get("headers", {}),
+            request_body=request_body,
+            request_header=headers,
             response_body={},
             response_header={},
             response_status_code=0,
@@ -144,29 +207,291 @@ def execute_test_case(
     return execution_result
 
 
-def execute_test_suite(test_suite_report_id: str, test_suite_id: str) -> dict:
-    test_suite_report = repositories.TestSuiteReportRepository(
-        id=test_suite_report_id, test_suite_id=test_suite_id
+def clip_status(status: str) -> str:
+    """Cut a status down to the length of its column."""
+    if len(status) <= STATUS_MAX_LENGTH:
+        return status
+    return f"{status[: STATUS_MAX_LENGTH - 3]}..."
+
+
+def make_skipped_report(
+    test_case: repositories.TestCaseRepository,
+    test_suite_id: str,
+    reason: str,
+) -> repositories.TestCaseReportRepository:
+    return repositories.TestCaseReportRepository(
+        test_suite_report_id=test_suite_id,
+        test_case_id=test_case.id,
+        status=clip_status(f"skipped: {reason}"),
+        start_time=get_now_vn(),
+        end_time=get_now_vn(),
+        request_body={},
+        request_header={},
+        response_body={},
+        response_header={},
+        response_status_code=0,
+    )
+
+
+async def aexecute_test_cases(
+    test_suite_report_id: str,
+    test_cases: list[repositories.TestCaseRepository],
+    concurrency: Optional[int] = None,
+    on_flush: Optional[Callable[[list], None]] = None,
+    seed: Optional[int] = None,
+    previous_reports: Optional[list[repositories.TestCaseReportRepository]] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> TimingAggregator:
+    """
+    Execute test cases concurrently into an existing suite report.
+
+    Test cases are scheduled along their `depends_on` graph: a case starts as
+    soon as its own prerequisites are done, and is skipped if one of them did
+    not pass. Cases with one of `previous_reports`, written by an interrupted
+    earlier attempt, are not sent again: their status and the variables they
+    extracted are restored from their report. At most `concurrency` requests
+    are in flight at once, and requests to the same host reuse the keep-alive
+    connections of a shared `HostClientPool`.
+    Case reports are persisted in batches as they complete, so progress is
+    visible while the run goes on. With a `seed`, the random placeholders of
+    every request body are reproducible. Once `stop_event` is set, no case
+    starts anymore and the run ends with the reports of those in flight.
+    Returns the timings of the executed cases.
+    """
+    concurrency = concurrency or EXECUTION_CONCURRENCY
+    seed = seed if seed is not None else EXECUTION_RANDOM_SEED
+
+    graph = build_dependency_graph(test_cases)
+    test_cases_by_id = {test_case.id: test_case for test_case in test_cases}
+    compiled_test_cases = {
+        test_case.id: compile_test_case(test_case) for test_case in test_cases
+    }
+    # Raises graphlib.CycleError before anything is sent
+    sorter = TopologicalSorter(graph)
+    sorter.prepare()
+
+    report_writer = ReportBatchWriter(
+        test_suite_report_id=test_suite_report_id, on_flush=on_flush
+    )
+    timing_aggregator = TimingAggregator()
+    ready: asyncio.Queue[Optional[str]] = asyncio.Queue()
+    for test_case_id in sorter.get_ready():
+        ready.put_nowait(test_case_id)
+    # Variables a test case sees: its own extractions and its prerequisites'
+    scopes: dict[str, dict] = {}
+    unsuccessful: set[str] = set()
+    previous_reports_by_id = {
+        report.test_case_id: report for report in previous_reports or []
+    }
+    workers = min(concurrency, len(test_cases))
+
+    async with HostClientPool() as client_pool:
+
+        async def _run(test_case: repositories.TestCaseRepository):
+            dependencies = graph[test_case.id]
+            blocked = sorted(dependencies & unsuccessful)
+            if blocked:
+                return make_skipped_report(
+                    test_case,
+                    test_suite_report_id,
+                    reason=f"dependency {describe_names(blocked)} did not pass",
+                )
+
+            variables = {}
+            for dependency in dependencies:
+                variables.update(scopes[dependency])
+
+            previous_report = previous_reports_by_id.get(test_case.id)
+            if previous_report is not None:
+                if previous_report.status == "passed" and test_case.extract:
+                    extracted, _ = extract_variables(
+                        test_case.extract,
+                        previous_report.response_body,
+                        previous_report.response_header,
+                    )
+                    variables.update(extracted)
+                scopes[test_case.id] = variables
+                return previous_report
+
+            result = await execute_test_case(
+                test_case=test_case,
+                test_suite_id=test_suite_report_id,
+                client_pool=client_pool,
+                rng=make_rng(seed, salt=test_case.id),
+                variables=variables,
+                compiled=compiled_test_cases[test_case.id],
+            )
+            if result.status == "passed" and test_case.extract:
+                extracted, missing = extract_variables(
+                    test_case.extract, result.response_body, result.response_header
+                )
+                if missing:
+                    result.status = clip_status(
+                        f"error: could not extract {describe_names(missing)}"
+                    )
+                variables.update(extracted)
+            scopes[test_case.id] = variables
+            return result
+
+        async def _worker():
+            while (test_case_id := await ready.get()) is not None:
+                if stop_event is not None and stop_event.is_set():
+                    # Wakes up the other workers waiting for a case
+                    for _ in range(workers):
+                        ready.put_nowait(None)
+                    return
+                result = await _run(test_cases_by_id[test_case_id])
+                if result.status != "passed":
+                    unsuccessful.add(test_case_id)
+                if result is not previous_reports_by_id.get(test_case_id):
+                    timing_aggregator.add(result.timings)
+                    await report_writer.add(result)
+
+                sorter.done(test_case_id)
+                for next_test_case_id in sorter.get_ready():
+                    ready.put_nowait(next_test_case_id)
+                if not sorter.is_active():
+                    for _ in range(workers):
+                        ready.put_nowait(None)
+
+        await asyncio.gather(*(_worker() for _ in range(workers)))
+        await report_writer.flush()
+
+    return timing_aggregator
+
+
+def select_test_cases(
+    test_suite_id: str, parent_report_id: Optional[str] = None
+) -> list[repositories.TestCaseRepository]:
+    """
+    Test cases to run: every case selected for execution, or for a re-run only
+    the cases that did not pass in the parent report. The prerequisites of the
+    chosen cases are always included.
+    """
+    suite_test_cases = repositories.TestCaseRepository.get_all_by_test_suite_id(
+        test_suite_id=test_suite_id
     )
-    test_cases = repositories.TestCaseRepository.get_all_by_test_suite_id(
-        test_suite_id=test_suite_id, execute=True
+    if parent_report_id is None:
+        test_cases = [test_case for test_case in suite_test_cases if test_case.execute]
+    else:
+        test_case_ids = set(
+            repositories.TestCaseReportRepository.get_unsuccessful_test_case_ids(
+                test_suite_report_id=parent_report_id
+            )
+        )
+        test_cases = [
+            test_case for test_case in suite_test_cases if test_case.id in test_case_ids
+        ]
+    return add_dependencies(test_cases, suite_test_cases)
+
+
+def resolve_seed(seed: Optional[int] = None) -> int:
+    """
+    Seed a run renders its request bodies with and records on its report:
+    `seed`, else EXECUTION_RANDOM_SEED, else a fresh one. A re-run of the
+    report sends the same generated values as the run it is compared to.
+    """
+    if seed is not None:
+        return seed
+    if EXECUTION_RANDOM_SEED is not None:
+        return EXECUTION_RANDOM_SEED
+    return random.randrange(2**31)
+
+
+async def aexecute_test_suite(
+    test_suite_report_id: str,
+    test_suite_id: str,
+    concurrency: Optional[int] = None,
+    parent_report_id: Optional[str] = None,
+    seed: Optional[int] = None,
+    on_flush: Optional[Callable[[list], None]] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """
+    Execute the selected test cases of a suite in this process, or re-run the
+    unsuccessful cases of `parent_report_id`.
+    The suite report is created up front and finished when the run ends; if
+    it exists already, the run of an interrupted attempt goes on into it and
+    the cases reported there are not sent again. A run stopped through
+    `stop_event` leaves its report running, to be resumed or finished by the
+    caller. `on_flush` is called with every batch of case reports once
+    committed.
+    """
+    test_cases = select_test_cases(test_suite_id, parent_report_id)
+    test_suite_report = repositories.TestSuiteReportRepository.get_by_id(
+        test_suite_report_id=test_suite_report_id
     )
+    if test_suite_report is None:
+        seed = resolve_seed(seed)
+        previous_reports = []
+        repositories.TestSuiteReportRepository(
+            id=test_suite_report_id,
+            test_suite_id=test_suite_id,
+            parent_report_id=parent_report_id,
+            seed=seed,
+            total_test_cases=len(test_cases),
+        ).create()
+    else:
+        seed = test_suite_report.seed
+        previous_reports = repositories.TestCaseReportRepository.get_all_previous(
+            test_suite_report_id=test_suite_report_id
+        )
 
-    execution_results = []
+    logger.info(
+        f"Executing {len(test_cases) - len(previous_reports)} test cases of suite "
+        f"{test_suite_id} with concurrency={concurrency or EXECUTION_CONCURRENCY} "
+        f"({len(previous_reports)} already reported)"
+    )
 
-    for test_case in test_cases:
-        result = execute_test_case(
-            test_case=test_case, test_suite_id=test_suite_report.id
+    try:
+        timing_aggregator = await aexecute_test_cases(
+            test_suite_report_id=test_suite_report_id,
+            test_cases=test_cases,
+            concurrency=concurrency,
+            on_flush=on_flush,
+            seed=seed,
+            previous_reports=previous_reports,
+            stop_event=stop_event,
+        )
+    except BaseException:
+        logger.exception(
+            f"Execution of test suite report {test_suite_report_id} failed"
+        )
+        repositories.TestSuiteReportRepository.finish(
+            test_suite_report_id=test_suite_report_id, status="failed"
         )
-        execution_results.append(result)
-        # break
+        raise
+
+    if stop_event is not None and stop_event.is_set():
+        logger.info(f"Execution of test suite report {test_suite_report_id} stopped")
+        return
+    repositories.TestSuiteReportRepository.finish(
+        test_suite_report_id=test_suite_report_id,
+        timing_summary=timing_aggregator.summary(),
+    )
 
-    with Session(get_db_engine()) as session:
-        session.add(test_suite_report)
-        session.commit()
 
-        session.add_all(execution_results)
-        session.commit()
+def execute_test_suite(
+    test_suite_report_id: str,
+    test_suite_id: str,
+    concurrency: Optional[int] = None,
+    parent_report_id: Optional[str] = None,
+    seed: Optional[int] = None,
+    on_flush: Optional[Callable[[list], None]] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """Synchronous entry point, runs `aexecute_test_suite` on a fresh event loop."""
+    asyncio.run(
+        aexecute_test_suite(
+            test_suite_report_id=test_suite_report_id,
+            test_suite_id=test_suite_id,
+            concurrency=concurrency,
+            parent_report_id=parent_report_id,
+            seed=seed,
+            on_flush=on_flush,
+            stop_event=stop_event,
+        )
+    )
 
 
 if __name__ == "__main__":
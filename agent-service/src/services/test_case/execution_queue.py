@@ -0,0 +1,286 @@
+# src.services.test_case.execution_queue
+import json
+from typing import Optional
+
+from redis import Redis
+
+from src import repositories
+from src.services.test_case.dependency_graph import group_dependent_test_cases
+from src.services.test_case.execute_test_case import resolve_seed, select_test_cases
+from src.services.test_case.request_timing import TimingAggregator
+from src.settings import EXECUTION_SHARD_SIZE, get_redis_client, logger
+
+# Pending shard messages, workers pop from the right and producers push left
+QUEUE_KEY = "execution:queue"
+# Progress of every shard of a report is kept this long after it is enqueued
+PROGRESS_TTL = 7 * 24 * 3600
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Marks a shard done and counts it, unless it already was: a requeued shard
+# and its slow original worker may both finish it. Returns nil in that case,
+# the finished, failed and total number of shards otherwise.
+_COMPLETE_SHARD_SCRIPT = """
+local previous_status = redis.call("hget", KEYS[1], "status")
+if previous_status == "completed" or previous_status == "failed"
+    or previous_status == "cancelled" then
+    return nil
+end
+redis.call("hset", KEYS[1], "status", ARGV[1])
+local finished = redis.call("hincrby", KEYS[2], "finished", 1)
+local failed = redis.call("hincrby", KEYS[2], "failed", ARGV[1] == "failed" and 1 or 0)
+local total = tonumber(redis.call("hget", KEYS[2], "total")) or 0
+return {finished, failed, total}
+"""
+
+
+def get_processing_key(worker_id: str) -> str:
+    """List holding the shards a worker has taken but not finished yet."""
+    return f"execution:processing:{worker_id}"
+
+
+def get_heartbeat_key(worker_id: str) -> str:
+    return f"execution:worker:{worker_id}"
+
+
+def get_shard_key(test_suite_report_id: str, shard_id: int) -> str:
+    """Hash with the status, size, progress and worker of one shard."""
+    return f"execution:report:{test_suite_report_id}:shard:{shard_id}"
+
+
+def get_counters_key(test_suite_report_id: str) -> str:
+    """Hash with the total, finished and failed number of shards of a report."""
+    return f"execution:report:{test_suite_report_id}:counters"
+
+
+def get_cancel_key(test_suite_report_id: str) -> str:
+    """Set when the execution of a report is cancelled, its shards stop."""
+    return f"execution:report:{test_suite_report_id}:cancel"
+
+
+def request_cancel(test_suite_report_id: str, redis_client: Optional[Redis] = None):
+    """
+    Stop the shards of a report: queued ones end without running, running ones
+    once their cases in flight are reported. The last one finishes the suite
+    report as cancelled.
+    """
+    redis_client = redis_client or get_redis_client()
+    redis_client.set(get_cancel_key(test_suite_report_id), 1, ex=PROGRESS_TTL)
+    logger.info(
+        f"Requested the cancellation of test suite report {test_suite_report_id}"
+    )
+
+
+def is_cancelled(
+    test_suite_report_id: str, redis_client: Optional[Redis] = None
+) -> bool:
+    redis_client = redis_client or get_redis_client()
+    return bool(redis_client.exists(get_cancel_key(test_suite_report_id)))
+
+
+def _decode_progress(raw_progress: dict) -> dict:
+    progress = {
+        (key.decode() if isinstance(key, bytes) else key): (
+            value.decode() if isinstance(value, bytes) else value
+        )
+        for key, value in raw_progress.items()
+    }
+    for field in ("total", "done"):
+        if field in progress:
+            progress[field] = int(progress[field])
+    return progress
+
+
+def split_into_shards(groups: list[list[str]], shard_size: int) -> list[list[str]]:
+    """
+    Pack groups of test case IDs into shards of about `shard_size`. A group is
+    never split, so test cases that depend on each other share a shard.
+    """
+    shards: list[list[str]] = []
+    for group in groups:
+        if shards and len(shards[-1]) + len(group) <= shard_size:
+            shards[-1].extend(group)
+        else:
+            shards.append(list(group))
+    return shards
+
+
+def enqueue_test_suite(
+    test_suite_report_id: str,
+    test_suite_id: str,
+    concurrency: Optional[int] = None,
+    parent_report_id: Optional[str] = None,
+    seed: Optional[int] = None,
+    shard_size: int = EXECUTION_SHARD_SIZE,
+    redis_client: Optional[Redis] = None,
+) -> int:
+    """
+    Create the suite report and push its test cases to the execution queue in
+    shards of `shard_size`, to be picked up by any execution worker.
+    With `parent_report_id`, only the cases that did not pass there are queued.
+    Called again for an existing report, e.g. by a requeued job, the shards
+    are only enqueued if they were not already. Returns the number of shards.
+    """
+    redis_client = redis_client or get_redis_client()
+
+    test_cases = select_test_cases(test_suite_id, parent_report_id)
+    test_suite_report = repositories.TestSuiteReportRepository.get_by_id(
+        test_suite_report_id=test_suite_report_id
+    )
+    if test_suite_report is None:
+        seed = resolve_seed(seed)
+        repositories.TestSuiteReportRepository(
+            id=test_suite_report_id,
+            test_suite_id=test_suite_id,
+            parent_report_id=parent_report_id,
+            seed=seed,
+            total_test_cases=len(test_cases),
+        ).create()
+    else:
+        # The counters are written with the shards, in the same transaction
+        total = redis_client.hget(get_counters_key(test_suite_report_id), "total")
+        if total is not None or test_suite_report.status != "running":
+            return int(total or 0)
+        seed = test_suite_report.seed
+
+    groups = [
+        [test_case.id for test_case in group]
+        for group in group_dependent_test_cases(test_cases)
+    ]
+    shards = split_into_shards(groups, shard_size)
+    if not shards:
+        repositories.TestSuiteReportRepository.finish(
+            test_suite_report_id=test_suite_report_id
+        )
+        return 0
+
+    messages = [
+        json.dumps(
+            {
+                "test_suite_report_id": test_suite_report_id,
+                "test_suite_id": test_suite_id,
+                "shard_id": shard_id,
+                "test_case_ids": test_case_ids,
+                "concurrency": concurrency,
+                "seed": seed,
+            }
+        )
+        for shard_id, test_case_ids in enumerate(shards)
+    ]
+    counters_key = get_counters_key(test_suite_report_id)
+    # Everything is sent in one round-trip; progress has to exist before a
+    # worker can pick up the first shard
+    pipeline = redis_client.pipeline()
+    for shard_id, test_case_ids in enumerate(shards):
+        shard_key = get_shard_key(test_suite_report_id, shard_id)
+        pipeline.hset(
+            shard_key,
+            mapping={"status": "queued", "total": len(test_case_ids), "done": 0},
+        )
+        pipeline.expire(shard_key, PROGRESS_TTL)
+    pipeline.hset(
+        counters_key, mapping={"total": len(shards), "finished": 0, "failed": 0}
+    )
+    pipeline.expire(counters_key, PROGRESS_TTL)
+    pipeline.lpush(QUEUE_KEY, *messages)
+    pipeline.execute()
+
+    logger.info(
+        f"Enqueued {len(test_cases)} test cases of suite {test_suite_id} "
+        f"as {len(shards)} shards"
+    )
+    return len(shards)
+
+
+def update_shard_progress(
+    test_suite_report_id: str,
+    shard_id: int,
+    redis_client: Optional[Redis] = None,
+    **fields,
+):
+    """Set `fields` in the progress of a shard, one HSET round-trip."""
+    redis_client = redis_client or get_redis_client()
+    redis_client.hset(get_shard_key(test_suite_report_id, shard_id), mapping=fields)
+
+
+def get_shard_progress(
+    test_suite_report_id: str, redis_client: Optional[Redis] = None
+) -> list[dict]:
+    redis_client = redis_client or get_redis_client()
+
+    total = int(redis_client.hget(get_counters_key(test_suite_report_id), "total") or 0)
+    pipeline = redis_client.pipeline(transaction=False)
+    for shard_id in range(total):
+        pipeline.hgetall(get_shard_key(test_suite_report_id, shard_id))
+    return [
+        {"shard_id": shard_id, **_decode_progress(raw_progress)}
+        for shard_id, raw_progress in enumerate(pipeline.execute())
+    ]
+
+
+def complete_shard(
+    test_suite_report_id: str,
+    shard_id: int,
+    status: str = "completed",
+    redis_client: Optional[Redis] = None,
+) -> bool:
+    """
+    Mark a shard as done. The worker finishing the last shard of a report
+    finishes the suite report, and True is returned to it.
+    """
+    redis_client = redis_client or get_redis_client()
+    shard_key = get_shard_key(test_suite_report_id, shard_id)
+    counters_key = get_counters_key(test_suite_report_id)
+
+    counters = redis_client.eval(
+        _COMPLETE_SHARD_SCRIPT, 2, shard_key, counters_key, status
+    )
+    if counters is None:
+        # Already counted, by the other copy of a requeued shard
+        return False
+    finished, failed, total = counters
+    if finished < total:
+        return False
+
+    # Timings of all shards are only in the database, summarise them there
+    timing_aggregator = TimingAggregator()
+    report_timings = (
+        repositories.TestCaseReportRepository.get_timings_by_test_suite_report_id(
+            test_suite_report_id
+        )
+    )
+    for timings in report_timings:
+        timing_aggregator.add(timings)
+
+    if is_cancelled(test_suite_report_id, redis_client):
+        status = "cancelled"
+    else:
+        status = "failed" if failed else "completed"
+    repositories.TestSuiteReportRepository.finish(
+        test_suite_report_id=test_suite_report_id,
+        status=status,
+        timing_summary=timing_aggregator.summary(),
+    )
+    logger.info(f"All {total} shards of test suite report {test_suite_report_id} done")
+    return True
+
+
+def requeue_orphaned_shards(redis_client: Optional[Redis] = None) -> int:
+    """
+    Move the shards held by workers whose heartbeat expired back to the queue.
+    Reports written before the crash are kept, the new owner skips those cases.
+    """
+    redis_client = redis_client or get_redis_client()
+
+    requeued = 0
+    for processing_key in redis_client.scan_iter(match=get_processing_key("*")):
+        if isinstance(processing_key, bytes):
+            processing_key = processing_key.decode()
+        worker_id = processing_key.removeprefix(get_processing_key(""))
+        if redis_client.exists(get_heartbeat_key(worker_id)):
+            continue
+        while redis_client.lmove(processing_key, QUEUE_KEY, "RIGHT", "RIGHT"):
+            requeued += 1
+
+    if requeued:
+        logger.warning(f"Requeued {requeued} shards of dead execution workers")
+    return requeued
@@ -0,0 +1,276 @@
+# src.services.test_case.execution_worker
+"""
+Execution worker consuming test case shards from the Redis execution queue.
+
+Run one or more worker processes next to the API (with EXECUTION_BACKEND=queue):
+
+    python -m src.services.test_case.execution_worker --processes 4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import Optional
+
+from src import repositories
+from src.services.test_case import execution_queue
+from src.services.test_case.execute_test_case import aexecute_test_cases
+from src.settings import (
+    EXECUTION_WORKER_HEARTBEAT_TTL,
+    EXECUTION_WORKER_PROCESSES,
+    get_redis_client,
+    logger,
+    setup_logging,
+)
+
+# Seconds a worker blocks on the queue before checking for dead workers again
+_QUEUE_POLL_TIMEOUT = 5
+
+
+class ExecutionWorker:
+    """
+    Takes shards from the queue with BLMOVE into its own processing list, so a
+    shard is never lost: if the worker dies, its heartbeat expires and another
+    worker moves the shard back to the queue. Test cases that already have a
+    report are not sent again, which makes running a shard again after an
+    earlier attempt harmless. A stopped worker ends its shard once the cases
+    in flight are reported and puts it back in the queue; it keeps beating
+    until then, so that no other worker takes the shard over meanwhile.
+    The shards of a cancelled report end the same way, but are not requeued.
+    """
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.redis_client = get_redis_client()
+        self.processing_key = execution_queue.get_processing_key(self.worker_id)
+        self.heartbeat_key = execution_queue.get_heartbeat_key(self.worker_id)
+        # Set on stop, the shard being run ends early
+        self._stopped = threading.Event()
+        # Set once the worker holds no shard anymore, ends the heartbeat
+        self._exited = threading.Event()
+        # Report ID and stop event of the shard being run
+        self._current_shard: Optional[tuple[str, threading.Event]] = None
+
+    def stop(self, *_):
+        logger.info(f"Execution worker {self.worker_id} stopping")
+        self._stopped.set()
+        current_shard = self._current_shard
+        if current_shard is not None:
+            current_shard[1].set()
+
+    def _stop_cancelled_shard(self):
+        current_shard = self._current_shard
+        if current_shard is not None and execution_queue.is_cancelled(
+            current_shard[0], self.redis_client
+        ):
+            current_shard[1].set()
+
+    def _beat(self):
+        self.redis_client.set(self.heartbeat_key, 1, ex=EXECUTION_WORKER_HEARTBEAT_TTL)
+
+    def _heartbeat_loop(self):
+        while not self._exited.wait(EXECUTION_WORKER_HEARTBEAT_TTL / 3):
+            try:
+                self._beat()
+                self._stop_cancelled_shard()
+            except Exception:
+                logger.exception(
+                    f"Heartbeat of execution worker {self.worker_id} failed"
+                )
+
+    def run(self):
+        self._beat()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        logger.info(f"Execution worker {self.worker_id} started")
+
+        try:
+            while not self._stopped.is_set():
+                execution_queue.requeue_orphaned_shards(self.redis_client)
+                message = self.redis_client.blmove(
+                    execution_queue.QUEUE_KEY,
+                    self.processing_key,
+                    _QUEUE_POLL_TIMEOUT,
+                    src="RIGHT",
+                    dest="LEFT",
+                )
+                if message is None:
+                    continue
+                try:
+                    ended = self.process_shard(json.loads(message))
+                except Exception:
+                    # Dropped rather than requeued, it would fail every worker
+                    logger.exception(f"Shard message {message!r} failed")
+                    self._fail_shard(message)
+                    ended = True
+                if ended:
+                    self.redis_client.lrem(self.processing_key, 1, message)
+                else:
+                    self._requeue_shard(message)
+        finally:
+            self._exited.set()
+            self.redis_client.delete(self.heartbeat_key)
+            logger.info(f"Execution worker {self.worker_id} stopped")
+
+    def _requeue_shard(self, message: bytes):
+        # Next in line, as the shards of dead workers
+        pipeline = self.redis_client.pipeline()
+        pipeline.lrem(self.processing_key, 1, message)
+        pipeline.rpush(execution_queue.QUEUE_KEY, message)
+        pipeline.execute()
+        logger.info(f"Execution worker {self.worker_id} requeued shard {message!r}")
+
+    def _fail_shard(self, message: bytes):
+        try:
+            shard = json.loads(message)
+            execution_queue.complete_shard(
+                shard["test_suite_report_id"],
+                shard["shard_id"],
+                status="failed",
+                redis_client=self.redis_client,
+            )
+        except Exception:
+            logger.exception(f"Could not mark shard message {message!r} as failed")
+
+    def process_shard(self, shard: dict) -> bool:
+        """
+        Execute the test cases of a shard not reported yet. Returns whether the
+        shard ended, False when the worker was stopped before.
+        """
+        test_suite_report_id = shard["test_suite_report_id"]
+        shard_id = shard["shard_id"]
+        test_case_ids = shard["test_case_ids"]
+        done = 0
+        # Set by a stop of the worker, or by its heartbeat on a cancel
+        stop_event = threading.Event()
+        self._current_shard = (test_suite_report_id, stop_event)
+        if self._stopped.is_set():
+            stop_event.set()
+
+        def _on_flush(reports: list):
+            nonlocal done
+            done += len(reports)
+            execution_queue.update_shard_progress(
+                test_suite_report_id,
+                shard_id,
+                redis_client=self.redis_client,
+                done=done,
+            )
+
+        if execution_queue.is_cancelled(test_suite_report_id, self.redis_client):
+            stop_event.set()
+
+        status = "completed"
+        try:
+            # Reports of a requeued shard's earlier attempt; the cases are
+            # scheduled anyway so that their dependents see how they ended
+            previous_reports = (
+                repositories.TestCaseReportRepository.get_all_by_test_case_ids(
+                    test_suite_report_id=test_suite_report_id,
+                    test_case_ids=test_case_ids,
+                )
+            )
+            test_cases = repositories.TestCaseRepository.get_all_by_ids(test_case_ids)
+            done = len(previous_reports)
+            execution_queue.update_shard_progress(
+                test_suite_report_id,
+                shard_id,
+                redis_client=self.redis_client,
+                status="running",
+                worker_id=self.worker_id,
+                done=done,
+            )
+            logger.info(
+                f"Executing shard {shard_id} of test suite report "
+                f"{test_suite_report_id}: {len(test_cases) - done} test cases "
+                f"({done} already reported)"
+            )
+            if not stop_event.is_set():
+                asyncio.run(
+                    aexecute_test_cases(
+                        test_suite_report_id=test_suite_report_id,
+                        test_cases=test_cases,
+                        concurrency=shard.get("concurrency"),
+                        on_flush=_on_flush,
+                        seed=shard.get("seed"),
+                        previous_reports=previous_reports,
+                        stop_event=stop_event,
+                    )
+                )
+            if stop_event.is_set():
+                if not execution_queue.is_cancelled(
+                    test_suite_report_id, self.redis_client
+                ):
+                    return False
+                logger.info(
+                    f"Shard {shard_id} of test suite report {test_suite_report_id} "
+                    f"cancelled"
+                )
+                status = "cancelled"
+        except Exception:
+            logger.exception(
+                f"Shard {shard_id} of test suite report {test_suite_report_id} failed"
+            )
+            status = "failed"
+        finally:
+            self._current_shard = None
+
+        execution_queue.complete_shard(
+            test_suite_report_id,
+            shard_id,
+            status=status,
+            redis_client=self.redis_client,
+        )
+        return True
+
+
+def run_worker():
+    setup_logging()
+    worker = ExecutionWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run test case execution workers.")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=EXECUTION_WORKER_PROCESSES,
+        help="Number of worker processes to start.",
+    )
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        run_worker()
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, name=f"execution-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def _forward_signal(signum, _):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    signal.signal(signal.SIGTERM, _forward_signal)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
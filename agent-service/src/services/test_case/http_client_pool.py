@@ -0,0 +1,59 @@
+# src.services.test_case.http_client_pool
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.settings import EXECUTION_MAX_CONNECTIONS_PER_HOST, EXECUTION_REQUEST_TIMEOUT
+
+
+def get_host_key(url: str) -> str:
+    """Return the origin (`scheme://host:port`) a request will be sent to."""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+class HostClientPool:
+    """
+    Keeps one keep-alive `httpx.AsyncClient` per target origin.
+
+    All test cases of a run that hit the same host share the client, so TCP/TLS
+    handshakes are paid once per pooled connection instead of once per request.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = EXECUTION_MAX_CONNECTIONS_PER_HOST,
+        timeout: float = EXECUTION_REQUEST_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self._transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        host_key = get_host_key(url)
+        client = self._clients.get(host_key)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_host,
+                    max_keepalive_connections=self.max_connections_per_host,
+                ),
+                timeout=self.timeout,
+                transport=self._transport,
+            )
+            self._clients[host_key] = client
+        return client
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def __aenter__(self) -> "HostClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,408 @@
+# src.services.test_case.load_test
+import asyncio
+import itertools
+import threading
+import time
+from array import array
+from graphlib import TopologicalSorter
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from sqlmodel import Session
+
+from src import models, repositories
+from src.common.common import percentile
+from src.models.test_entity.load_test_report_model import MAX_LOAD_TEST_REQUESTS
+from src.services.test_case.dependency_graph import (
+    add_dependencies,
+    build_dependency_graph,
+    describe_names,
+    extract_variables,
+    substitute_variables,
+)
+from src.services.test_case.execute_test_case import (
+    SUPPORTED_METHODS,
+    execute_test_case,
+    make_skipped_report,
+    resolve_seed,
+)
+from src.services.test_case.http_client_pool import HostClientPool
+from src.services.test_case.report_writer import ReportBatchWriter
+from src.services.test_case.request_template import RequestTemplate, make_rng
+from src.services.test_case.response_assertions import CompiledAssertions
+from src.settings import EXECUTION_RANDOM_SEED, get_db_engine, logger
+
+
+def get_endpoint(method: str, url: str) -> str:
+    """Group requests by method and URL without query string."""
+    parts = urlsplit(url)
+    return f"{method} {parts.scheme}://{parts.netloc}{parts.path}"
+
+
+class LoadTarget(NamedTuple):
+    test_case: repositories.TestCaseRepository
+    endpoint: str
+    method: str
+    url: str
+    headers: dict
+    request_template: RequestTemplate
+    expected_status_code: str
+    assertions: CompiledAssertions
+
+
+class EndpointStats:
+    """Latency samples (seconds) and error count collected for one endpoint."""
+
+    def __init__(self):
+        self.latencies = array("d")
+        self.errors = 0
+
+    def record(self, latency: float, is_error: bool):
+        self.latencies.append(latency)
+        if is_error:
+            self.errors += 1
+
+    def to_report(
+        self, test_suite_report_id: str, endpoint: str, duration: float
+    ) -> repositories.LoadTestReportRepository:
+        latencies_ms = sorted(latency * 1000 for latency in self.latencies)
+        total = len(latencies_ms)
+        return repositories.LoadTestReportRepository(
+            test_suite_report_id=test_suite_report_id,
+            endpoint=endpoint,
+            total_requests=total,
+            error_requests=self.errors,
+            error_rate=self.errors / total if total else 0.0,
+            throughput_rps=total / duration if duration > 0 else 0.0,
+            latency_mean_ms=sum(latencies_ms) / total if total else 0.0,
+            latency_p50_ms=percentile(latencies_ms, 50),
+            latency_p90_ms=percentile(latencies_ms, 90),
+            latency_p99_ms=percentile(latencies_ms, 99),
+            latency_max_ms=latencies_ms[-1] if latencies_ms else 0.0,
+            duration_seconds=duration,
+        )
+
+
+class LoadTestRunner:
+    """
+    Replays the requests of a suite's test cases for a fixed duration.
+
+    With `target_rps` set, requests are started on a fixed schedule (open model)
+    and latency is measured from the scheduled start, so time spent queued
+    behind the `concurrency` cap counts against the target. Without it,
+    `concurrency` virtual users send requests back-to-back (closed model), up
+    to MAX_LOAD_TEST_REQUESTS: the open model is held to it by its config.
+    Responses that miss the expected status code or fail the case's compiled
+    `response_mapping` assertions count as errors. `variables` maps a test
+    case to the values of its `{{name}}` references, extracted from its
+    prerequisites before the load phase. Load tests bypass the
+    per-host limiter and retries on purpose: overload answers are part of what
+    is being measured.
+    """
+
+    def __init__(
+        self,
+        test_cases: list[repositories.TestCaseRepository],
+        config: models.LoadTestConfigModel,
+        client_pool: HostClientPool,
+        seed: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        variables: Optional[dict[str, dict]] = None,
+    ):
+        self.config = config
+        # Set to end the run before its duration
+        self.stop_event = stop_event or threading.Event()
+        self.client_pool = client_pool
+        self.rng = make_rng(seed if seed is not None else EXECUTION_RANDOM_SEED)
+        self.targets: list[LoadTarget] = []
+        variables = variables or {}
+        for test_case in test_cases:
+            case_variables = variables.get(test_case.id)
+            method = test_case.api_info.get("method", "GET").upper()
+            url = substitute_variables(test_case.api_info.get("url"), case_variables)
+            if method not in SUPPORTED_METHODS or not url:
+                logger.warning(f"Skipping test case {test_case.id} in load test")
+                continue
+            try:
+                request_template = RequestTemplate(
+                    substitute_variables(test_case.request_body, case_variables)
+                )
+                assertions = CompiledAssertions(
+                    test_case.expected_output.get("response_mapping", {})
+                )
+            except Exception as e:
+                # A functional run reports the same case as an error
+                logger.warning(
+                    f"Skipping test case {test_case.id} in load test, "
+                    f"its request body or response mapping is invalid: {e}"
+                )
+                continue
+            self.targets.append(
+                LoadTarget(
+                    test_case=test_case,
+                    endpoint=get_endpoint(method, url),
+                    method=method,
+                    url=url,
+                    headers=substitute_variables(
+                        test_case.api_info.get("headers", {}), case_variables
+                    ),
+                    request_template=request_template,
+                    expected_status_code=str(
+                        test_case.expected_output.get("statuscode")
+                    ),
+                    assertions=assertions,
+                )
+            )
+        self.stats: dict[str, EndpointStats] = {
+            target.endpoint: EndpointStats() for target in self.targets
+        }
+        self.sent = 0
+
+    async def _send(self, target: LoadTarget, started_at: float):
+        request_body = target.request_template.render(self.rng)
+        try:
+            response = await self.client_pool.get_client(target.url).request(
+                target.method,
+                target.url,
+                headers=target.headers,
+                json=request_body if target.method != "GET" else None,
+            )
+            is_error = str(response.status_code) != target.expected_status_code
+            if not is_error and target.assertions:
+                is_error = not target.assertions.matches(
+                    response.json() if response.content else {}
+                )
+        except Exception:
+            is_error = True
+        self.stats[target.endpoint].record(time.perf_counter() - started_at, is_error)
+
+    async def _run_closed(self, deadline: float):
+        targets = itertools.cycle(self.targets)
+
+        async def _virtual_user():
+            while (
+                time.perf_counter() < deadline
+                and not self.stop_event.is_set()
+                and self.sent < MAX_LOAD_TEST_REQUESTS
+            ):
+                self.sent += 1
+                await self._send(next(targets), time.perf_counter())
+
+        await asyncio.gather(*(_virtual_user() for _ in range(self.config.concurrency)))
+
+    async def _run_open(self, started_at: float, deadline: float):
+        targets = itertools.cycle(self.targets)
+        interval = 1 / self.config.target_rps
+        in_flight = asyncio.Semaphore(self.config.concurrency)
+        tasks = set()
+
+        def _on_done(task: asyncio.Task):
+            tasks.discard(task)
+            in_flight.release()
+
+        for i in itertools.count():
+            scheduled_at = started_at + i * interval
+            if scheduled_at >= deadline or self.stop_event.is_set():
+                break
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await in_flight.acquire()
+            task = asyncio.create_task(self._send(next(targets), scheduled_at))
+            task.add_done_callback(_on_done)
+            tasks.add(task)
+
+        await asyncio.gather(*tasks)
+
+    async def run(self) -> float:
+        """
+        Run the load test and return its duration in seconds: the configured
+        window, or longer when in-flight requests outlive it.
+        """
+        if not self.targets:
+            return 0.0
+
+        started_at = time.perf_counter()
+        deadline = started_at + self.config.duration_seconds
+        if self.config.target_rps:
+            await self._run_open(started_at, deadline)
+        else:
+            await self._run_closed(deadline)
+        if self.stop_event.is_set() or self.sent >= MAX_LOAD_TEST_REQUESTS:
+            return time.perf_counter() - started_at
+        return max(time.perf_counter() - started_at, self.config.duration_seconds)
+
+
+async def run_prerequisites(
+    test_suite_report_id: str,
+    test_cases: list[repositories.TestCaseRepository],
+    suite_test_cases: list[repositories.TestCaseRepository],
+    client_pool: HostClientPool,
+    seed: Optional[int] = None,
+) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Execute once, in dependency order, the prerequisites of the `test_cases`
+    that have some, as a functional run would. Returns the variables each of
+    those cases sees, and why the ones that cannot be load tested are left
+    out: a prerequisite did not pass.
+    """
+    chained = [test_case for test_case in test_cases if test_case.depends_on]
+    if not chained:
+        return {}, {}
+
+    chained_ids = {test_case.id for test_case in chained}
+    setup_test_cases = add_dependencies(chained, suite_test_cases)
+    test_cases_by_id = {test_case.id: test_case for test_case in setup_test_cases}
+    graph = build_dependency_graph(setup_test_cases)
+    prerequisite_ids = set().union(*graph.values())
+
+    scopes: dict[str, dict] = {}
+    unsuccessful: dict[str, str] = {}
+    for test_case_id in TopologicalSorter(graph).static_order():
+        dependencies = graph[test_case_id]
+        blocked = sorted(dependencies & unsuccessful.keys())
+        if blocked:
+            unsuccessful[test_case_id] = (
+                f"dependency {describe_names(blocked)} did not pass"
+            )
+            continue
+
+        variables = {}
+        for dependency in dependencies:
+            variables.update(scopes[dependency])
+        if test_case_id in prerequisite_ids:
+            test_case = test_cases_by_id[test_case_id]
+            result = await execute_test_case(
+                test_case=test_case,
+                test_suite_id=test_suite_report_id,
+                client_pool=client_pool,
+                rng=make_rng(seed, salt=test_case_id),
+                variables=variables,
+            )
+            if result.status != "passed":
+                unsuccessful[test_case_id] = f"prerequisite run {result.status}"
+                continue
+            extracted, missing = extract_variables(
+                test_case.extract or {}, result.response_body, result.response_header
+            )
+            if missing:
+                unsuccessful[test_case_id] = (
+                    f"could not extract {describe_names(missing)}"
+                )
+                continue
+            variables.update(extracted)
+        scopes[test_case_id] = variables
+
+    return (
+        {
+            test_case_id: scopes[test_case_id]
+            for test_case_id in chained_ids & scopes.keys()
+        },
+        {
+            test_case_id: unsuccessful[test_case_id]
+            for test_case_id in chained_ids & unsuccessful.keys()
+        },
+    )
+
+
+async def arun_load_test(
+    test_suite_report_id: str,
+    test_suite_id: str,
+    config: models.LoadTestConfigModel,
+    seed: Optional[int] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    seed = resolve_seed(seed)
+    suite_test_cases = repositories.TestCaseRepository.get_all_by_test_suite_id(
+        test_suite_id=test_suite_id
+    )
+    test_cases = [test_case for test_case in suite_test_cases if test_case.execute]
+    repositories.TestSuiteReportRepository(
+        id=test_suite_report_id,
+        test_suite_id=test_suite_id,
+        mode="load",
+        seed=seed,
+        total_test_cases=len(test_cases),
+    ).create()
+
+    logger.info(
+        f"Load testing {len(test_cases)} test cases of suite {test_suite_id}: "
+        f"{config.model_dump()}"
+    )
+
+    try:
+        async with HostClientPool(
+            max_connections_per_host=config.concurrency
+        ) as client_pool:
+            variables, excluded = await run_prerequisites(
+                test_suite_report_id,
+                test_cases,
+                suite_test_cases,
+                client_pool,
+                seed=seed,
+            )
+            if excluded:
+                # Listed as skipped in the case reports of the suite report
+                report_writer = ReportBatchWriter(test_suite_report_id)
+                for test_case in test_cases:
+                    if test_case.id in excluded:
+                        await report_writer.add(
+                            make_skipped_report(
+                                test_case,
+                                test_suite_report_id,
+                                reason=excluded[test_case.id],
+                            )
+                        )
+                await report_writer.flush()
+                logger.warning(
+                    f"Load test of suite report {test_suite_report_id} leaves out "
+                    f"{len(excluded)} test cases whose prerequisites did not pass"
+                )
+
+            runner = LoadTestRunner(
+                [test_case for test_case in test_cases if test_case.id not in excluded],
+                config,
+                client_pool,
+                seed=seed,
+                stop_event=stop_event,
+                variables=variables,
+            )
+            duration = await runner.run()
+
+        load_test_reports = [
+            stats.to_report(test_suite_report_id, endpoint, duration)
+            for endpoint, stats in runner.stats.items()
+        ]
+        with Session(get_db_engine()) as session:
+            session.add_all(load_test_reports)
+            session.commit()
+    except BaseException:
+        logger.exception(f"Load test of suite report {test_suite_report_id} failed")
+        repositories.TestSuiteReportRepository.finish(
+            test_suite_report_id=test_suite_report_id, status="failed"
+        )
+        raise
+
+    repositories.TestSuiteReportRepository.finish(
+        test_suite_report_id=test_suite_report_id
+    )
+
+
+def run_load_test(
+    test_suite_report_id: str,
+    test_suite_id: str,
+    config: models.LoadTestConfigModel,
+    seed: Optional[int] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """Synchronous entry point, runs `arun_load_test` on a fresh event loop."""
+    asyncio.run(
+        arun_load_test(
+            test_suite_report_id=test_suite_report_id,
+            test_suite_id=test_suite_id,
+            config=config,
+            seed=seed,
+            stop_event=stop_event,
+        )
+    )
@@ -0,0 +1,248 @@
+# src.services.test_case.rate_limiter
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from src.settings import (
+    EXECUTION_MAX_CONNECTIONS_PER_HOST,
+    EXECUTION_RATE_LIMIT_BURST,
+    EXECUTION_RATE_LIMIT_PER_HOST,
+    logger,
+)
+
+# Status codes that mean "the target is overloaded, slow down"
+OVERLOAD_STATUS_CODES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header into a number of seconds.
+    Supports both the delta-seconds and the HTTP-date forms.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate to a host.
+
+    State is guarded by a `threading.Lock` so one bucket can be shared by suites
+    running on different event loops. Callers reserve a token and sleep for the
+    returned delay, which keeps waiting requests in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller has to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            pause = max(0.0, self._paused_until - now)
+            if self.rate <= 0:
+                return pause
+
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, pause)
+
+    def pause(self, seconds: float):
+        """Hold every new request to the host for `seconds` (e.g. `Retry-After`)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def _set_granted(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AimdController:
+    """
+    Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    The limit grows by roughly one slot per round-trip while latency stays close
+    to the best latency seen, holds when latency degrades, and is cut by
+    `decrease_factor` whenever the target answers with 429/503.
+
+    Callers waiting for a slot queue up in FIFO order, each on a future of its
+    own event loop: a freed slot is handed to the first one directly.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float = 1.0,
+        max_limit: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit if max_limit is not None else initial_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+        self._limit = min(max(initial_limit, min_limit), self.max_limit)
+        self._in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._decreased_at = float("-inf")
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            # Queued callers go first
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            return False
+
+    async def acquire(self):
+        if self.try_acquire():
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            self._waiters.append((loop, future))
+            # A slot may have been freed between the two locks
+            self._wake_waiters()
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                    granted = False
+                except ValueError:
+                    granted = True
+            # Handed a slot at the time it was cancelled, pass it on
+            if granted:
+                self.release()
+            raise
+
+    def _wake_waiters(self):
+        """Hand the free slots to the first waiters, called with the lock held."""
+        while self._waiters and self._in_flight < self.limit:
+            loop, future = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_set_granted, future)
+            except RuntimeError:
+                # Its event loop is closed, nobody waits on it anymore
+                continue
+            self._in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_waiters()
+
+    def on_success(self, latency: float):
+        with self._lock:
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            if latency <= self._min_latency * self.latency_tolerance:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                self._wake_waiters()
+
+    def on_overload(self):
+        with self._lock:
+            # A burst of concurrent 429s is one congestion signal, not many
+            now = time.monotonic()
+            if now - self._decreased_at < self.decrease_cooldown:
+                return
+            self._decreased_at = now
+            self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+
+
+class HostRateLimiter:
+    """Rate and concurrency limits applied to every request sent to one host."""
+
+    def __init__(
+        self,
+        host_key: str,
+        rate: float = EXECUTION_RATE_LIMIT_PER_HOST,
+        burst: Optional[float] = EXECUTION_RATE_LIMIT_BURST,
+        max_concurrency: int = EXECUTION_MAX_CONNECTIONS_PER_HOST,
+    ):
+        self.host_key = host_key
+        self.bucket = TokenBucket(rate=rate, capacity=burst)
+        self.concurrency = AimdController(
+            initial_limit=max_concurrency, max_limit=max_concurrency
+        )
+
+    async def __aenter__(self) -> "HostRateLimiter":
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.concurrency.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.concurrency.release()
+
+    def on_success(self, latency: float):
+        self.concurrency.on_success(latency)
+
+    def on_overload(self, retry_after: float):
+        self.concurrency.on_overload()
+        self.bucket.pause(retry_after)
+        logger.warning(
+            f"Host {self.host_key} is overloaded, backing off {retry_after:.2f}s "
+            f"(concurrency limit={self.concurrency.limit})"
+        )
+
+
+_host_limiters: dict[str, HostRateLimiter] = {}
+_host_limiters_lock = threading.Lock()
+
+
+def get_host_rate_limiter(host_key: str) -> HostRateLimiter:
+    """Return the process-wide limiter of a host, shared by all running suites."""
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host_key)
+        if limiter is None:
+            limiter = HostRateLimiter(host_key=host_key)
+            _host_limiters[host_key] = limiter
+        return limiter
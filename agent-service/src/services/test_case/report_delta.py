@@ -0,0 +1,70 @@
+# src.services.test_case.report_delta
+from src import repositories
+
+
+def compare_statuses(
+    previous_statuses: dict[str, str], current_statuses: dict[str, str]
+) -> dict:
+    """
+    Compare the statuses of the test cases re-run in `current_statuses` with
+    the statuses they had before. Cases skipped this time are neither fixed
+    nor failing, and unsuccessful cases of the previous run that have no
+    result yet are listed as pending.
+    """
+    fixed, still_failing, regressed, skipped = [], [], [], []
+    for test_case_id, status in current_statuses.items():
+        entry = {
+            "test_case_id": test_case_id,
+            "previous_status": previous_statuses.get(test_case_id),
+            "current_status": status,
+        }
+        was_passed = entry["previous_status"] == "passed"
+        if status.startswith("skipped"):
+            skipped.append(entry)
+        elif status == "passed":
+            if not was_passed:
+                fixed.append(entry)
+        elif was_passed:
+            regressed.append(entry)
+        else:
+            still_failing.append(entry)
+
+    pending = [
+        test_case_id
+        for test_case_id, status in previous_statuses.items()
+        if status != "passed" and test_case_id not in current_statuses
+    ]
+    return {
+        "summary": {
+            "fixed": len(fixed),
+            "still_failing": len(still_failing),
+            "regressed": len(regressed),
+            "skipped": len(skipped),
+            "pending": len(pending),
+        },
+        "fixed": fixed,
+        "still_failing": still_failing,
+        "regressed": regressed,
+        "skipped": skipped,
+        "pending": pending,
+    }
+
+
+def get_report_delta(test_suite_report: repositories.TestSuiteReportRepository) -> dict:
+    """Delta of a re-run report against the report it was re-run from."""
+    previous_statuses = (
+        repositories.TestCaseReportRepository.get_statuses_by_test_suite_report_id(
+            test_suite_report_id=test_suite_report.parent_report_id
+        )
+    )
+    current_statuses = (
+        repositories.TestCaseReportRepository.get_statuses_by_test_suite_report_id(
+            test_suite_report_id=test_suite_report.id
+        )
+    )
+    return {
+        "test_suite_report_id": test_suite_report.id,
+        "parent_report_id": test_suite_report.parent_report_id,
+        "status": test_suite_report.status,
+        **compare_statuses(previous_statuses, current_statuses),
+    }
@@ -0,0 +1,59 @@
+# src.services.test_case.report_writer
+import asyncio
+from typing import Callable, Optional
+
+from src import repositories
+from src.settings import EXECUTION_REPORT_BATCH_SIZE
+
+
+class ReportBatchWriter:
+    """
+    Streams test case reports to the database while a suite is executing.
+
+    Reports are buffered and written in batches of `batch_size` with one bulk
+    INSERT, and the running counters of the suite report are bumped in the same
+    step. Flushes run in a worker thread so requests keep flowing meanwhile;
+    `on_flush` is called there with every batch once it is committed.
+    """
+
+    def __init__(
+        self,
+        test_suite_report_id: str,
+        batch_size: int = EXECUTION_REPORT_BATCH_SIZE,
+        on_flush: Optional[Callable[[list], None]] = None,
+    ):
+        self.test_suite_report_id = test_suite_report_id
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._buffer: list[repositories.TestCaseReportRepository] = []
+        self._flush_lock = asyncio.Lock()
+
+    async def add(self, report: repositories.TestCaseReportRepository):
+        self._buffer.append(report)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        reports, self._buffer = self._buffer, []
+        # Keep batches (and counter updates) in completion order
+        async with self._flush_lock:
+            await asyncio.to_thread(self._write_batch, reports)
+
+    def _write_batch(self, reports: list[repositories.TestCaseReportRepository]):
+        repositories.TestCaseReportRepository.bulk_insert(reports)
+
+        passed = sum(1 for report in reports if report.status == "passed")
+        failed = sum(1 for report in reports if report.status == "failed")
+        # Statuses of the skipped reports are "skipped: <reason>"
+        skipped = sum(1 for report in reports if report.status.startswith("skipped"))
+        repositories.TestSuiteReportRepository.increment_counters(
+            test_suite_report_id=self.test_suite_report_id,
+            passed=passed,
+            failed=failed,
+            errored=len(reports) - passed - failed - skipped,
+            skipped=skipped,
+        )
+        if self.on_flush is not None:
+            self.on_flush(reports)
@@ -0,0 +1,121 @@
+# src.services.test_case.request_template
+import random
+import re
+import string
+from typing import Any, Callable, Optional, Union
+
+# CHARS(n), NUMS(n), ALPHANUMS(n) and EMAIL(n) placeholders of generated bodies
+_PLACEHOLDER = re.compile(r"(CHARS|NUMS|ALPHANUMS|EMAIL)\((\d+)\)")
+# Values that are replaced the same way on every request
+_CONSTANTS = {"N/A": "", "NULL": None}
+# Fields and items with this value are left out of the request
+ABSENT = "ABSENT"
+
+_ALPHABETS = {
+    "CHARS": string.ascii_letters,
+    "NUMS": string.digits,
+    "ALPHANUMS": string.ascii_letters + string.digits,
+}
+
+_default_rng = random.Random()
+
+PathStep = Union[str, int]
+Generator = Callable[[random.Random], str]
+
+
+def make_rng(seed: Optional[int] = None, salt: str = "") -> random.Random:
+    """
+    RNG for rendering request bodies. With a seed the payloads are reproducible;
+    the salt (e.g. the test case ID) keeps them independent of execution order.
+    """
+    if seed is None:
+        return _default_rng
+    return random.Random(f"{seed}:{salt}")
+
+
+def _random_string(alphabet: str, length: int) -> Generator:
+    return lambda rng: "".join(rng.choices(alphabet, k=length))
+
+
+def _random_email(length: int) -> Generator:
+    local_length = max(1, length - 10)
+
+    def generate(rng: random.Random) -> str:
+        local = "".join(
+            rng.choices(string.ascii_lowercase + string.digits, k=local_length)
+        )
+        domain = "".join(rng.choices(string.ascii_lowercase, k=5))
+        return f"{local}@{domain}.com"
+
+    return generate
+
+
+def compile_placeholder(value: Any) -> Optional[Generator]:
+    """Return the generator of a placeholder value, None for a literal value."""
+    if not isinstance(value, str):
+        return None
+    match = _PLACEHOLDER.fullmatch(value)
+    if match is None:
+        return None
+    kind, length = match.group(1), int(match.group(2))
+    if kind == "EMAIL":
+        return _random_email(length)
+    return _random_string(_ALPHABETS[kind], length)
+
+
+class RequestTemplate:
+    """
+    A request body with its placeholders compiled once.
+
+    Compiling drops ABSENT fields, replaces N/A and NULL, and records the path
+    of every random placeholder. Rendering copies only the containers on those
+    paths and fills them in, so a body without placeholders is returned as is
+    and must be treated as read-only.
+    """
+
+    def __init__(self, request_body: Any):
+        self._slots: list[tuple[tuple[PathStep, ...], Generator]] = []
+        # The body is kept in a holder so a top-level placeholder is a slot too
+        self._holder = [self._compile(request_body, (0,))]
+
+        container_paths = {
+            slot_path[:depth]
+            for slot_path, _ in self._slots
+            for depth in range(1, len(slot_path))
+        }
+        # Parents have to be copied before their children
+        self._container_paths = sorted(container_paths, key=len)
+
+    def _compile(self, value: Any, path: tuple[PathStep, ...]) -> Any:
+        if isinstance(value, dict):
+            return {
+                key: self._compile(item, path + (key,))
+                for key, item in value.items()
+                if item != ABSENT
+            }
+        if isinstance(value, list):
+            items = [item for item in value if item != ABSENT]
+            return [
+                self._compile(item, path + (index,)) for index, item in enumerate(items)
+            ]
+        if isinstance(value, str) and value in _CONSTANTS:
+            return _CONSTANTS[value]
+
+        generate = compile_placeholder(value)
+        if generate is None:
+            return value
+        self._slots.append((path, generate))
+        return None
+
+    def render(self, rng: Optional[random.Random] = None) -> Any:
+        if not self._slots:
+            return self._holder[0]
+
+        rng = rng or _default_rng
+        containers: dict[tuple[PathStep, ...], Any] = {(): list(self._holder)}
+        for path in self._container_paths:
+            parent = containers[path[:-1]]
+            parent[path[-1]] = containers[path] = parent[path[-1]].copy()
+        for path, generate in self._slots:
+            containers[path[:-1]][path[-1]] = generate(rng)
+        return containers[()][0]
@@ -0,0 +1,93 @@
+# src.services.test_case.request_timing
+import time
+from array import array
+from typing import Optional
+
+from src.common.common import percentile
+
+# Phases reported for every executed request, in milliseconds
+TIMING_PHASES = (
+    "wait_ms",
+    "connect_ms",
+    "tls_ms",
+    "send_ms",
+    "ttfb_ms",
+    "download_ms",
+    "total_ms",
+    "overhead_ms",
+)
+
+
+class RequestTiming:
+    """
+    Monotonic (`time.perf_counter`) timestamps of one HTTP exchange.
+
+    Passed to httpx as the `trace` extension, it records the httpcore events of
+    the request. Phases of a request sent on a reused keep-alive connection
+    have no connect/TLS events and report 0 for them.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ended_at: Optional[float] = None
+        self._events: dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: dict):
+        # "http11.send_request_headers.started" -> "send_request_headers.started"
+        self._events[event_name.split(".", 1)[1]] = time.perf_counter()
+
+    def finish(self):
+        self.ended_at = time.perf_counter()
+
+    def _span_ms(self, start: str, end: str) -> float:
+        started, ended = self._events.get(start), self._events.get(end)
+        if started is None or ended is None:
+            return 0.0
+        return (ended - started) * 1000
+
+    def to_dict(self) -> dict[str, float]:
+        ended_at = self.ended_at or time.perf_counter()
+        return {
+            # DNS resolution happens inside httpcore's connect_tcp step
+            "connect_ms": self._span_ms("connect_tcp.started", "connect_tcp.complete"),
+            "tls_ms": self._span_ms("start_tls.started", "start_tls.complete"),
+            "send_ms": self._span_ms(
+                "send_request_headers.started", "send_request_body.complete"
+            ),
+            "ttfb_ms": self._span_ms(
+                "send_request_body.complete", "receive_response_headers.complete"
+            ),
+            "download_ms": self._span_ms(
+                "receive_response_headers.complete", "receive_response_body.complete"
+            ),
+            "total_ms": (ended_at - self.started_at) * 1000,
+        }
+
+
+class TimingAggregator:
+    """Collects per-request phases of a run and summarises them per phase."""
+
+    def __init__(self):
+        self._samples: dict[str, array] = {phase: array("d") for phase in TIMING_PHASES}
+
+    def add(self, timings: Optional[dict]):
+        if not timings:
+            return
+        for phase, samples in self._samples.items():
+            value = timings.get(phase)
+            if value is not None:
+                samples.append(value)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for phase, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[phase] = {
+                "mean": round(sum(ordered) / len(ordered), 3),
+                "p50": round(percentile(ordered, 50), 3),
+                "p95": round(percentile(ordered, 95), 3),
+                "max": round(ordered[-1], 3),
+            }
+        return result
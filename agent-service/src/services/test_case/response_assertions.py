@@ -0,0 +1,206 @@
+# src.services.test_case.response_assertions
+import re
+from typing import Any, Callable, NamedTuple, Union
+
+# Marker for a path that does not exist in the response
+MISSING = object()
+
+_PATH_TOKEN = re.compile(r"\.?([^.\[\]]+)|\[(-?\d+|\*)\]")
+_KEYWORD = re.compile(r"(TYPE|REGEX|RANGE)\((.*)\)", re.DOTALL)
+# LLM-generated mappings use "<some_value>" when any value is acceptable
+_PLACEHOLDER = re.compile(r"<[^<>]*>")
+
+_JSON_TYPES = {
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float))
+    and not isinstance(value, bool),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+    "null": lambda value: value is None,
+}
+
+WILDCARD = "*"
+PathStep = Union[str, int]
+
+
+def compile_path(path: str) -> tuple[PathStep, ...]:
+    """
+    Compile a JSONPath-style path (`$.data.items[0].id`, `items[*].id`, `code`)
+    into a tuple of dict keys, list indexes and `WILDCARD` steps.
+    """
+    path = path.strip()
+    if path.startswith("$"):
+        path = path[1:]
+
+    steps: list[PathStep] = []
+    position = 0
+    while position < len(path):
+        match = _PATH_TOKEN.match(path, position)
+        if match is None:
+            raise ValueError(f"Invalid response path: {path!r}")
+        key, index = match.groups()
+        if key is not None:
+            steps.append(key)
+        elif index == WILDCARD:
+            steps.append(WILDCARD)
+        else:
+            steps.append(int(index))
+        position = match.end()
+    return tuple(steps)
+
+
+def resolve_path(document: Any, steps: tuple[PathStep, ...]) -> list:
+    """Return the values at `steps`; wildcards fan out, missing paths yield MISSING."""
+    values = [document]
+    for step in steps:
+        next_values = []
+        for value in values:
+            if step == WILDCARD:
+                if isinstance(value, list):
+                    next_values.extend(value)
+                elif isinstance(value, dict):
+                    next_values.extend(value.values())
+            elif isinstance(step, int):
+                if isinstance(value, list) and -len(value) <= step < len(value):
+                    next_values.append(value[step])
+            elif isinstance(value, dict) and step in value:
+                next_values.append(value[step])
+        values = next_values
+        if not values:
+            return [MISSING]
+    return values
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equals(expected: Any) -> Callable[[Any], bool]:
+    def matcher(value: Any) -> bool:
+        if value == expected:
+            return True
+        # Generated mappings often quote numbers ("400" vs 400)
+        if _is_number(value) and isinstance(expected, str):
+            return str(value) == expected
+        if _is_number(expected) and isinstance(value, str):
+            return value == str(expected)
+        return False
+
+    return matcher
+
+
+def _parse_range(argument: str) -> Callable[[Any], bool]:
+    parts = [part.strip() for part in argument.split(",")]
+    if len(parts) != 2:
+        raise ValueError(f"RANGE expects 'min,max', got {argument!r}")
+    low = float(parts[0]) if parts[0] else float("-inf")
+    high = float(parts[1]) if parts[1] else float("inf")
+    return lambda value: _is_number(value) and low <= value <= high
+
+
+def compile_matcher(expected: Any) -> Callable[[Any], bool]:
+    """
+    Compile an expected value of `response_mapping` into a predicate.
+
+    Strings support the keywords ANY, ABSENT, NULL, N/A, TYPE(<json type>),
+    REGEX(<pattern>) and RANGE(<min>,<max>) (either bound may be empty);
+    "<...>" placeholders only require the field to exist. Any other value is
+    compared for equality.
+    """
+    if not isinstance(expected, str):
+        return _equals(expected)
+
+    if expected == "ANY" or _PLACEHOLDER.fullmatch(expected):
+        return lambda value: value is not MISSING
+    if expected == "ABSENT":
+        return lambda value: value is MISSING
+    if expected == "NULL":
+        return lambda value: value is None
+    if expected == "N/A":
+        return lambda value: value == ""
+
+    match = _KEYWORD.fullmatch(expected)
+    if match is None:
+        return _equals(expected)
+
+    keyword, argument = match.groups()
+    if keyword == "TYPE":
+        type_name = argument.strip().lower()
+        if type_name not in _JSON_TYPES:
+            raise ValueError(f"Unknown TYPE in response mapping: {argument!r}")
+        return _JSON_TYPES[type_name]
+    if keyword == "REGEX":
+        pattern = re.compile(argument)
+        return lambda value: isinstance(value, str) and bool(pattern.search(value))
+    return _parse_range(argument)
+
+
+class CompiledAssertion(NamedTuple):
+    path: str
+    steps: tuple[PathStep, ...]
+    expected: Any
+    matcher: Callable[[Any], bool]
+
+
+class CompiledAssertions:
+    """
+    `response_mapping` of a test case compiled into path/matcher pairs.
+
+    Nested objects in the mapping are flattened into dotted paths, so they
+    assert on the listed fields only. Compile once per test case, then call
+    `evaluate` on every response.
+    """
+
+    def __init__(self, response_mapping: dict):
+        self.assertions: list[CompiledAssertion] = []
+        self._add(response_mapping or {}, prefix="")
+
+    def _add(self, mapping: dict, prefix: str):
+        for path, expected in mapping.items():
+            full_path = f"{prefix}.{path}" if prefix else str(path)
+            if isinstance(expected, dict) and expected:
+                self._add(expected, prefix=full_path)
+                continue
+            self.assertions.append(
+                CompiledAssertion(
+                    path=full_path,
+                    steps=compile_path(full_path),
+                    expected=expected,
+                    matcher=compile_matcher(expected),
+                )
+            )
+
+    def __len__(self) -> int:
+        return len(self.assertions)
+
+    def matches(self, response_body: Any) -> bool:
+        """Cheap pass/fail check that stops at the first failing assertion."""
+        return all(
+            all(
+                assertion.matcher(value)
+                for value in resolve_path(response_body, assertion.steps)
+            )
+            for assertion in self.assertions
+        )
+
+    def evaluate(self, response_body: Any) -> tuple[bool, list[dict]]:
+        """Return whether every assertion passed and the per-assertion results."""
+        all_passed = True
+        results = []
+        for assertion in self.assertions:
+            values = resolve_path(response_body, assertion.steps)
+            passed = all(assertion.matcher(value) for value in values)
+            result = {
+                "path": assertion.path,
+                "expected": assertion.expected,
+                "passed": passed,
+            }
+            if not passed:
+                all_passed = False
+                result["actual"] = [
+                    "ABSENT" if value is MISSING else value for value in values
+                ]
+            results.append(result)
+        return all_passed, results
@@ -1,8 +1,10 @@
 import logging
 import logging.config
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 import langchain
@@ -10,8 +12,15 @@ import nltk
 import redis
 from dotenv import load_dotenv
 from minio import Minio
+from sqlalchemy.engine import Engine
 from sqlmodel import SQLModel, create_engine
 
+from src.common.pool_metrics import (
+    MeteredBlockingConnectionPool,
+    MeteredQueuePool,
+    instrument_engine,
+)
+
 load_dotenv()
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "dev")
@@ -43,10 +52,37 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "admin")
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 POSTGRES_URL = f"postgresql+psycopg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Connections kept open per process, and extra ones allowed under bursts
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Seconds to wait for a free connection before failing
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Seconds after which a connection is replaced, -1 keeps them forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True") == "True"
 
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+# Connections shared by all Redis callers of a process
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# Seconds to wait for a free Redis connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "20"))
+
+# In-process LRU tier of the function cache, consulted before Redis
+LOCAL_CACHE_ENABLED = os.getenv("LOCAL_CACHE_ENABLED", "True") == "True"
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("LOCAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "10000"))
+# Seconds an entry stays in process, capped by the Redis expiration
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", "300"))
+# Seconds a cache key stays locked while one caller computes it, and how
+# often concurrent callers in other processes check for its result
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "120"))
+CACHE_LOCK_POLL_INTERVAL = float(os.getenv("CACHE_LOCK_POLL_INTERVAL", "0.2"))
+# Cached results larger than this once serialized are not stored
+CACHE_MAX_VALUE_BYTES = int(os.getenv("CACHE_MAX_VALUE_BYTES", str(1024 * 1024)))
+# zstd level of cached results, 1 (fastest) to 22 (smallest)
+CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))
 
 MINIO_URL = os.getenv("MINIO_URL", "localhost:9000")
 MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY", "minioadmin")
@@ -59,6 +95,111 @@ VLLM_API_KEY = os.getenv("VLLM_API_KEY", "NONE")
 
 EMBEDDING_DIM = 3072
 
+# LLM requests in flight at once per process, across all agent services
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "32"))
+
+# FR groups generated at once by one test case generation run
+TESTCASE_GENERATION_MAX_CONCURRENCY = int(
+    os.getenv("TESTCASE_GENERATION_MAX_CONCURRENCY", "8")
+)
+
+# --- Google API key pool ---
+# Comma-separated keys Gemini/Gemma and embedding calls are spread across,
+# falls back to the single GOOGLE_API_KEY
+GOOGLE_API_KEYS = [
+    key.strip()
+    for key in (os.getenv("GOOGLE_API_KEYS") or os.getenv("GOOGLE_API_KEY", "")).split(
+        ","
+    )
+    if key.strip()
+]
+# Requests and tokens per minute allowed to a single key, 0 disables the limit
+GOOGLE_KEY_RPM = int(os.getenv("GOOGLE_KEY_RPM", "0"))
+GOOGLE_KEY_TPM = int(os.getenv("GOOGLE_KEY_TPM", "0"))
+# Seconds a key rests after a 429 that does not say when to retry
+GOOGLE_KEY_COOLDOWN = float(os.getenv("GOOGLE_KEY_COOLDOWN", "60"))
+
+# --- Semantic cache of agent responses ---
+# Agent services opt in with `semantic_cache`, this switches it off everywhere
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "True") == "True"
+# Cosine similarity from which a prompt reuses a cached response
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+# Seconds a cached response stays usable
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", str(7 * 24 * 3600)))
+# Share of hits answered by the LLM anyway to measure false hits, and the
+# text agreement below which such a hit counts as false
+SEMANTIC_CACHE_VERIFY_RATE = float(os.getenv("SEMANTIC_CACHE_VERIFY_RATE", "0.05"))
+SEMANTIC_CACHE_MIN_AGREEMENT = float(os.getenv("SEMANTIC_CACHE_MIN_AGREEMENT", "0.9"))
+
+# --- Workflow checkpoints ---
+# Workflow runs given a job ID save their state in Redis after every step and
+# resume from it when run again with the same ID
+WORKFLOW_CHECKPOINT_ENABLED = os.getenv("WORKFLOW_CHECKPOINT_ENABLED", "True") == "True"
+# Seconds the checkpoints of a job are kept after its last step
+WORKFLOW_CHECKPOINT_TTL = int(os.getenv("WORKFLOW_CHECKPOINT_TTL", str(24 * 3600)))
+# Checkpoints kept per job, older ones are deleted
+WORKFLOW_CHECKPOINT_KEEP_LAST = int(os.getenv("WORKFLOW_CHECKPOINT_KEEP_LAST", "2"))
+
+# Build the document preprocessing and test case generation workflows, with
+# their models, at startup instead of on their first request
+WORKFLOW_PRELOAD = os.getenv("WORKFLOW_PRELOAD", "True") == "True"
+
+# --- Test execution ---
+EXECUTION_CONCURRENCY = int(os.getenv("EXECUTION_CONCURRENCY", "32"))
+EXECUTION_MAX_CONNECTIONS_PER_HOST = int(
+    os.getenv("EXECUTION_MAX_CONNECTIONS_PER_HOST", "32")
+)
+EXECUTION_REQUEST_TIMEOUT = float(os.getenv("EXECUTION_REQUEST_TIMEOUT", "30"))
+# Requests per second allowed to a single host, 0 disables the limit
+EXECUTION_RATE_LIMIT_PER_HOST = float(os.getenv("EXECUTION_RATE_LIMIT_PER_HOST", "0"))
+EXECUTION_RATE_LIMIT_BURST = (
+    float(os.getenv("EXECUTION_RATE_LIMIT_BURST"))
+    if os.getenv("EXECUTION_RATE_LIMIT_BURST")
+    else None
+)
+# Retries of a request answered with 429/503 before it is reported
+EXECUTION_MAX_RETRIES = int(os.getenv("EXECUTION_MAX_RETRIES", "3"))
+EXECUTION_RETRY_BACKOFF = float(os.getenv("EXECUTION_RETRY_BACKOFF", "0.5"))
+EXECUTION_RETRY_AFTER_MAX = float(os.getenv("EXECUTION_RETRY_AFTER_MAX", "60"))
+# Number of test case reports written to the database per INSERT
+EXECUTION_REPORT_BATCH_SIZE = int(os.getenv("EXECUTION_REPORT_BATCH_SIZE", "100"))
+# Seed of the random request body placeholders, unset for fresh values per run
+EXECUTION_RANDOM_SEED = (
+    int(os.getenv("EXECUTION_RANDOM_SEED"))
+    if os.getenv("EXECUTION_RANDOM_SEED")
+    else None
+)
+# "background" runs suites inside the API process, "queue" hands them to workers
+EXECUTION_BACKEND = os.getenv("EXECUTION_BACKEND", "background")
+# Number of test cases per job pushed to the Redis execution queue
+EXECUTION_SHARD_SIZE = int(os.getenv("EXECUTION_SHARD_SIZE", "200"))
+EXECUTION_WORKER_PROCESSES = int(
+    os.getenv("EXECUTION_WORKER_PROCESSES", str(os.cpu_count() or 1))
+)
+# Seconds without a heartbeat after which a worker's shards are requeued
+EXECUTION_WORKER_HEARTBEAT_TTL = int(os.getenv("EXECUTION_WORKER_HEARTBEAT_TTL", "30"))
+
+# --- Background jobs ---
+# Run a job worker inside the API process, set to False when jobs are run by
+# separate `python -m src.services.job.job_worker` processes
+JOB_WORKER_IN_PROCESS = os.getenv("JOB_WORKER_IN_PROCESS", "True") == "True"
+# Jobs run at once by one worker, and at most per job type
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_TYPE_CONCURRENCY = {
+    job_type.strip(): int(limit)
+    for job_type, limit in (
+        item.split("=")
+        for item in os.getenv(
+            "JOB_TYPE_CONCURRENCY", "test_generation=2,test_execution=2,load_test=1"
+        ).split(",")
+        if item.strip()
+    )
+}
+# Seconds between two looks of a worker at the queue and at cancel requests
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# Seconds without a heartbeat after which a worker's running jobs are requeued
+JOB_WORKER_HEARTBEAT_TTL = int(os.getenv("JOB_WORKER_HEARTBEAT_TTL", "30"))
+
 
 def initialize_nltk():
     nltk.download("punkt", quiet=True)
@@ -76,11 +217,43 @@ def get_minio_client(verbose: bool = False):
     )
 
 
+_db_engine: Optional[Engine] = None
+_db_engine_pid: Optional[int] = None
+_db_engine_lock = threading.Lock()
+
+
 # --- Hàm khởi tạo ---
-def get_db_engine(verbose: bool = False):
-    if verbose:
-        logging.info(f"Connecting to database at '{POSTGRES_URL}'")
-    return create_engine(POSTGRES_URL)
+def get_db_engine(verbose: bool = False) -> Engine:
+    """
+    Return the engine of this process, created on first use.
+    All callers share its connection pool; a forked child gets its own engine
+    so connections of the parent are never reused across processes.
+    """
+    global _db_engine, _db_engine_pid
+
+    if _db_engine is not None and _db_engine_pid == os.getpid():
+        return _db_engine
+
+    with _db_engine_lock:
+        if _db_engine is not None and _db_engine_pid != os.getpid():
+            # Drop the inherited pool without closing the parent's connections
+            _db_engine.dispose(close=False)
+            _db_engine = None
+        if _db_engine is None:
+            if verbose:
+                logging.info(f"Connecting to database at '{POSTGRES_URL}'")
+            _db_engine = create_engine(
+                POSTGRES_URL,
+                poolclass=MeteredQueuePool,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=DB_POOL_PRE_PING,
+            )
+            instrument_engine(_db_engine)
+            _db_engine_pid = os.getpid()
+    return _db_engine
 
 
 def create_vector_extension(verbose: bool = False):
@@ -105,12 +278,36 @@ def init_db(verbose: bool = False):
     SQLModel.metadata.create_all(get_db_engine(verbose))
 
 
-def get_redis_client(verbose: bool = False):
-    if verbose:
-        logging.info(
-            f"Connecting to Redis at '{REDIS_HOST}:{REDIS_PORT}', DB {REDIS_DB}"
-        )
-    return redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+_redis_client: Optional[redis.Redis] = None
+_redis_client_lock = threading.Lock()
+
+
+def get_redis_client(verbose: bool = False) -> redis.Redis:
+    """
+    Return the Redis client of this process, created on first use.
+    Its connection pool is shared by every caller and resets itself after a fork.
+    """
+    global _redis_client
+
+    if _redis_client is not None:
+        return _redis_client
+
+    with _redis_client_lock:
+        if _redis_client is None:
+            if verbose:
+                logging.info(
+                    f"Connecting to Redis at '{REDIS_HOST}:{REDIS_PORT}', DB {REDIS_DB}"
+                )
+            _redis_client = redis.Redis(
+                connection_pool=MeteredBlockingConnectionPool(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT,
+                )
+            )
+    return _redis_client
 
 
 # Runtime data
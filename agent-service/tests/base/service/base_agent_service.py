@@ -0,0 +1,224 @@
+# tests.base.service.base_agent_service
+import asyncio
+import importlib
+import time
+
+from google.api_core.exceptions import ResourceExhausted
+from langchain.messages import AIMessage, SystemMessage
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel
+
+from src.base.service import base_agent_service
+from src.base.service.base_agent_service import BaseAgentService
+from src.common.api_key_pool import ApiKeyPool
+from src.common.in_flight_limiter import InFlightLimiter
+from src.enums.enums import LanguageEnum
+from src.cache.local_cache import LocalCache
+
+# `src.cache` re-exports the decorator under the same name as its module
+cache_func_wrapper_module = importlib.import_module("src.cache.cache_func_wrapper")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = []
+        # Seconds taken to answer some prompts
+        self.delays = {}
+
+    def _answer(self, messages):
+        self.calls.append(messages[-1].content)
+        return AIMessage(f"answer to {messages[-1].content}")
+
+    def invoke(self, messages):
+        time.sleep(self.delays.get(messages[-1].content, 0))
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(0.01)
+        return self._answer(messages)
+
+
+class State(BaseModel):
+    human: str
+    answer: str = ""
+
+
+class AnswerNode(BaseAgentService):
+    def __call__(self, state: State) -> State:
+        state.answer = self.run(state.human).content
+        return state
+
+    async def acall(self, state: State) -> State:
+        state.answer = (await self.arun(state.human)).content
+        return state
+
+
+def make_agent(monkeypatch, agent_class=BaseAgentService):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(
+        cache_func_wrapper_module, "get_redis_client", lambda: redis_client
+    )
+    monkeypatch.setattr(
+        cache_func_wrapper_module,
+        "local_cache",
+        LocalCache(max_bytes=1024 * 1024, max_entries=100),
+    )
+    llm = FakeLLM()
+    monkeypatch.setattr(BaseAgentService, "_get_agent", lambda self: llm)
+    agent = agent_class(llm_model="vllm-test")
+    agent._system_prompts = {agent.get_system_lang(): SystemMessage("system")}
+    return agent, llm
+
+
+def test_arun_shares_cache_entries_with_run(monkeypatch):
+    agent, llm = make_agent(monkeypatch)
+
+    assert asyncio.run(agent.arun("question")) == AIMessage("answer to question")
+    assert agent.run("question") == AIMessage("answer to question")
+    assert asyncio.run(agent.arun("question", no_cache=True)).content == (
+        "answer to question"
+    )
+    assert llm.calls == ["question", "question"]
+
+
+def test_aruns_keeps_input_order(monkeypatch):
+    agent, _ = make_agent(monkeypatch)
+
+    responses = asyncio.run(agent.aruns(["a", "b", "c"], batch_size=2))
+
+    assert [response.content for response in responses] == [
+        "answer to a",
+        "answer to b",
+        "answer to c",
+    ]
+
+
+def test_arun_until_valid_retries_without_cache(monkeypatch):
+    agent, llm = make_agent(monkeypatch)
+    attempts = []
+
+    def parse(content):
+        attempts.append(content)
+        if len(attempts) < 3:
+            raise ValueError("invalid")
+        return content.upper()
+
+    content, parsed = asyncio.run(agent.arun_until_valid("question", parse))
+
+    assert parsed == "ANSWER TO QUESTION"
+    assert len(llm.calls) == 3
+
+
+def test_as_node_runs_sync_and_async(monkeypatch):
+    node, llm = make_agent(monkeypatch, AnswerNode)
+    workflow = StateGraph(State)
+    workflow.add_node("answer", node.as_node())
+    workflow.set_entry_point("answer")
+    workflow.add_edge("answer", END)
+    graph = workflow.compile()
+
+    assert asyncio.run(graph.ainvoke({"human": "async"}))["answer"] == (
+        "answer to async"
+    )
+    assert graph.invoke({"human": "sync"})["answer"] == "answer to sync"
+    assert llm.calls == ["async", "sync"]
+
+
+def test_runs_keeps_order_and_caches_each_item(monkeypatch):
+    agent, llm = make_agent(monkeypatch)
+    llm.delays = {"a": 0.03}
+
+    completed = list(agent.runs_as_completed(["a", "b"]))
+    assert [index for index, _ in completed] == [1, 0]
+
+    responses = agent.runs(["a", "b", "c"], batch_size=2)
+    assert [response.content for response in responses] == [
+        "answer to a",
+        "answer to b",
+        "answer to c",
+    ]
+    # "a" and "b" came from the cache
+    assert sorted(llm.calls) == ["a", "b", "c"]
+
+
+def test_runs_respects_process_wide_cap(monkeypatch):
+    agent, llm = make_agent(monkeypatch)
+    llm.delays = {str(index): 0.02 for index in range(8)}
+    limiter = InFlightLimiter(2)
+    monkeypatch.setattr(base_agent_service, "llm_limiter", limiter)
+
+    agent.runs([str(index) for index in range(8)], no_cache=True)
+
+    assert limiter.snapshot()["max_in_flight"] == 2
+
+
+def test_concurrent_runs_keep_their_own_language(monkeypatch):
+    # Prompts are not reloaded from files
+    monkeypatch.setattr(base_agent_service, "ENVIRONMENT", "prod")
+    agent, _ = make_agent(monkeypatch)
+    agent._system_prompts = {
+        LanguageEnum.EN: SystemMessage("english"),
+        LanguageEnum.VI: SystemMessage("vietnamese"),
+    }
+    system_prompts = {}
+
+    async def answer(lang, human):
+        agent.set_system_lang(lang)
+        # The other run sets its language meanwhile
+        await asyncio.sleep(0.01)
+        system_prompts[human] = agent._get_messages(human)[0].content
+        return await agent.arun(human)
+
+    async def main():
+        return await asyncio.gather(
+            answer(LanguageEnum.VI, "cau hoi"), answer(LanguageEnum.EN, "question")
+        )
+
+    asyncio.run(main())
+
+    assert system_prompts == {"cau hoi": "vietnamese", "question": "english"}
+    assert agent.get_system_lang() == LanguageEnum.EN
+
+
+class RateLimitedLLM(FakeLLM):
+    def invoke(self, messages):
+        raise ResourceExhausted("quota exceeded")
+
+    async def ainvoke(self, messages):
+        raise ResourceExhausted("quota exceeded")
+
+
+def test_google_calls_move_to_another_key_when_rate_limited(monkeypatch):
+    agent, _ = make_agent(monkeypatch)
+    pool = ApiKeyPool(["key-a", "key-b"])
+    monkeypatch.setattr(base_agent_service, "google_key_pool", pool)
+    llm = FakeLLM()
+    agent._agents = {"key-a": RateLimitedLLM(), "key-b": llm}
+
+    assert agent.run("question").content == "answer to question"
+    assert asyncio.run(agent.arun("other question")).content == (
+        "answer to other question"
+    )
+    assert llm.calls == ["question", "other question"]
+    assert pool.snapshot()["keys"][0]["rate_limited"] == 1
@@ -0,0 +1,183 @@
+# tests.base.workflow.redis_checkpoint_saver
+from langgraph.graph import END
+from pydantic import BaseModel, Field
+import pytest
+
+from src.base.workflow import redis_checkpoint_saver
+from src.base.workflow.base_workflow import BaseWorkflow
+
+
+def _to_bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.redis_client, name)
+        return lambda *args, **kwargs: self.calls.append((method, args, kwargs))
+
+    def execute(self):
+        return [method(*args, **kwargs) for method, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        values = self.data.setdefault(key, {})
+        for field, value in (mapping or {field: value}).items():
+            values[_to_bytes(field)] = _to_bytes(value)
+
+    def hsetnx(self, key, field, value):
+        self.data.setdefault(key, {}).setdefault(_to_bytes(field), _to_bytes(value))
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hvals(self, key):
+        return list(self.data.get(key, {}).values())
+
+    def zadd(self, key, mapping):
+        self.data.setdefault(key, set()).update(map(_to_bytes, mapping))
+
+    def zrange(self, key, start, end):
+        members = sorted(self.data.get(key, ()))
+        return members[start : (end + 1) or None]
+
+    def zrevrange(self, key, start, end):
+        return self.zrange(key, 0, -1)[::-1][start : (end + 1) or None]
+
+    def zrem(self, key, *members):
+        self.data.get(key, set()).difference_update(map(_to_bytes, members))
+
+    def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(map(_to_bytes, members))
+
+    def smembers(self, key):
+        return set(self.data.get(key, ()))
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class DocumentState(BaseModel):
+    document: str
+    extra_parameters: dict = Field(default_factory=dict)
+
+
+class FakeDocumentWorkflow(BaseWorkflow):
+    agent_state: BaseModel = Field(default=DocumentState)
+    transient_parameters: dict[str, str] = Field(
+        default={"extracted_text": "normalized_text"}
+    )
+
+    def _add_nodes(self):
+        self.workflow.add_node("extract", self._extract)
+        self.workflow.add_node("normalize", self._normalize)
+        self.workflow.add_node("describe", self._describe)
+
+    def _setup_edges(self):
+        self.workflow.set_entry_point("extract")
+        self.workflow.add_edge("extract", "normalize")
+        self.workflow.add_edge("normalize", "describe")
+        self.workflow.add_edge("describe", END)
+
+    def _extract(self, state: DocumentState):
+        calls.append("extract")
+        return {"extra_parameters": {"extracted_text": f"  {state.document}  "}}
+
+    def _normalize(self, state: DocumentState):
+        calls.append("normalize")
+        text = state.extra_parameters["extracted_text"].strip()
+        return {"extra_parameters": {**state.extra_parameters, "normalized_text": text}}
+
+    def _describe(self, state: DocumentState):
+        calls.append("describe")
+        if "describe" in failing:
+            raise RuntimeError("worker stopped")
+        text = state.extra_parameters["normalized_text"]
+        return {
+            "extra_parameters": {
+                **state.extra_parameters,
+                "described_doc": text.upper(),
+            }
+        }
+
+
+calls, failing = [], set()
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(
+        redis_checkpoint_saver, "get_redis_client", lambda: redis_client
+    )
+    calls.clear()
+    failing.clear()
+    return redis_client
+
+
+def test_interrupted_job_resumes_from_its_last_completed_node(redis_client):
+    workflow = FakeDocumentWorkflow()
+    failing.add("describe")
+
+    with pytest.raises(RuntimeError):
+        workflow.invoke(DocumentState(document="spec"), job_id="job")
+
+    saved = workflow.checkpointer.get_tuple({"configurable": {"thread_id": "job"}})
+    # The extracted text is not kept once normalized
+    assert saved.checkpoint["channel_values"]["extra_parameters"] == {
+        "normalized_text": "spec"
+    }
+    assert len(redis_client.zrange("checkpoints:job:", 0, -1)) == 2
+    assert set(redis_client.ttls.values()) == {workflow.checkpointer.ttl}
+
+    failing.clear()
+    result = workflow.invoke(DocumentState(document="spec"), job_id="job")
+
+    assert calls == ["extract", "normalize", "describe", "describe"]
+    assert result["extra_parameters"]["described_doc"] == "SPEC"
+    # Nothing is kept once the job completes
+    assert redis_client.data == {}
+
+
+def test_runs_without_job_id_are_not_checkpointed(redis_client):
+    result = FakeDocumentWorkflow().invoke(DocumentState(document="spec"))
+
+    assert result["extra_parameters"]["extracted_text"] == "  spec  "
+    assert calls == ["extract", "normalize", "describe"]
+    assert redis_client.data == {}
+
+
+def test_compact_copies_the_checkpoint():
+    saver = redis_checkpoint_saver.RedisCheckpointSaver(
+        redis_client=FakeRedis(),
+        transient_parameters={"extracted_text": "normalized_text"},
+    )
+    extra_parameters = {"extracted_text": "raw"}
+    checkpoint = {"channel_values": {"extra_parameters": extra_parameters}}
+
+    # Kept while the text it turns into does not exist
+    assert saver._compact(checkpoint) is checkpoint
+
+    extra_parameters["normalized_text"] = "clean"
+    compacted = saver._compact(checkpoint)
+
+    assert compacted["channel_values"]["extra_parameters"] == {
+        "normalized_text": "clean"
+    }
+    assert "extracted_text" in extra_parameters
@@ -0,0 +1,54 @@
+# tests.cache.cache_key
+from langchain.messages import AIMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+from src.cache.cache_key import (
+    canonicalize,
+    make_cache_key,
+    make_function_fingerprint,
+)
+
+
+class Settings(BaseModel):
+    llm_model: str = "gemini-2.0-flash"
+    llm_temperature: float = 0.7
+
+
+def cached_function(messages):
+    return messages
+
+
+def make_key(*args, **kwargs):
+    return make_cache_key("namespace", "fingerprint", args, kwargs)
+
+
+def test_cache_key_is_stable_for_equal_messages():
+    first = [SystemMessage("system"), HumanMessage("question")]
+    second = [SystemMessage("system"), HumanMessage("question", id="random-id")]
+
+    assert make_key(Settings(), first) == make_key(Settings(), second)
+    assert make_key(Settings(), first) != make_key(
+        Settings(), [SystemMessage("system"), HumanMessage("other question")]
+    )
+    assert make_key(Settings(), first) != make_key(Settings(llm_temperature=0.0), first)
+    assert make_key([AIMessage("a")]) != make_key([HumanMessage("a")])
+
+
+def test_cache_key_ignores_dict_and_kwargs_order():
+    assert make_key({"a": 1, "b": [1, 2]}) == make_key({"b": [1, 2], "a": 1})
+    assert make_key(top_k=10, query="q") == make_key(query="q", top_k=10)
+    assert make_key("1") != make_key(1)
+
+
+def test_canonicalize_nested_values():
+    assert canonicalize({"b": {2, 1}, "a": (1, None)}) == [
+        ["a", [1, None]],
+        ["b", [1, 2]],
+    ]
+
+
+def test_function_fingerprint_is_computed_from_source():
+    fingerprint = make_function_fingerprint(cached_function)
+
+    assert fingerprint == make_function_fingerprint(cached_function)
+    assert fingerprint != make_function_fingerprint(make_key)
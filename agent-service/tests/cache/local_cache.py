@@ -0,0 +1,89 @@
+# tests.cache.local_cache
+import importlib
+
+from src.cache import local_cache as local_cache_module
+from src.cache.local_cache import LocalCache
+
+# `src.cache` re-exports the decorator under the same name as its module
+cache_func_wrapper_module = importlib.import_module("src.cache.cache_func_wrapper")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+
+
+def test_local_cache_evicts_least_recently_used_by_size():
+    cache = LocalCache(max_bytes=25, max_entries=10)
+    cache.set("a", b"x" * 9, ttl=60)
+    cache.set("b", b"x" * 9, ttl=60)
+    assert cache.get("a") == b"x" * 9
+
+    cache.set("c", b"x" * 9, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["bytes"] == 20
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_local_cache_skips_oversized_values_and_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(local_cache_module.time, "monotonic", lambda: now[0])
+    cache = LocalCache(max_bytes=10, max_entries=10)
+
+    cache.set("big", b"x" * 20, ttl=60)
+    cache.set("key", b"value", ttl=5)
+    assert cache.get("big") is None
+    assert cache.get("key") == b"value"
+
+    now[0] += 5
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["bytes"] == 0
+
+
+def test_cache_func_wrapper_serves_repeated_calls_in_process(monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(
+        cache_func_wrapper_module, "get_redis_client", lambda: redis_client
+    )
+    monkeypatch.setattr(
+        cache_func_wrapper_module,
+        "local_cache",
+        LocalCache(max_bytes=1024, max_entries=10),
+    )
+    calls = []
+
+    @cache_func_wrapper_module.cache_func_wrapper
+    def double(value):
+        calls.append(value)
+        return {"value": value * 2}
+
+    first = double(2)
+    first["value"] = 0
+    second = double(2)
+
+    assert second == {"value": 4}
+    assert calls == [2]
+    assert redis_client.gets == 1
@@ -0,0 +1,125 @@
+# tests.cache.semantic_cache
+from types import SimpleNamespace
+
+from langchain.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.base.service import base_agent_service
+from src.base.service.base_agent_service import BaseAgentService
+from src.cache import semantic_cache
+from src.cache.cache_metrics import cache_metrics
+from src.cache.serialization import serialize
+
+
+class FakeRepository:
+    def __init__(self):
+        self.entries = []
+
+    def __call__(self, **fields):
+        entry = SimpleNamespace(**fields)
+        entry.create = lambda: self.entries.append(entry)
+        return entry
+
+    def delete_expired(self, max_age):
+        return 0
+
+    def get_nearest(self, scope, vector, max_age):
+        candidates = [entry for entry in self.entries if entry.scope == scope]
+        if not candidates:
+            return None
+        nearest = min(candidates, key=lambda entry: abs(entry.vector[0] - vector[0]))
+        return nearest, abs(nearest.vector[0] - vector[0])
+
+
+def use_fakes(monkeypatch, embeddings):
+    repository = FakeRepository()
+    monkeypatch.setattr(semantic_cache, "SemanticCacheRepository", repository)
+    monkeypatch.setattr(
+        semantic_cache, "embed_prompt", lambda prompt: [embeddings[prompt]]
+    )
+    cache_metrics.reset()
+    return repository
+
+
+def test_semantic_scope_depends_on_settings_and_context():
+    agent = SimpleNamespace(llm_model="gemini-2.5-flash")
+    context = [SystemMessage("standardize"), HumanMessage("history")]
+
+    scope = semantic_cache.get_semantic_scope(agent, context)
+
+    assert scope.startswith("SimpleNamespace:")
+    assert scope == semantic_cache.get_semantic_scope(agent, list(context))
+    assert scope != semantic_cache.get_semantic_scope(agent, context[:1])
+    assert scope != semantic_cache.get_semantic_scope(
+        SimpleNamespace(llm_model="gemini-2.0-flash"), context
+    )
+
+
+def test_find_similar_response_applies_threshold(monkeypatch):
+    use_fakes(monkeypatch, {"spec": 0.0, "spec ": 0.01, "other": 0.5})
+    semantic_cache.store_response("Node:scope", "spec", AIMessage("answer"))
+
+    response, similarity = semantic_cache.find_similar_response(
+        "Node:scope", "spec ", threshold=0.95
+    )
+    assert response == AIMessage("answer")
+    assert similarity == 0.99
+    assert semantic_cache.find_similar_response("Node:scope", "other", 0.95) is None
+    assert semantic_cache.find_similar_response("Node:other", "spec", 0.95) is None
+
+    metrics = cache_metrics.snapshot()["semantic.Node"]
+    assert metrics["stores"] == 1 and metrics["lookups"] == 3
+    assert metrics["hit_rate"] == 0.333
+
+
+def test_record_verification_counts_false_hits():
+    cache_metrics.reset()
+    assert not semantic_cache.record_verification(
+        "Node:scope",
+        AIMessage("The endpoint is /users"),
+        AIMessage("The endpoint is /users."),
+    )
+    assert semantic_cache.record_verification(
+        "Node:scope", AIMessage("The endpoint is /users"), AIMessage("POST /orders")
+    )
+    assert cache_metrics.snapshot()["semantic.Node"]["false_hit_rate"] == 0.5
+
+
+def test_run_reuses_response_of_similar_prompt(monkeypatch):
+    repository = use_fakes(monkeypatch, {"Create a user": 0.0, "Create  a user": 0.001})
+    monkeypatch.setattr(base_agent_service, "SEMANTIC_CACHE_VERIFY_RATE", 0)
+    calls = []
+
+    def fake_run(self, messages, no_cache=False):
+        calls.append(messages[-1].content)
+        return AIMessage(f"answer to {messages[-1].content}")
+
+    monkeypatch.setattr(BaseAgentService, "_run", fake_run)
+    agent = BaseAgentService(
+        llm_model="vllm-test",
+        semantic_cache=True,
+        path_to_prompt={},
+    )
+    agent._system_prompts = {agent.get_system_lang(): SystemMessage("system")}
+
+    assert agent.run("Create a user").content == "answer to Create a user"
+    assert agent.run("Create  a user").content == "answer to Create a user"
+    assert agent.run("Create  a user", no_cache=True).content == (
+        "answer to Create  a user"
+    )
+    assert calls == ["Create a user", "Create  a user"]
+    assert len(repository.entries) == 1
+    assert repository.entries[0].response == serialize(
+        AIMessage("answer to Create a user")
+    )
+
+
+def test_store_response_prunes_expired_entries_once_per_interval(monkeypatch):
+    repository = use_fakes(monkeypatch, {"spec": 0.0, "other": 0.5})
+    deletions = []
+    repository.delete_expired = lambda max_age: deletions.append(max_age) or 2
+    monkeypatch.setattr(semantic_cache, "_next_prune_at", 0.0)
+
+    semantic_cache.store_response("Node:scope", "spec", AIMessage("answer"))
+    semantic_cache.store_response("Node:scope", "other", AIMessage("answer"))
+    assert deletions == [semantic_cache.SEMANTIC_CACHE_TTL]
+    assert semantic_cache.prune_expired_responses(force=True) == 2
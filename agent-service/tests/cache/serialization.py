@@ -0,0 +1,90 @@
+# tests.cache.serialization
+import pickle
+
+import pytest
+from langchain.messages import AIMessage, HumanMessage
+
+from src.cache.cache_metrics import get_cache_memory_report
+from src.cache.serialization import CacheFormatError, deserialize, serialize
+
+
+class Document:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_serialize_round_trips_messages_and_containers():
+    message = AIMessage(
+        "answer " * 100,
+        response_metadata={"model_name": "gemini-2.0-flash"},
+        usage_metadata={"input_tokens": 1, "output_tokens": 2, "total_tokens": 3},
+    )
+    value = {"messages": [HumanMessage("question"), message], "pair": ("text", 1)}
+
+    data = serialize(value)
+    loaded = deserialize(data)
+
+    assert data[1:3] == b"jz"
+    assert len(data) < len(pickle.dumps(value))
+    assert loaded["pair"] == ("text", 1)
+    assert loaded["messages"][1] == message
+    assert isinstance(loaded["messages"][0], HumanMessage)
+
+
+def test_serialize_falls_back_to_pickle():
+    data = serialize([Document("spec.pdf")])
+
+    assert data[1:2] == b"p"
+    assert deserialize(data)[0].name == "spec.pdf"
+    # Dicts that look like the JSON markers are not mistaken for them
+    assert deserialize(serialize({"__tuple__": [1]})) == {"__tuple__": [1]}
+
+
+def test_deserialize_rejects_other_formats():
+    with pytest.raises(CacheFormatError):
+        deserialize(pickle.dumps("legacy entry"))
+    with pytest.raises(CacheFormatError):
+        deserialize(serialize("value")[:3] + b"\xff")
+
+
+class FakePipeline:
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.keys = []
+
+    def memory_usage(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        return [self.sizes[key] for key in self.keys]
+
+
+class FakeRedis:
+    def __init__(self, sizes):
+        self.sizes = sizes
+
+    def scan_iter(self, match, count):
+        return iter(self.sizes)
+
+    def pipeline(self, transaction):
+        return FakePipeline(self.sizes)
+
+
+def test_cache_memory_report_groups_by_namespace():
+    redis_client = FakeRedis(
+        {
+            b"cache:agent._run:aaaa:1": 100,
+            b"cache:agent._run:bbbb:2": 50,
+            b"cache:search:cccc:3": 400,
+        }
+    )
+
+    report = get_cache_memory_report(redis_client, batch_size=2)
+
+    assert report["keys"] == 3 and report["bytes"] == 550
+    assert list(report["namespaces"]) == ["search", "agent._run"]
+    assert report["namespaces"]["agent._run"] == {
+        "keys": 2,
+        "bytes": 150,
+        "fingerprints": 2,
+    }
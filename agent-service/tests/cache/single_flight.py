@@ -0,0 +1,177 @@
+# tests.cache.single_flight
+import asyncio
+import importlib
+import threading
+import time
+
+from src.cache.cache_key import (
+    get_function_namespace,
+    make_cache_key,
+    make_function_fingerprint,
+)
+from src.cache.local_cache import LocalCache
+from src.cache.serialization import serialize
+from src.cache.single_flight import SingleFlight, get_lock_key
+
+# `src.cache` re-exports the decorator under the same name as its module
+cache_func_wrapper_module = importlib.import_module("src.cache.cache_func_wrapper")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value
+            return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def eval(self, script, numkeys, key, token):
+        with self._lock:
+            if self.values.get(key) == token:
+                del self.values[key]
+
+
+def use_fake_redis(monkeypatch):
+    redis_client = FakeRedis()
+    monkeypatch.setattr(
+        cache_func_wrapper_module, "get_redis_client", lambda: redis_client
+    )
+    monkeypatch.setattr(
+        cache_func_wrapper_module,
+        "local_cache",
+        LocalCache(max_bytes=1024, max_entries=10),
+    )
+    monkeypatch.setattr(cache_func_wrapper_module, "CACHE_LOCK_POLL_INTERVAL", 0.01)
+    return redis_client
+
+
+def test_single_flight_shares_result_and_errors():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait()
+        return "value"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(
+        target=lambda: results.append(flight.do("key", lambda: "other"))
+    )
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert sorted(results) == [("value", False), ("value", True)]
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        flight.do("key", fail)
+    except ValueError as e:
+        assert str(e) == "boom"
+    assert flight.do("key", lambda: "again") == ("again", False)
+
+
+def test_concurrent_identical_calls_compute_once(monkeypatch):
+    use_fake_redis(monkeypatch)
+    calls = []
+
+    @cache_func_wrapper_module.cache_func_wrapper(local=False)
+    def generate(prompt):
+        calls.append(prompt)
+        time.sleep(0.1)
+        return {"answer": prompt.upper()}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(generate("hello")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["hello"]
+    assert results == [{"answer": "HELLO"}] * 5
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == 5
+
+
+def test_waits_for_key_locked_by_another_process(monkeypatch):
+    redis_client = use_fake_redis(monkeypatch)
+    calls = []
+
+    @cache_func_wrapper_module.cache_func_wrapper(local=False)
+    def generate(prompt):
+        calls.append(prompt)
+        return prompt.upper()
+
+    key = make_cache_key(
+        get_function_namespace(generate.__wrapped__),
+        make_function_fingerprint(generate.__wrapped__),
+        ("hello",),
+        {},
+    )
+    # Another process holds the lock and stores its result a bit later
+    redis_client.values[get_lock_key(key)] = "other-token"
+
+    def finish():
+        time.sleep(0.05)
+        redis_client.values[key] = serialize("HELLO")
+        del redis_client.values[get_lock_key(key)]
+
+    other = threading.Thread(target=finish)
+    other.start()
+    assert generate("hello") == "HELLO"
+    other.join()
+    assert calls == []
+
+    # A lock released without a value (the owner failed) makes the waiter
+    # compute it itself
+    redis_client.values = {get_lock_key(key): "other-token"}
+    failed = threading.Timer(0.05, lambda: redis_client.values.pop(get_lock_key(key)))
+    failed.start()
+    assert generate("hello") == "HELLO"
+    failed.join()
+    assert calls == ["hello"]
+
+
+def test_concurrent_identical_async_calls_compute_once(monkeypatch):
+    use_fake_redis(monkeypatch)
+    calls = []
+
+    @cache_func_wrapper_module.cache_func_wrapper(local=False)
+    async def generate(prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return {"answer": prompt.upper()}
+
+    async def run():
+        return await asyncio.gather(*(generate("hello") for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert calls == ["hello"]
+    assert results == [{"answer": "HELLO"}] * 5
+    assert len({id(result) for result in results}) == 5
+    # Later calls are served from Redis
+    assert asyncio.run(generate("hello")) == {"answer": "HELLO"}
+    assert calls == ["hello"]
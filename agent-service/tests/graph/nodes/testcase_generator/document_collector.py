@@ -0,0 +1,77 @@
+# tests.graph.nodes.testcase_generator.document_collector
+from types import SimpleNamespace
+
+from langchain.messages import AIMessage, SystemMessage
+
+from src import models
+from src.base.service import base_agent_service
+from src.base.service.base_agent_service import BaseAgentService
+from src.cache import semantic_cache
+from src.enums.enums import LanguageEnum
+from src.graph.nodes.testcase_generator.document_collector import DocumentCollector
+
+
+class FakeFrInfo:
+    def __init__(self, fr_info_id: str):
+        self.fr_info_id = fr_info_id
+
+    def get_fr_group_name(self) -> str:
+        return f"group {self.fr_info_id}"
+
+
+class FakeRepository:
+    def __init__(self):
+        self.entries = []
+
+    def __call__(self, **fields):
+        entry = SimpleNamespace(**fields)
+        entry.create = lambda: self.entries.append(entry)
+        return entry
+
+    def delete_expired(self, max_age):
+        return 0
+
+    def get_nearest(self, scope, vector, max_age):
+        candidates = [entry for entry in self.entries if entry.scope == scope]
+        return (candidates[0], 0.0) if candidates else None
+
+
+def test_collector_does_not_share_responses_between_functions(monkeypatch):
+    repository = FakeRepository()
+    monkeypatch.setattr(semantic_cache, "SemanticCacheRepository", repository)
+    # Every prompt looks the same to the embedding
+    monkeypatch.setattr(semantic_cache, "embed_prompt", lambda prompt: [0.0])
+    monkeypatch.setattr(base_agent_service, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(base_agent_service, "SEMANTIC_CACHE_VERIFY_RATE", 0)
+    monkeypatch.setattr(base_agent_service, "ENVIRONMENT", "test")
+    calls = []
+
+    def fake_run(self, messages, no_cache=False):
+        calls.append(messages[-1].content)
+        return AIMessage(f'{{"answer": {len(calls)}}}')
+
+    monkeypatch.setattr(BaseAgentService, "_run", fake_run)
+    monkeypatch.setattr(
+        DocumentCollector, "_collect_documents", lambda self, state, response: response
+    )
+    collector = DocumentCollector(llm_model="vllm-test", path_to_prompt={})
+    collector._system_prompts = {LanguageEnum.EN: SystemMessage("collect")}
+
+    def collect(current_fr_index):
+        state = models.TestcasesGenStateModel(
+            project_id="project",
+            lang=LanguageEnum.EN,
+            extra_parameters={
+                "all_fr_infos": [FakeFrInfo("a"), FakeFrInfo("b")],
+                "current_fr_index": current_fr_index,
+                "all_docs_toc": "<Table of Contents>" + "heading\n" * 500,
+            },
+        )
+        return collector(state)
+
+    assert collect(0) == '{"answer": 1}'
+    assert collect(1) == '{"answer": 2}'
+    # The same function hits
+    assert collect(0) == '{"answer": 1}'
+    assert len(calls) == 2
+    assert len(repository.entries) == 2
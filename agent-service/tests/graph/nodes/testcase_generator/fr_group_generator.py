@@ -0,0 +1,165 @@
+# tests.graph.nodes.testcase_generator.fr_group_generator
+import asyncio
+
+from src import models, repositories
+from src.graph import nodes
+
+
+class FakeFrInfo:
+    def __init__(self, fr_info_id: str):
+        self.fr_info_id = fr_info_id
+
+    def get_fr_group_name(self) -> str:
+        return f"group {self.fr_info_id}"
+
+
+class FakeTestSuite:
+    def __init__(self, fr_info_id: str, committed: list):
+        self.test_suite_id = f"suite-{fr_info_id}"
+        self.committed = committed
+
+    def create_with_test_cases(self, test_cases):
+        self.committed.append((self.test_suite_id, test_cases))
+        return self
+
+
+class FakeStep:
+    """Stands for an agent node, records the FR group it ran for."""
+
+    def __init__(self, name: str, calls: list, committed: list, fail_for=()):
+        self.name = name
+        self.calls = calls
+        self.committed = committed
+        self.fail_for = fail_for
+
+    def _run(
+        self, state: models.TestcasesGenStateModel
+    ) -> models.TestcasesGenStateModel:
+        index = state.extra_parameters["current_fr_index"]
+        fr_info = state.extra_parameters["all_fr_infos"][index]
+        self.calls.append((self.name, fr_info.fr_info_id))
+        if fr_info.fr_info_id in self.fail_for:
+            raise ValueError(f"{self.name} failed")
+
+        if self.name == "generator":
+            state.test_case_infos[fr_info.fr_info_id] = {
+                "test_suite": FakeTestSuite(fr_info.fr_info_id, self.committed),
+                "test_cases": [f"case of {fr_info.fr_info_id}"],
+            }
+        return state
+
+    def __call__(self, state):
+        return self._run(state)
+
+    async def acall(self, state):
+        await asyncio.sleep(0)
+        return self._run(state)
+
+
+def make_state(fr_ids: list[str], run_id=None) -> models.TestcasesGenStateModel:
+    return models.TestcasesGenStateModel(
+        project_id="project",
+        run_id=run_id,
+        extra_parameters={
+            "all_docs_toc": "toc",
+            "all_fr_infos": [FakeFrInfo(fr_id) for fr_id in fr_ids],
+        },
+    )
+
+
+def make_generator(calls: list, committed: list, fail_for=()) -> nodes.FrGroupGenerator:
+    return nodes.FrGroupGenerator.model_construct(
+        document_collector=FakeStep("collector", calls, committed),
+        document_standardizer=FakeStep("standardizer", calls, committed, fail_for),
+        testcase_generator=FakeStep("generator", calls, committed),
+    )
+
+
+def record_fr_statuses(monkeypatch, completed=()) -> list:
+    statuses = []
+    monkeypatch.setattr(
+        repositories.TestGenerationRunRepository,
+        "get_by_id",
+        lambda run_id: repositories.TestGenerationRunRepository(
+            run_id=run_id,
+            project_id="project",
+            fr_statuses={
+                fr_info_id: {"status": "completed"} for fr_info_id in completed
+            },
+        ),
+    )
+    monkeypatch.setattr(
+        repositories.TestGenerationRunRepository,
+        "set_fr_status",
+        lambda **kwargs: statuses.append(kwargs),
+    )
+    return statuses
+
+
+def test_dispatch_sends_every_fr_group_with_its_own_state():
+    sends = nodes.dispatch_fr_groups(make_state(["fr-1", "fr-2"], run_id="run"))
+
+    assert [send.node for send in sends] == ["fr_group_generator"] * 2
+    assert [send.arg.extra_parameters["current_fr_index"] for send in sends] == [0, 1]
+    assert [send.arg.run_id for send in sends] == ["run", "run"]
+    assert sends[0].arg.extra_parameters["collected_documents"] is not (
+        sends[1].arg.extra_parameters["collected_documents"]
+    )
+    assert nodes.dispatch_fr_groups(make_state([])) == "testcase_generator_job"
+
+
+def test_fr_group_generator_commits_its_test_cases_once_done(monkeypatch):
+    statuses = record_fr_statuses(monkeypatch)
+    calls, committed = [], []
+    generator = make_generator(calls, committed)
+    state = nodes.dispatch_fr_groups(make_state(["fr-1", "fr-2"], run_id="run"))[1].arg
+
+    result = generator(state)
+
+    assert calls == [
+        ("collector", "fr-2"),
+        ("standardizer", "fr-2"),
+        ("generator", "fr-2"),
+    ]
+    assert committed == [("suite-fr-2", ["case of fr-2"])]
+    assert list(result["test_case_infos"]) == ["fr-2"]
+    assert statuses == [
+        {
+            "run_id": "run",
+            "fr_info_id": "fr-2",
+            "status": "completed",
+            "test_suite_id": "suite-fr-2",
+        }
+    ]
+
+
+def test_failed_fr_group_is_recorded_without_raising(monkeypatch):
+    statuses = record_fr_statuses(monkeypatch)
+    calls, committed = [], []
+    generator = make_generator(calls, committed, fail_for={"fr-1"})
+    state = nodes.dispatch_fr_groups(make_state(["fr-1"], run_id="run"))[0].arg
+
+    result = asyncio.run(generator.acall(state))
+
+    assert result == {"test_case_infos": {}}
+    assert committed == []
+    assert statuses == [
+        {
+            "run_id": "run",
+            "fr_info_id": "fr-1",
+            "status": "failed",
+            "error": "standardizer failed",
+        }
+    ]
+
+
+def test_completed_fr_group_is_not_generated_again(monkeypatch):
+    # Committed, then the worker stopped before the checkpoint
+    statuses = record_fr_statuses(monkeypatch, completed={"fr-1"})
+    calls, committed = [], []
+    generator = make_generator(calls, committed)
+    state = nodes.dispatch_fr_groups(make_state(["fr-1"], run_id="run"))[0].arg
+
+    assert generator(state) == {"test_case_infos": {}}
+    assert asyncio.run(generator.acall(state)) == {"test_case_infos": {}}
+    assert calls == committed == statuses == []
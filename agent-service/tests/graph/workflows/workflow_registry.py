@@ -0,0 +1,57 @@
+# tests.graph.workflows.workflow_registry
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langgraph.graph import END
+from pydantic import BaseModel, Field
+
+from src.base.workflow.base_workflow import BaseWorkflow
+from src.graph.workflows import workflow_registry
+
+
+class CountState(BaseModel):
+    count: int = 0
+
+
+builds = []
+
+
+class CountWorkflow(BaseWorkflow):
+    agent_state: BaseModel = Field(default=CountState)
+
+    def _add_nodes(self):
+        builds.append(threading.get_ident())
+        self.workflow.add_node("count", lambda state: {"count": state.count + 1})
+
+    def _setup_edges(self):
+        self.workflow.set_entry_point("count")
+        self.workflow.add_edge("count", END)
+
+
+class BrokenWorkflow(CountWorkflow):
+    def _add_nodes(self):
+        raise RuntimeError("model download failed")
+
+
+def test_workflow_is_built_once_and_shared(monkeypatch):
+    monkeypatch.setattr(workflow_registry, "_workflows", {})
+    builds.clear()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        workflows = list(
+            executor.map(
+                lambda _: workflow_registry.get_workflow(CountWorkflow), range(8)
+            )
+        )
+
+    assert len(builds) == 1
+    assert all(workflow is workflows[0] for workflow in workflows)
+    assert workflows[0].invoke(CountState(count=1))["count"] == 2
+
+
+def test_preload_skips_workflows_that_fail_to_build(monkeypatch):
+    monkeypatch.setattr(workflow_registry, "_workflows", {})
+
+    workflow_registry.preload_workflows(BrokenWorkflow, CountWorkflow)
+
+    assert list(workflow_registry._workflows) == [CountWorkflow]
@@ -0,0 +1,56 @@
+# tests.services.job.job_handlers
+import asyncio
+from types import SimpleNamespace
+
+from src import repositories
+from src.services.job import job_handlers
+from src.services.job.job_handlers import JobContext
+
+
+def make_context(payload: dict) -> JobContext:
+    return JobContext(
+        SimpleNamespace(job_id="job", payload=payload, progress=0, node_timings={})
+    )
+
+
+def test_cancelled_load_test_ends_its_report_as_cancelled(monkeypatch):
+    finished = []
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "finish",
+        lambda **kwargs: finished.append(kwargs),
+    )
+    monkeypatch.setattr(
+        repositories.JobRepository, "update_progress", lambda **kwargs: None
+    )
+
+    def run_load_test(test_suite_report_id, stop_event, **kwargs):
+        stop_event.wait(5)
+        # As arun_load_test does once stopped
+        repositories.TestSuiteReportRepository.finish(
+            test_suite_report_id=test_suite_report_id
+        )
+
+    monkeypatch.setattr(job_handlers, "run_load_test", run_load_test)
+    context = make_context(
+        {
+            "test_suite_report_id": "report",
+            "test_suite_id": "suite",
+            "config": {"duration_seconds": 60},
+        }
+    )
+
+    async def main():
+        task = asyncio.create_task(job_handlers.run_load_test_job(context))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return task
+
+    task = asyncio.run(main())
+
+    assert task.cancelled()
+    assert finished == [
+        {"test_suite_report_id": "report"},
+        {"test_suite_report_id": "report", "status": "cancelled"},
+    ]
@@ -0,0 +1,321 @@
+# tests.services.job.job_worker
+import asyncio
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+
+from src import repositories
+from src.services.job import job_queue, job_worker
+from src.services.job.job_worker import JobWorker
+from src.services.test_case import execution_queue
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return call
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [
+            getattr(self.redis_client, name)(*args, **kwargs)
+            for name, args, kwargs in calls
+        ]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+        self._lock = threading.Lock()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    def zadd(self, key, mapping):
+        with self._lock:
+            self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zrange(self, key, start, end, withscores=False):
+        entries = sorted(
+            self.sorted_sets.get(key, {}).items(), key=lambda entry: entry[1]
+        )
+        entries = entries[start : end + 1]
+        return entries if withscores else [member for member, _ in entries]
+
+    def zrem(self, key, member):
+        with self._lock:
+            return int(self.sorted_sets.get(key, {}).pop(member, None) is not None)
+
+    def zscore(self, key, member):
+        return self.sorted_sets.get(key, {}).get(member)
+
+
+def use_fakes(monkeypatch) -> tuple[FakeRedis, dict]:
+    """Redis and the job table in memory, the status transitions stay real."""
+    redis_client, jobs = FakeRedis(), {}
+    lock = threading.Lock()
+
+    def create(self):
+        jobs[self.job_id] = self
+        return self
+
+    def set_status(job_id, from_statuses, session=None, **fields):
+        with lock:
+            job = jobs.get(job_id)
+            if job is None or job.status not in from_statuses:
+                return None
+            for key, value in fields.items():
+                setattr(job, key, value)
+            return job
+
+    def update_progress(job_id, progress, node_timings, session=None):
+        jobs[job_id].progress = progress
+        jobs[job_id].node_timings = dict(node_timings)
+
+    JobRepository = repositories.JobRepository
+    monkeypatch.setattr(JobRepository, "create", create)
+    monkeypatch.setattr(JobRepository, "_set_status", set_status)
+    monkeypatch.setattr(JobRepository, "update_progress", update_progress)
+    monkeypatch.setattr(
+        JobRepository, "get_by_id", lambda job_id, session=None: jobs.get(job_id)
+    )
+    monkeypatch.setattr(
+        JobRepository,
+        "get_all_by_status",
+        lambda status, session=None: [
+            job for job in jobs.values() if job.status == status
+        ],
+    )
+    monkeypatch.setattr(job_queue, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(job_worker, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(job_worker, "JOB_POLL_INTERVAL", 0.01)
+    # Strictly increasing enqueue times
+    clock = itertools.count(1_700_000_000)
+    monkeypatch.setattr(job_queue, "time", SimpleNamespace(time=lambda: next(clock)))
+    return redis_client, jobs
+
+
+async def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_pop_job_takes_highest_priority_then_oldest(monkeypatch):
+    redis_client, _ = use_fakes(monkeypatch)
+
+    old = job_queue.submit_job("test_execution", {})
+    new = job_queue.submit_job("test_generation", {})
+    urgent = job_queue.submit_job("load_test", {}, priority=5)
+    # Priorities are bounded so that scores keep their precision
+    most_urgent = job_queue.submit_job("load_test", {}, priority=99)
+    assert most_urgent.priority == 10
+
+    assert job_queue.pop_job(["test_execution", "test_generation"]) == old.job_id
+    assert job_queue.pop_job(["test_generation", "load_test"]) == most_urgent.job_id
+    assert job_queue.pop_job(["test_generation", "load_test"]) == urgent.job_id
+    assert job_queue.pop_job(["test_execution", "test_generation"]) == new.job_id
+    assert job_queue.pop_job(["test_generation", "load_test"]) is None
+    assert redis_client.sorted_sets["jobs:queue:load_test"] == {}
+
+
+def test_request_cancel_of_a_queued_job(monkeypatch):
+    redis_client, _ = use_fakes(monkeypatch)
+    job = job_queue.submit_job("test_execution", {})
+
+    assert job_queue.request_cancel(job.job_id).status == "cancelled"
+    assert job_queue.pop_job(["test_execution"]) is None
+    # A final job is left as it is
+    assert job_queue.request_cancel(job.job_id).status == "cancelled"
+    assert not redis_client.exists(job_queue.get_cancel_key(job.job_id))
+
+
+def test_requeue_orphaned_jobs_of_dead_workers(monkeypatch):
+    redis_client, _ = use_fakes(monkeypatch)
+    alive = job_queue.submit_job("test_execution", {})
+    dead = job_queue.submit_job("test_execution", {})
+    for job, worker_id in ((alive, "alive"), (dead, "dead")):
+        job_queue.pop_job(["test_execution"])
+        repositories.JobRepository.start(job_id=job.job_id, worker_id=worker_id)
+    redis_client.set(job_queue.get_heartbeat_key("alive"), 1)
+
+    assert job_queue.requeue_orphaned_jobs() == 1
+    assert (alive.status, dead.status) == ("running", "queued")
+    assert job_queue.pop_job(["test_execution"]) == dead.job_id
+
+
+def test_worker_runs_jobs_with_progress_and_timings(monkeypatch):
+    use_fakes(monkeypatch)
+
+    async def handler(context):
+        await context.aupdate(progress=50, node="step", seconds=0.5)
+        await context.aupdate(progress=20, node="step", seconds=0.25)
+        if context.payload.get("fail"):
+            raise ValueError("bad payload")
+        return {"answer": 42}
+
+    async def main():
+        worker = JobWorker(worker_id="w", handlers={"echo": handler})
+        job = job_queue.submit_job("echo", {}, result={"run_id": "r"})
+        failing = job_queue.submit_job("echo", {"fail": True})
+        run = asyncio.create_task(worker.run())
+
+        await wait_for(lambda: failing.status == "failed")
+        await wait_for(lambda: job.status == "completed")
+        worker.stop()
+        await run
+        return job, failing
+
+    job, failing = asyncio.run(main())
+
+    assert job.result == {"run_id": "r", "answer": 42}
+    assert job.progress == 100
+    assert job.node_timings == {
+        "step": {"runs": 2, "seconds": 0.75, "max_seconds": 0.5}
+    }
+    assert (failing.error, failing.progress) == ("bad payload", 50)
+    assert job.attempts == 1 and job.worker_id == "w"
+
+
+def test_worker_limits_job_types_and_cancels_running_jobs(monkeypatch):
+    use_fakes(monkeypatch)
+    running, peak = 0, 0
+
+    async def handler(context):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(0.05 if context.payload.get("quick") else 60)
+        finally:
+            running -= 1
+        return {}
+
+    async def main():
+        worker = JobWorker(
+            worker_id="w",
+            concurrency=4,
+            type_concurrency={"slow": 1},
+            handlers={"slow": handler},
+        )
+        jobs = [job_queue.submit_job("slow", {"quick": True}) for _ in range(2)]
+        stuck = job_queue.submit_job("slow", {}, priority=-1)
+        run = asyncio.create_task(worker.run())
+
+        await wait_for(lambda: stuck.status == "running")
+        job_queue.request_cancel(stuck.job_id)
+        await wait_for(lambda: stuck.status == "cancelled")
+        worker.stop()
+        await run
+        return jobs, stuck
+
+    jobs, stuck = asyncio.run(main())
+
+    assert peak == 1
+    assert all(job.status == "completed" for job in jobs)
+    # The lower priority job started last
+    assert stuck.started_at >= max(job.finished_at for job in jobs)
+    assert stuck.finished_at is not None and stuck.progress == 0
+
+
+def test_stopped_worker_requeues_its_running_jobs(monkeypatch):
+    redis_client, _ = use_fakes(monkeypatch)
+
+    async def handler(context):
+        await asyncio.sleep(60)
+
+    async def main():
+        worker = JobWorker(worker_id="w", handlers={"slow": handler})
+        job = job_queue.submit_job("slow", {})
+        run = asyncio.create_task(worker.run())
+
+        await wait_for(lambda: job.status == "running")
+        worker.stop()
+        await run
+        return job
+
+    job = asyncio.run(main())
+
+    assert (job.status, job.worker_id) == ("queued", None)
+    assert job_queue.pop_job(["slow"]) == job.job_id
+    assert not redis_client.exists(job_queue.get_heartbeat_key("w"))
+
+
+def test_stopped_worker_waits_for_job_threads(monkeypatch):
+    use_fakes(monkeypatch)
+    interrupted, threads_done = [], []
+
+    async def handler(context):
+        def _work():
+            context.cancelled.wait(5)
+            threads_done.append(context.job_id)
+
+        await context.run_in_thread(_work)
+
+    async def main():
+        worker = JobWorker(
+            worker_id="w",
+            handlers={"slow": handler, "once": handler},
+            interrupt_handlers={"once": interrupted.append},
+        )
+        slow = job_queue.submit_job("slow", {})
+        once = job_queue.submit_job("once", {})
+        run = asyncio.create_task(worker.run())
+
+        await wait_for(lambda: slow.status == once.status == "running")
+        worker.stop()
+        await run
+        return slow, once
+
+    slow, once = asyncio.run(main())
+
+    assert sorted(threads_done) == sorted([slow.job_id, once.job_id])
+    assert slow.status == "queued"
+    # Left to its interrupt handler
+    assert [job.job_id for job in interrupted] == [once.job_id]
+    assert job_queue.pop_job(["once"]) is None
+
+
+def test_requeue_orphaned_jobs_ends_jobs_that_cannot_run_again(monkeypatch):
+    use_fakes(monkeypatch)
+    job = job_queue.submit_job("load_test", {})
+    job_queue.pop_job(["load_test"])
+    repositories.JobRepository.start(job_id=job.job_id, worker_id="dead")
+
+    def fail(job):
+        repositories.JobRepository.finish(job_id=job.job_id, status="failed")
+
+    assert job_queue.requeue_orphaned_jobs(interrupt_handlers={"load_test": fail}) == 0
+    assert job.status == "failed"
+    assert job_queue.pop_job(["load_test"]) is None
+
+
+def test_request_cancel_of_a_running_execution_stops_its_shards(monkeypatch):
+    redis_client, _ = use_fakes(monkeypatch)
+    job = job_queue.submit_job("test_execution", {"test_suite_report_id": "report"})
+    job_queue.pop_job(["test_execution"])
+    repositories.JobRepository.start(job_id=job.job_id, worker_id="w")
+
+    assert job_queue.request_cancel(job.job_id).status == "running"
+    assert redis_client.exists(job_queue.get_cancel_key(job.job_id))
+    assert execution_queue.is_cancelled("report", redis_client)
@@ -0,0 +1,79 @@
+# tests.services.test_case.dependency_graph
+from src import repositories
+from src.services.test_case.dependency_graph import (
+    add_dependencies,
+    extract_variables,
+    group_dependent_test_cases,
+    substitute_variables,
+)
+
+
+def make_test_case(id, depends_on=None):
+    return repositories.TestCaseRepository(
+        id=id,
+        test_suite_id="suite",
+        test_case_type="basic_validation",
+        test_case_id=id,
+        test_case=id,
+        api_info={},
+        request_body={},
+        expected_output={},
+        depends_on=depends_on or [],
+    )
+
+
+def test_substitute_variables():
+    variables = {"token": "abc", "user_id": 7}
+
+    assert substitute_variables(
+        {
+            "Authorization": "Bearer {{token}}",
+            "id": "{{ user_id }}",
+            "items": ["{{user_id}}", "{{unknown}}"],
+            "count": 3,
+        },
+        variables,
+    ) == {
+        "Authorization": "Bearer abc",
+        "id": 7,
+        "items": [7, "{{unknown}}"],
+        "count": 3,
+    }
+    assert (
+        substitute_variables("http://api/users/{{user_id}}", variables)
+        == "http://api/users/7"
+    )
+
+
+def test_extract_variables():
+    variables, missing = extract_variables(
+        {
+            "token": "$.data.token",
+            "first_id": "items[0].id",
+            "request_id": "header:X-Request-Id",
+            "missing": "$.data.refresh_token",
+        },
+        {"data": {"token": "abc"}, "items": [{"id": 1}, {"id": 2}]},
+        {"x-request-id": "r-1"},
+    )
+
+    assert variables == {"token": "abc", "first_id": 1, "request_id": "r-1"}
+    assert missing == ["missing"]
+
+
+def test_add_dependencies_and_groups():
+    suite = [
+        make_test_case("login"),
+        make_test_case("create", ["login"]),
+        make_test_case("update", ["create"]),
+        make_test_case("health"),
+    ]
+
+    selected = add_dependencies([suite[2]], suite)
+    assert [test_case.id for test_case in selected] == ["login", "create", "update"]
+
+    groups = group_dependent_test_cases(suite)
+    assert [[test_case.id for test_case in group] for group in groups] == [
+        ["login", "create", "update"],
+        ["health"],
+    ]
@@ -0,0 +1,408 @@
+# tests.services.test_case.execute_test_case
+import asyncio
+import threading
+import uuid
+
+import httpx
+import pytest
+
+from src import repositories
+from src.services.test_case import execute_test_case as execute_test_case_module
+from src.services.test_case.execute_test_case import (
+    compile_test_case,
+    execute_test_case,
+)
+from src.services.test_case.http_client_pool import HostClientPool, get_host_key
+from src.services.test_case.request_timing import TimingAggregator
+from src.settings import get_now_vn
+
+
+def make_test_case(
+    method="POST", statuscode=200, request_body=None, response_mapping=None
+):
+    return repositories.TestCaseRepository(
+        test_suite_id="suite",
+        test_case_type="basic_validation",
+        test_case_id="1",
+        test_case="name with CHARS(5) should return statuscode 200",
+        api_info={
+            "url": "http://api.example.com/users",
+            "method": method,
+            "headers": {"X-Test": "1"},
+        },
+        request_body=request_body or {"name": "CHARS(5)", "age": "ABSENT"},
+        expected_output={
+            "statuscode": statuscode,
+            "response_mapping": response_mapping or {},
+        },
+    )
+
+
+def make_report(test_case_id, status):
+    return repositories.TestCaseReportRepository(
+        test_suite_report_id="report",
+        test_case_id=test_case_id,
+        request_header={},
+        request_body={},
+        response_header={},
+        response_body={},
+        response_status_code=200,
+        status=status,
+        start_time=get_now_vn(),
+        end_time=get_now_vn(),
+    )
+
+
+def test_get_host_key():
+    assert get_host_key("http://API.example.com/a?b=1") == "http://api.example.com"
+    assert get_host_key("https://example.com:8443/x") == "https://example.com:8443"
+
+
+def test_host_client_pool_reuses_client_per_host():
+    async def run():
+        async with HostClientPool() as pool:
+            first = pool.get_client("http://a.example.com/x")
+            assert pool.get_client("http://a.example.com/y") is first
+            assert pool.get_client("http://b.example.com/x") is not first
+
+    asyncio.run(run())
+
+
+def test_execute_test_case():
+    def handler(request: httpx.Request):
+        return httpx.Response(
+            201 if request.method == "POST" else 200, json={"id": 7, "name": "a"}
+        )
+
+    async def run(test_case):
+        async with HostClientPool(transport=httpx.MockTransport(handler)) as pool:
+            return await execute_test_case(test_case, "report", pool)
+
+    result = asyncio.run(run(make_test_case(statuscode=201)))
+    assert result.status == "passed"
+    assert result.response_status_code == 201
+    assert len(result.request_body["name"]) == 5
+    assert "age" not in result.request_body
+
+    result = asyncio.run(run(make_test_case(statuscode=400)))
+    assert result.status == "failed"
+
+    result = asyncio.run(
+        run(make_test_case(statuscode=201, response_mapping={"id": "TYPE(string)"}))
+    )
+    assert result.status == "failed"
+    assert result.assertion_results[0]["actual"] == [7]
+
+    result = asyncio.run(
+        run(make_test_case(statuscode=201, response_mapping={"id": "REGEX([)"}))
+    )
+    assert result.status.startswith("error: ")
+
+    result = asyncio.run(run(make_test_case(method="OPTIONS")))
+    assert result.status.startswith("error: ")
+    assert result.response_status_code == 0
+
+
+def test_execute_test_case_with_compiled_test_case():
+    test_case = make_test_case(statuscode=201, response_mapping={"id": "TYPE(integer)"})
+    compiled = compile_test_case(test_case)
+    assert len(compiled.assertions) == 1
+    # Reported as an error once executed
+    assert (
+        compile_test_case(make_test_case(response_mapping={"id": "REGEX([)"})) is None
+    )
+
+    async def run():
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(201, json={"id": 7})
+        )
+        async with HostClientPool(transport=transport) as pool:
+            return [
+                await execute_test_case(test_case, "report", pool, compiled=compiled)
+                for _ in range(3)
+            ]
+
+    results = asyncio.run(run())
+    assert [result.status for result in results] == ["passed"] * 3
+    assert len(results[0].request_body["name"]) == 5
+
+
+def test_aexecute_test_cases_follows_dependencies(monkeypatch):
+    reports = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository, "bulk_insert", reports.extend
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "increment_counters",
+        lambda **kwargs: None,
+    )
+
+    def handler(request: httpx.Request):
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"data": {"token": "abc"}})
+        if (
+            request.url.path == "/profile"
+            and request.headers.get("Authorization") != "Bearer abc"
+        ):
+            return httpx.Response(401, json={})
+        return httpx.Response(200, json={"id": 7})
+
+    monkeypatch.setattr(
+        execute_test_case_module,
+        "HostClientPool",
+        lambda: HostClientPool(transport=httpx.MockTransport(handler)),
+    )
+
+    def make_chained_test_case(id, path, depends_on=(), extract=None, headers=None):
+        test_case = make_test_case(statuscode=200)
+        test_case.id = id
+        test_case.api_info = {
+            "url": f"http://api.example.com{path}",
+            "method": "POST",
+            "headers": headers or {},
+        }
+        test_case.depends_on = list(depends_on)
+        test_case.extract = extract or {}
+        return test_case
+
+    test_cases = [
+        make_chained_test_case(
+            "profile",
+            "/profile",
+            depends_on=["login"],
+            headers={"Authorization": "Bearer {{token}}"},
+        ),
+        make_chained_test_case("login", "/login", extract={"token": "$.data.token"}),
+        make_chained_test_case("broken", "/broken", extract={"id": "$.missing"}),
+        make_chained_test_case("after_broken", "/x", depends_on=["broken"]),
+    ]
+
+    asyncio.run(
+        execute_test_case_module.aexecute_test_cases(
+            "report", test_cases, concurrency=4
+        )
+    )
+
+    statuses = {report.test_case_id: report.status for report in reports}
+    assert statuses["login"] == "passed"
+    assert statuses["profile"] == "passed"
+    assert statuses["broken"] == "error: could not extract id"
+    assert statuses["after_broken"].startswith("skipped: dependency broken")
+    order = [report.test_case_id for report in reports]
+    assert order.index("login") < order.index("profile")
+
+
+def test_aexecute_test_cases_restores_previous_reports(monkeypatch):
+    reports = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository, "bulk_insert", reports.extend
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "increment_counters",
+        lambda **kwargs: None,
+    )
+    sent = []
+
+    def handler(request: httpx.Request):
+        sent.append(request.url.path)
+        if request.headers.get("Authorization") != "Bearer abc":
+            return httpx.Response(401, json={})
+        return httpx.Response(200, json={"id": 7})
+
+    monkeypatch.setattr(
+        execute_test_case_module,
+        "HostClientPool",
+        lambda: HostClientPool(transport=httpx.MockTransport(handler)),
+    )
+
+    def make_chained_test_case(id, depends_on=(), extract=None):
+        test_case = make_test_case(statuscode=200)
+        test_case.id = id
+        test_case.api_info = {
+            "url": f"http://api.example.com/{id}",
+            "method": "POST",
+            "headers": {"Authorization": "Bearer {{token}}"},
+        }
+        test_case.depends_on = list(depends_on)
+        test_case.extract = extract or {}
+        return test_case
+
+    def make_previous_report(test_case_id, status, response_body):
+        report = make_report(test_case_id, status)
+        report.response_body = response_body
+        return report
+
+    test_cases = [
+        make_chained_test_case("login", extract={"token": "$.data.token"}),
+        make_chained_test_case("profile", depends_on=["login"]),
+        make_chained_test_case("signup", extract={"token": "$.token"}),
+        make_chained_test_case("welcome", depends_on=["signup"]),
+    ]
+    previous_reports = [
+        make_previous_report("login", "passed", {"data": {"token": "abc"}}),
+        make_previous_report("signup", "failed", {}),
+    ]
+
+    asyncio.run(
+        execute_test_case_module.aexecute_test_cases(
+            "report", test_cases, previous_reports=previous_reports
+        )
+    )
+
+    statuses = {report.test_case_id: report.status for report in reports}
+    assert sent == ["/profile"]
+    assert statuses["profile"] == "passed"
+    assert statuses["welcome"].startswith("skipped: dependency signup")
+    assert set(statuses) == {"profile", "welcome"}
+
+
+def test_resolve_seed(monkeypatch):
+    monkeypatch.setattr(execute_test_case_module, "EXECUTION_RANDOM_SEED", None)
+    assert execute_test_case_module.resolve_seed(7) == 7
+    assert isinstance(execute_test_case_module.resolve_seed(), int)
+
+    monkeypatch.setattr(execute_test_case_module, "EXECUTION_RANDOM_SEED", 42)
+    assert execute_test_case_module.resolve_seed() == 42
+    assert execute_test_case_module.resolve_seed(0) == 0
+
+
+def test_aexecute_test_suite_resumes_an_existing_report(monkeypatch):
+    test_suite_report = repositories.TestSuiteReportRepository(
+        id="report", test_suite_id="suite", seed=7, total_test_cases=3
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "get_by_id",
+        lambda test_suite_report_id: test_suite_report,
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "create",
+        lambda self: pytest.fail("the report exists"),
+    )
+    finished = []
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "finish",
+        lambda **kwargs: finished.append(kwargs),
+    )
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository,
+        "get_all_previous",
+        lambda test_suite_report_id: [make_report("a", "passed")],
+    )
+    test_cases = []
+    for id in ("a", "b", "c"):
+        test_case = make_test_case()
+        test_case.id = id
+        test_cases.append(test_case)
+    monkeypatch.setattr(
+        execute_test_case_module,
+        "select_test_cases",
+        lambda test_suite_id, parent_report_id: test_cases,
+    )
+    calls = []
+
+    async def aexecute_test_cases(**kwargs):
+        calls.append(kwargs)
+        return TimingAggregator()
+
+    monkeypatch.setattr(
+        execute_test_case_module, "aexecute_test_cases", aexecute_test_cases
+    )
+
+    asyncio.run(execute_test_case_module.aexecute_test_suite("report", "suite"))
+    assert calls[0]["seed"] == 7
+    assert [report.test_case_id for report in calls[0]["previous_reports"]] == ["a"]
+    assert [kwargs.get("status", "completed") for kwargs in finished] == ["completed"]
+
+    # Stopped, the report is left running for the next attempt
+    stop_event = threading.Event()
+    stop_event.set()
+    asyncio.run(
+        execute_test_case_module.aexecute_test_suite(
+            "report", "suite", stop_event=stop_event
+        )
+    )
+    assert len(finished) == 1
+
+
+def test_aexecute_test_cases_stops_on_stop_event(monkeypatch):
+    reports = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository, "bulk_insert", reports.extend
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "increment_counters",
+        lambda **kwargs: None,
+    )
+    stop_event = threading.Event()
+
+    def handler(request: httpx.Request):
+        stop_event.set()
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(
+        execute_test_case_module,
+        "HostClientPool",
+        lambda: HostClientPool(transport=httpx.MockTransport(handler)),
+    )
+    test_cases = []
+    for id in ("first", "second", "third"):
+        test_case = make_test_case(statuscode=200)
+        test_case.id = id
+        test_case.depends_on = [test_cases[-1].id] if test_cases else []
+        test_cases.append(test_case)
+
+    asyncio.run(
+        execute_test_case_module.aexecute_test_cases(
+            "report", test_cases, concurrency=4, stop_event=stop_event
+        )
+    )
+
+    assert [report.test_case_id for report in reports] == ["first"]
+
+
+def test_skipped_status_fits_its_column_with_uuid_dependencies(monkeypatch):
+    reports = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository, "bulk_insert", reports.extend
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "increment_counters",
+        lambda **kwargs: None,
+    )
+    monkeypatch.setattr(
+        execute_test_case_module,
+        "HostClientPool",
+        lambda: HostClientPool(
+            transport=httpx.MockTransport(lambda request: httpx.Response(500))
+        ),
+    )
+    prerequisites = []
+    for _ in range(3):
+        test_case = make_test_case(statuscode=200)
+        test_case.id = str(uuid.uuid4())
+        prerequisites.append(test_case)
+    dependent = make_test_case(statuscode=200)
+    dependent.id = str(uuid.uuid4())
+    dependent.depends_on = [test_case.id for test_case in prerequisites]
+
+    asyncio.run(
+        execute_test_case_module.aexecute_test_cases(
+            "report", [*prerequisites, dependent]
+        )
+    )
+
+    status = next(
+        report.status for report in reports if report.test_case_id == dependent.id
+    )
+    first = min(test_case.id for test_case in prerequisites)
+    assert status == f"skipped: dependency {first} and 2 more did not pass"
+    assert len(status) <= execute_test_case_module.STATUS_MAX_LENGTH
+    assert execute_test_case_module.clip_status("error: " + "x" * 200).endswith("...")
+    assert len(execute_test_case_module.clip_status("error: " + "x" * 200)) == 128
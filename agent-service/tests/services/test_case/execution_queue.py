@@ -0,0 +1,139 @@
+# tests.services.test_case.execution_queue
+from src import repositories
+from src.services.test_case import execution_queue
+from src.services.test_case.execution_queue import (
+    complete_shard,
+    enqueue_test_suite,
+    get_counters_key,
+    get_processing_key,
+    get_shard_key,
+    split_into_shards,
+)
+
+
+def test_split_into_shards():
+    groups = [[f"case-{i}"] for i in range(5)]
+
+    assert split_into_shards(groups, 2) == [
+        ["case-0", "case-1"],
+        ["case-2", "case-3"],
+        ["case-4"],
+    ]
+    assert split_into_shards(groups, 10) == [[f"case-{i}" for i in range(5)]]
+    assert split_into_shards([], 2) == []
+
+
+def test_split_into_shards_keeps_groups_together():
+    groups = [["login", "profile", "logout"], ["health"], ["a", "b"]]
+
+    assert split_into_shards(groups, 2) == [
+        ["login", "profile", "logout"],
+        ["health"],
+        ["a", "b"],
+    ]
+
+
+def test_processing_key_prefix_recovers_worker_id():
+    processing_key = get_processing_key("host-1-abc")
+
+    assert processing_key.removeprefix(get_processing_key("")) == "host-1-abc"
+
+
+def test_complete_shard_counts_a_shard_once(monkeypatch):
+    finished_reports = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository,
+        "get_timings_by_test_suite_report_id",
+        lambda test_suite_report_id: [],
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "finish",
+        lambda **kwargs: finished_reports.append(kwargs),
+    )
+
+    class FakeRedis:
+        def __init__(self, *results):
+            self.results = list(results)
+            self.calls = []
+
+        def eval(self, script, numkeys, *args):
+            self.calls.append((numkeys, args))
+            return self.results.pop(0)
+
+        def exists(self, key):
+            return 0
+
+    # The other copy of a requeued shard already counted it
+    redis_client = FakeRedis(None, [1, 0, 2], [2, 1, 2])
+    assert not complete_shard("report", 0, redis_client=redis_client)
+    assert redis_client.calls[0] == (
+        2,
+        (get_shard_key("report", 0), get_counters_key("report"), "completed"),
+    )
+    assert not complete_shard("report", 0, redis_client=redis_client)
+    assert finished_reports == []
+
+    assert complete_shard("report", 1, status="failed", redis_client=redis_client)
+    assert finished_reports[0]["status"] == "failed"
+
+
+def test_enqueue_test_suite_again_keeps_the_queued_shards(monkeypatch):
+    test_suite_report = repositories.TestSuiteReportRepository(
+        id="report", test_suite_id="suite", seed=7, total_test_cases=2
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "get_by_id",
+        lambda test_suite_report_id: test_suite_report,
+    )
+    monkeypatch.setattr(
+        execution_queue,
+        "select_test_cases",
+        lambda test_suite_id, parent_report_id: [],
+    )
+
+    class FakeRedis:
+        def hget(self, key, field):
+            assert (key, field) == (get_counters_key("report"), "total")
+            return b"3"
+
+        def pipeline(self):
+            raise AssertionError("the shards are queued already")
+
+    assert enqueue_test_suite("report", "suite", redis_client=FakeRedis()) == 3
+
+
+def test_last_shard_of_a_cancelled_report_finishes_it_as_cancelled(monkeypatch):
+    finished_reports = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository,
+        "get_timings_by_test_suite_report_id",
+        lambda test_suite_report_id: [],
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "finish",
+        lambda **kwargs: finished_reports.append(kwargs),
+    )
+
+    class FakeRedis:
+        def __init__(self):
+            self.values = {}
+
+        def set(self, key, value, ex=None):
+            self.values[key] = value
+
+        def exists(self, key):
+            return int(key in self.values)
+
+        def eval(self, script, numkeys, *args):
+            return [1, 0, 1]
+
+    redis_client = FakeRedis()
+    execution_queue.request_cancel("report", redis_client)
+    assert execution_queue.is_cancelled("report", redis_client)
+    assert not execution_queue.is_cancelled("other", redis_client)
+
+    assert complete_shard("report", 0, status="cancelled", redis_client=redis_client)
+    assert finished_reports[0]["status"] == "cancelled"
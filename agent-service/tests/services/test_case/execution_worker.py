@@ -0,0 +1,156 @@
+# tests.services.test_case.execution_worker
+import json
+
+import pytest
+
+from src import repositories
+from src.services.test_case import execution_queue, execution_worker
+from src.services.test_case.execution_worker import ExecutionWorker
+
+
+class FakeRedis:
+    def __init__(self, messages):
+        self.lists = {execution_queue.QUEUE_KEY: list(messages)}
+        self.values = {}
+        self.on_empty = None
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def blmove(self, src_key, dest_key, timeout, src, dest):
+        if not self.lists[src_key]:
+            self.on_empty()
+            return None
+        message = self.lists[src_key].pop()
+        self.lists.setdefault(dest_key, []).insert(0, message)
+        return message
+
+    def lrem(self, key, count, message):
+        self.lists[key].remove(message)
+
+    def rpush(self, key, message):
+        self.lists.setdefault(key, []).append(message)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_worker_drops_shards_it_cannot_process(monkeypatch):
+    shard = {"test_suite_report_id": "report", "shard_id": 3, "test_case_ids": []}
+    redis_client = FakeRedis([b"not json", json.dumps(shard).encode()])
+    monkeypatch.setattr(execution_worker, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(
+        execution_queue, "requeue_orphaned_shards", lambda redis_client: 0
+    )
+    completed = []
+    monkeypatch.setattr(
+        execution_queue,
+        "complete_shard",
+        lambda test_suite_report_id, shard_id, status, redis_client: completed.append(
+            (test_suite_report_id, shard_id, status)
+        ),
+    )
+
+    worker = ExecutionWorker(worker_id="w")
+    redis_client.on_empty = worker.stop
+
+    def process_shard(shard):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(worker, "process_shard", process_shard)
+    worker.run()
+
+    assert completed == [("report", 3, "failed")]
+    assert redis_client.lists[worker.processing_key] == []
+
+
+def test_stopped_worker_requeues_its_shard(monkeypatch):
+    shard = {"test_suite_report_id": "report", "shard_id": 0, "test_case_ids": ["a"]}
+    message = json.dumps(shard).encode()
+    redis_client = FakeRedis([message])
+    monkeypatch.setattr(execution_worker, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(
+        execution_queue, "requeue_orphaned_shards", lambda redis_client: 0
+    )
+    monkeypatch.setattr(
+        execution_queue, "update_shard_progress", lambda *args, **kwargs: None
+    )
+    monkeypatch.setattr(
+        execution_queue,
+        "complete_shard",
+        lambda *args, **kwargs: pytest.fail("the shard did not end"),
+    )
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository,
+        "get_all_by_test_case_ids",
+        lambda test_suite_report_id, test_case_ids: [],
+    )
+    monkeypatch.setattr(
+        repositories.TestCaseRepository, "get_all_by_ids", lambda test_case_ids: []
+    )
+    worker = ExecutionWorker(worker_id="w")
+
+    async def aexecute_test_cases(stop_event, **kwargs):
+        # SIGTERM in the middle of the shard
+        worker.stop()
+        assert stop_event.is_set()
+        # Still beating, no other worker takes the shard over
+        assert redis_client.values[worker.heartbeat_key] == 1
+
+    monkeypatch.setattr(execution_worker, "aexecute_test_cases", aexecute_test_cases)
+    worker.run()
+
+    assert redis_client.lists[execution_queue.QUEUE_KEY] == [message]
+    assert redis_client.lists[worker.processing_key] == []
+    assert worker.heartbeat_key not in redis_client.values
+
+
+def test_shards_of_a_cancelled_report_end_without_running(monkeypatch):
+    shard = {"test_suite_report_id": "report", "shard_id": 1, "test_case_ids": ["a"]}
+    redis_client = FakeRedis([json.dumps(shard).encode()])
+    execution_queue.request_cancel("report", redis_client)
+    monkeypatch.setattr(execution_worker, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(
+        execution_queue, "requeue_orphaned_shards", lambda redis_client: 0
+    )
+    monkeypatch.setattr(
+        execution_queue, "update_shard_progress", lambda *args, **kwargs: None
+    )
+    completed = []
+    monkeypatch.setattr(
+        execution_queue,
+        "complete_shard",
+        lambda test_suite_report_id, shard_id, status, redis_client: completed.append(
+            (test_suite_report_id, shard_id, status)
+        ),
+    )
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository,
+        "get_all_by_test_case_ids",
+        lambda test_suite_report_id, test_case_ids: [],
+    )
+    monkeypatch.setattr(
+        repositories.TestCaseRepository, "get_all_by_ids", lambda test_case_ids: []
+    )
+
+    async def aexecute_test_cases(**kwargs):
+        pytest.fail("the report was cancelled")
+
+    monkeypatch.setattr(execution_worker, "aexecute_test_cases", aexecute_test_cases)
+    worker = ExecutionWorker(worker_id="w")
+    redis_client.on_empty = worker.stop
+    worker.run()
+
+    assert completed == [("report", 1, "cancelled")]
+    # Not requeued
+    assert redis_client.lists[execution_queue.QUEUE_KEY] == []
+    assert redis_client.lists[worker.processing_key] == []
@@ -0,0 +1,186 @@
+# tests.services.test_case.load_test
+import asyncio
+
+import httpx
+
+from src import models, repositories
+from src.services.test_case import load_test
+from src.services.test_case.http_client_pool import HostClientPool
+from src.services.test_case.load_test import (
+    EndpointStats,
+    LoadTestRunner,
+    get_endpoint,
+    run_prerequisites,
+)
+
+
+def test_get_endpoint():
+    assert (
+        get_endpoint("GET", "https://api.example.com/users?id=1")
+        == "GET https://api.example.com/users"
+    )
+
+
+def test_endpoint_stats_to_report():
+    stats = EndpointStats()
+    for latency in [0.01, 0.02, 0.03, 0.04]:
+        stats.record(latency, is_error=latency > 0.03)
+
+    report = stats.to_report("report", "GET http://api.example.com/users", 2.0)
+    assert report.total_requests == 4
+    assert report.error_requests == 1
+    assert report.error_rate == 0.25
+    assert report.throughput_rps == 2.0
+    assert report.latency_max_ms == 40.0
+    assert round(report.latency_p50_ms, 6) == 25.0
+
+
+def test_load_test_runner():
+    test_case = repositories.TestCaseRepository(
+        test_suite_id="suite",
+        test_case_type="basic_validation",
+        test_case_id="1",
+        test_case="users should return statuscode 200",
+        api_info={
+            "url": "http://api.example.com/users",
+            "method": "GET",
+            "headers": {},
+        },
+        request_body={},
+        expected_output={"statuscode": 200},
+    )
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+    async def run(config):
+        async with HostClientPool(transport=transport) as pool:
+            runner = LoadTestRunner([test_case], config, pool)
+            duration = await runner.run()
+        return runner.stats["GET http://api.example.com/users"], duration
+
+    stats, duration = asyncio.run(
+        run(models.LoadTestConfigModel(duration_seconds=0.2, target_rps=50))
+    )
+    assert 8 <= len(stats.latencies) <= 10
+    assert stats.errors == 0
+    assert duration >= 0.2
+
+    stats, _ = asyncio.run(
+        run(models.LoadTestConfigModel(duration_seconds=0.1, concurrency=2))
+    )
+    assert len(stats.latencies) > 0
+
+
+def test_load_test_runs_prerequisites_once(monkeypatch):
+    def make_test_case(id, path, depends_on=(), extract=None, headers=None):
+        return repositories.TestCaseRepository(
+            id=id,
+            test_suite_id="suite",
+            test_case_type="basic_validation",
+            test_case_id=id,
+            test_case=id,
+            api_info={
+                "url": f"http://api.example.com{path}",
+                "method": "POST",
+                "headers": headers or {},
+            },
+            request_body={"user": "{{user_id}}"} if depends_on else {},
+            expected_output={"statuscode": 200},
+            depends_on=list(depends_on),
+            extract=extract or {},
+        )
+
+    login = make_test_case(
+        "login", "/login", extract={"token": "$.token", "user_id": "$.id"}
+    )
+    profile = make_test_case(
+        "profile",
+        "/users/{{user_id}}",
+        depends_on=["login"],
+        headers={"Authorization": "Bearer {{token}}"},
+    )
+    broken = make_test_case("broken", "/broken", extract={"token": "$.missing"})
+    orphan = make_test_case("orphan", "/orphan", depends_on=["broken"])
+    sent = []
+
+    def handler(request: httpx.Request):
+        sent.append((request.url.path, request.headers.get("Authorization")))
+        if request.url.path == "/login":
+            return httpx.Response(200, json={"token": "abc", "id": 7})
+        return httpx.Response(200, json={})
+
+    async def run():
+        async with HostClientPool(transport=httpx.MockTransport(handler)) as pool:
+            # Only the load-tested cases are selected, not their prerequisites
+            variables, excluded = await run_prerequisites(
+                "report", [profile, orphan], [login, profile, broken, orphan], pool
+            )
+            runner = LoadTestRunner(
+                [profile],
+                models.LoadTestConfigModel(duration_seconds=0.05, concurrency=1),
+                pool,
+                variables=variables,
+            )
+            return variables, excluded, runner
+
+    variables, excluded, runner = asyncio.run(run())
+
+    assert sent == [("/login", None), ("/broken", None)]
+    assert variables == {"profile": {"token": "abc", "user_id": 7}}
+    assert excluded == {"orphan": "dependency broken did not pass"}
+    target = runner.targets[0]
+    assert target.url == "http://api.example.com/users/7"
+    assert target.headers == {"Authorization": "Bearer abc"}
+    assert target.request_template.render() == {"user": 7}
+
+
+def test_load_test_runner_skips_test_cases_that_do_not_compile():
+    def make_test_case(path, response_mapping):
+        return repositories.TestCaseRepository(
+            test_suite_id="suite",
+            test_case_type="basic_validation",
+            test_case_id=path,
+            test_case=path,
+            api_info={"url": f"http://api.example.com/{path}", "method": "GET"},
+            request_body={},
+            expected_output={"statuscode": 200, "response_mapping": response_mapping},
+        )
+
+    test_cases = [
+        make_test_case("users", {"id": "TYPE(integer)"}),
+        make_test_case("broken", {"id": "REGEX([)"}),
+    ]
+    runner = LoadTestRunner(
+        test_cases, models.LoadTestConfigModel(duration_seconds=0.1), HostClientPool()
+    )
+
+    assert [target.endpoint for target in runner.targets] == [
+        "GET http://api.example.com/users"
+    ]
+
+
+def test_closed_load_test_stops_at_the_request_budget(monkeypatch):
+    monkeypatch.setattr(load_test, "MAX_LOAD_TEST_REQUESTS", 25)
+    test_case = repositories.TestCaseRepository(
+        test_suite_id="suite",
+        test_case_type="basic_validation",
+        test_case_id="1",
+        test_case="users should return statuscode 200",
+        api_info={"url": "http://api.example.com/users", "method": "GET"},
+        request_body={},
+        expected_output={"statuscode": 200},
+    )
+    transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+    async def run():
+        async with HostClientPool(transport=transport) as pool:
+            runner = LoadTestRunner(
+                [test_case],
+                models.LoadTestConfigModel(duration_seconds=60, concurrency=4),
+                pool,
+            )
+            return runner, await runner.run()
+
+    runner, duration = asyncio.run(run())
+    assert len(runner.stats["GET http://api.example.com/users"].latencies) == 25
+    # Measured, the budget ran out long before the configured window
+    assert duration < 60
@@ -0,0 +1,140 @@
+# tests.services.test_case.rate_limiter
+import asyncio
+import threading
+import time
+
+import httpx
+
+from src.services.test_case.execute_test_case import send_request
+from src.services.test_case.rate_limiter import (
+    AimdController,
+    HostRateLimiter,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("") is None
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.09 <= bucket.reserve() <= 0.1
+
+    unlimited = TokenBucket(rate=0)
+    assert all(unlimited.reserve() == 0 for _ in range(100))
+
+    unlimited.pause(5)
+    assert 4.9 <= unlimited.reserve() <= 5
+
+
+def test_aimd_controller():
+    controller = AimdController(initial_limit=4, max_limit=8, decrease_cooldown=0)
+    assert all(controller.try_acquire() for _ in range(4))
+    assert not controller.try_acquire()
+    controller.release()
+    assert controller.in_flight == 3
+
+    controller.on_overload()
+    assert controller.limit == 2
+    controller.on_overload()
+    controller.on_overload()
+    assert controller.limit == 1
+
+    for _ in range(20):
+        controller.on_success(latency=0.1)
+    assert controller.limit > 1
+
+    limit = controller.limit
+    for _ in range(20):
+        controller.on_success(latency=1.0)
+    assert controller.limit == limit
+
+
+def test_aimd_controller_decrease_cooldown():
+    controller = AimdController(initial_limit=16, decrease_cooldown=60)
+    controller.on_overload()
+    controller.on_overload()
+    assert controller.limit == 8
+
+
+def test_send_request_retries_overloaded_host():
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503),
+            httpx.Response(200),
+        ]
+    )
+
+    async def run():
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: next(responses))
+        )
+        limiter = HostRateLimiter(host_key="http://api.example.com", rate=0)
+        async with client:
+            response, timings = await send_request(
+                client, limiter, "GET", "http://api.example.com/users"
+            )
+        return response, timings, limiter
+
+    response, timings, limiter = asyncio.run(run())
+    assert response.status_code == 200
+    assert timings["attempts"] == 3
+    assert timings["wait_ms"] > 0
+    assert limiter.concurrency.in_flight == 0
+    assert limiter.concurrency.limit < limiter.concurrency.max_limit
+
+
+def test_aimd_controller_wakes_waiters_in_order():
+    controller = AimdController(initial_limit=1)
+    order = []
+
+    async def request(name: str):
+        await controller.acquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        controller.release()
+
+    async def run():
+        await controller.acquire()
+        tasks = [asyncio.create_task(request(name)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        # A newcomer does not jump the queue
+        assert not controller.try_acquire()
+        cancelled = asyncio.create_task(request("cancelled"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        controller.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["a", "b", "c"]
+    assert controller.in_flight == 0
+
+
+def test_aimd_controller_wakes_waiters_of_other_event_loops():
+    controller = AimdController(initial_limit=1)
+    assert controller.try_acquire()
+
+    async def wait_for_slot():
+        await asyncio.wait_for(controller.acquire(), timeout=5)
+        controller.release()
+
+    waiter = threading.Thread(target=asyncio.run, args=(wait_for_slot(),))
+    waiter.start()
+    while not controller._waiters:
+        time.sleep(0.001)
+    controller.release()
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert controller.in_flight == 0
@@ -0,0 +1,39 @@
+# tests.services.test_case.report_delta
+from src.services.test_case.report_delta import compare_statuses
+
+
+def test_compare_statuses():
+    previous_statuses = {
+        "case-1": "failed",
+        "case-2": "error: ConnectError",
+        "case-3": "failed",
+        "case-4": "passed",
+        "case-5": "failed",
+        "case-6": "failed",
+    }
+    current_statuses = {
+        "case-1": "passed",
+        "case-2": "failed",
+        "case-3": "passed",
+        "case-4": "failed",
+        "case-6": "skipped: prerequisite case-2 did not pass",
+    }
+
+    delta = compare_statuses(previous_statuses, current_statuses)
+
+    assert delta["summary"] == {
+        "fixed": 2,
+        "still_failing": 1,
+        "regressed": 1,
+        "skipped": 1,
+        "pending": 1,
+    }
+    assert [entry["test_case_id"] for entry in delta["fixed"]] == ["case-1", "case-3"]
+    assert delta["still_failing"][0] == {
+        "test_case_id": "case-2",
+        "previous_status": "error: ConnectError",
+        "current_status": "failed",
+    }
+    assert delta["regressed"][0]["test_case_id"] == "case-4"
+    assert delta["skipped"][0]["test_case_id"] == "case-6"
+    assert delta["pending"] == ["case-5"]
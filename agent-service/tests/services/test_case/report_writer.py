@@ -0,0 +1,57 @@
+# tests.services.test_case.report_writer
+import asyncio
+
+from src import repositories
+from src.services.test_case.report_writer import ReportBatchWriter
+from src.settings import get_now_vn
+
+
+def make_report(status):
+    return repositories.TestCaseReportRepository(
+        test_suite_report_id="report",
+        test_case_id="case",
+        request_header={},
+        request_body={},
+        response_header={},
+        response_body={},
+        response_status_code=200,
+        status=status,
+        start_time=get_now_vn(),
+        end_time=get_now_vn(),
+    )
+
+
+def test_report_batch_writer_flushes_in_batches(monkeypatch):
+    batches = []
+    counters = []
+    monkeypatch.setattr(
+        repositories.TestCaseReportRepository,
+        "bulk_insert",
+        lambda reports: batches.append(len(reports)),
+    )
+    monkeypatch.setattr(
+        repositories.TestSuiteReportRepository,
+        "increment_counters",
+        lambda **kwargs: counters.append(kwargs),
+    )
+
+    async def run():
+        writer = ReportBatchWriter(test_suite_report_id="report", batch_size=2)
+        for status in [
+            "passed",
+            "failed",
+            "error: timeout",
+            "passed",
+            "passed",
+            "skipped: prerequisite login did not pass",
+        ]:
+            await writer.add(make_report(status))
+        assert batches == [2, 2, 2]
+        await writer.flush()
+
+    asyncio.run(run())
+    assert batches == [2, 2, 2]
+    assert sum(counter["passed"] for counter in counters) == 3
+    assert sum(counter["failed"] for counter in counters) == 1
+    assert sum(counter["errored"] for counter in counters) == 1
+    assert sum(counter["skipped"] for counter in counters) == 1
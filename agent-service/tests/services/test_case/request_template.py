@@ -0,0 +1,63 @@
+# tests.services.test_case.request_template
+import re
+
+from src.services.test_case.request_template import RequestTemplate, make_rng
+
+
+def test_request_template_replaces_values_and_drops_absent():
+    template = RequestTemplate(
+        {
+            "name": "CHARS(8)",
+            "phone": "NUMS(10)",
+            "code": "ALPHANUMS(6)",
+            "email": "EMAIL(20)",
+            "nickname": "ABSENT",
+            "note": "N/A",
+            "parent": "NULL",
+            "tags": ["a", "ABSENT", "NUMS(3)"],
+            "address": {"city": "Hanoi", "zip": "NUMS(5)"},
+        }
+    )
+
+    body = template.render()
+
+    assert re.fullmatch(r"[A-Za-z]{8}", body["name"])
+    assert re.fullmatch(r"\d{10}", body["phone"])
+    assert re.fullmatch(r"[A-Za-z0-9]{6}", body["code"])
+    assert re.fullmatch(r"[a-z0-9]{10}@[a-z]{5}\.com", body["email"])
+    assert "nickname" not in body
+    assert body["note"] == ""
+    assert body["parent"] is None
+    assert body["tags"][0] == "a" and re.fullmatch(r"\d{3}", body["tags"][1])
+    assert body["address"]["city"] == "Hanoi"
+    assert re.fullmatch(r"\d{5}", body["address"]["zip"])
+
+
+def test_request_template_renders_fresh_copies():
+    template = RequestTemplate({"static": {"a": 1}, "nested": {"id": "NUMS(12)"}})
+
+    first, second = template.render(), template.render()
+
+    assert first["nested"] is not second["nested"]
+    assert first["nested"]["id"] != second["nested"]["id"]
+    # Containers without placeholders are shared, not copied
+    assert first["static"] is second["static"]
+
+
+def test_request_template_is_reproducible_with_seed():
+    template = RequestTemplate({"id": "ALPHANUMS(16)", "items": ["CHARS(4)"]})
+
+    first = template.render(make_rng(42, salt="case-1"))
+    second = template.render(make_rng(42, salt="case-1"))
+    other = template.render(make_rng(42, salt="case-2"))
+
+    assert first == second
+    assert first != other
+
+
+def test_request_template_without_placeholders_and_scalars():
+    body = {"a": [1, 2], "b": "text"}
+
+    assert RequestTemplate(body).render() == body
+    assert re.fullmatch(r"\d{4}", RequestTemplate("NUMS(4)").render())
+    assert RequestTemplate(None).render() is None
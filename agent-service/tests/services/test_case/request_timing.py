@@ -0,0 +1,43 @@
+# tests.services.test_case.request_timing
+import asyncio
+
+from src.services.test_case.request_timing import RequestTiming, TimingAggregator
+
+
+def test_request_timing_phases():
+    timing = RequestTiming()
+    events = [
+        ("connection.connect_tcp.started", 1.000),
+        ("connection.connect_tcp.complete", 1.010),
+        ("http11.send_request_headers.started", 1.010),
+        ("http11.send_request_body.complete", 1.011),
+        ("http11.receive_response_headers.complete", 1.111),
+        ("http11.receive_response_body.complete", 1.121),
+    ]
+    asyncio.run(timing("http11.send_request_headers.started", {}))
+    assert "send_request_headers.started" in timing._events
+
+    timing._events = {name.split(".", 1)[1]: at for name, at in events}
+    timing.started_at, timing.ended_at = 0.999, 1.122
+
+    phases = {key: round(value, 3) for key, value in timing.to_dict().items()}
+    assert phases == {
+        "connect_ms": 10.0,
+        "tls_ms": 0.0,
+        "send_ms": 1.0,
+        "ttfb_ms": 100.0,
+        "download_ms": 10.0,
+        "total_ms": 123.0,
+    }
+
+
+def test_timing_aggregator():
+    aggregator = TimingAggregator()
+    for total in [10.0, 20.0, 30.0]:
+        aggregator.add({"total_ms": total, "ttfb_ms": total / 2})
+    aggregator.add({})
+
+    summary = aggregator.summary()
+    assert summary["total_ms"] == {"mean": 20.0, "p50": 20.0, "p95": 29.0, "max": 30.0}
+    assert summary["ttfb_ms"]["max"] == 15.0
+    assert "connect_ms" not in summary
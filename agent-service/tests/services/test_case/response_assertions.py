@@ -0,0 +1,92 @@
+# tests.services.test_case.response_assertions
+import pytest
+
+from src.services.test_case.response_assertions import (
+    MISSING,
+    WILDCARD,
+    CompiledAssertions,
+    compile_matcher,
+    compile_path,
+    resolve_path,
+)
+
+RESPONSE = {
+    "code": "E_INVALID_AMOUNT",
+    "data": {
+        "id": 42,
+        "email": "user@example.com",
+        "items": [{"price": 10.5}, {"price": 99}],
+        "deleted_at": None,
+    },
+}
+
+
+def test_compile_path():
+    assert compile_path("code") == ("code",)
+    assert compile_path("$.data.items[0].price") == ("data", "items", 0, "price")
+    assert compile_path("data.items[*].price") == ("data", "items", WILDCARD, "price")
+    with pytest.raises(ValueError):
+        compile_path("data..[")
+
+
+def test_resolve_path():
+    assert resolve_path(RESPONSE, compile_path("data.id")) == [42]
+    assert resolve_path(RESPONSE, compile_path("data.items[-1].price")) == [99]
+    assert resolve_path(RESPONSE, compile_path("data.items[*].price")) == [10.5, 99]
+    assert resolve_path(RESPONSE, compile_path("data.missing")) == [MISSING]
+    assert resolve_path(RESPONSE, compile_path("data.items[5]")) == [MISSING]
+
+
+def test_compile_matcher():
+    assert compile_matcher("E_INVALID_AMOUNT")("E_INVALID_AMOUNT")
+    assert compile_matcher("42")(42)
+    assert compile_matcher(42)("42")
+    assert not compile_matcher(True)("True")
+    assert compile_matcher("TYPE(integer)")(42)
+    assert not compile_matcher("TYPE(integer)")(True)
+    assert compile_matcher("TYPE(number)")(10.5)
+    assert compile_matcher("REGEX(^[^@]+@example\\.com$)")("user@example.com")
+    assert not compile_matcher("REGEX(^\\d+$)")(123)
+    assert compile_matcher("RANGE(0,100)")(99)
+    assert compile_matcher("RANGE(,0)")(-5)
+    assert not compile_matcher("RANGE(0,)")(-5)
+    assert compile_matcher("<some_value>")("anything")
+    assert not compile_matcher("ANY")(MISSING)
+    assert compile_matcher("ABSENT")(MISSING)
+    assert compile_matcher("NULL")(None)
+    assert compile_matcher("N/A")("")
+    with pytest.raises(ValueError):
+        compile_matcher("TYPE(date)")
+
+
+def test_compiled_assertions():
+    assertions = CompiledAssertions(
+        {
+            "code": "E_INVALID_AMOUNT",
+            "data": {"id": "TYPE(integer)", "deleted_at": "NULL"},
+            "data.items[*].price": "RANGE(0,100)",
+            "error": "ABSENT",
+        }
+    )
+    assert len(assertions) == 5
+    assert assertions.matches(RESPONSE)
+    passed, results = assertions.evaluate(RESPONSE)
+    assert passed
+    assert [result["path"] for result in results] == [
+        "code",
+        "data.id",
+        "data.deleted_at",
+        "data.items[*].price",
+        "error",
+    ]
+
+    assertions = CompiledAssertions({"data.items[*].price": "RANGE(0,50)"})
+    assert not assertions.matches(RESPONSE)
+    passed, results = assertions.evaluate(RESPONSE)
+    assert not passed
+    assert results[0]["actual"] == [10.5, 99]
+
+    passed, results = CompiledAssertions({"token": "ANY"}).evaluate({})
+    assert results[0]["actual"] == ["ABSENT"]
+
+    assert CompiledAssertions({}).evaluate(RESPONSE) == (True, [])
@@ -0,0 +1,136 @@
+# tests.common.api_key_pool
+import asyncio
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from src.common.api_key_pool import (
+    ApiKeyPool,
+    acall_with_key,
+    call_with_key,
+    get_retry_after,
+    is_rate_limited,
+)
+
+
+def test_pool_spreads_requests_round_robin():
+    pool = ApiKeyPool(["key-a", "key-b", "key-c"])
+
+    leases = [pool.reserve() for _ in range(6)]
+
+    assert [lease.key for lease in leases] == ["key-a", "key-b", "key-c"] * 2
+    assert all(lease.wait == 0 for lease in leases)
+
+
+def test_pool_prefers_keys_with_fewer_requests_in_flight():
+    pool = ApiKeyPool(["key-a", "key-b"])
+
+    first = pool.reserve()
+    second = pool.reserve()
+    pool.release(first)
+
+    assert pool.reserve().key == first.key
+    assert second.key != first.key
+
+
+def test_pool_waits_when_every_key_is_at_its_rpm():
+    pool = ApiKeyPool(["key-a", "key-b"], rpm=1)
+
+    assert pool.reserve().wait == 0
+    assert pool.reserve().wait == 0
+    assert pool.reserve().wait == pytest.approx(60, abs=1)
+
+
+def test_pool_counts_tokens_against_tpm():
+    pool = ApiKeyPool(["key-a", "key-b"], tpm=100)
+
+    lease = pool.reserve(tokens=10)
+    # The estimate is replaced by the actual usage once the request ends
+    pool.release(lease, tokens=90)
+
+    next_lease = pool.reserve(tokens=20)
+    assert next_lease.key == "key-b"
+    assert next_lease.wait == 0
+    # key-a has 10 tokens left, key-b 80
+    assert pool.reserve(tokens=50).key == "key-b"
+    assert pool.reserve(tokens=50).wait == pytest.approx(60, abs=1)
+
+    snapshot = pool.snapshot()["keys"]
+    assert snapshot[1]["tokens_last_minute"] == 70
+    # Only ended requests count towards the totals
+    assert [key["tokens"] for key in snapshot] == [90, 0]
+
+
+def test_rate_limited_key_rests_while_others_take_over():
+    pool = ApiKeyPool(["key-a", "key-b"], cooldown=30)
+    calls = []
+
+    def call(key):
+        calls.append(key)
+        if key == "key-a":
+            raise ResourceExhausted("quota exceeded")
+        return f"answer with {key}"
+
+    assert call_with_key(pool, call) == "answer with key-b"
+    assert call_with_key(pool, call) == "answer with key-b"
+    assert calls == ["key-a", "key-b", "key-b"]
+
+    key_a = pool.snapshot()["keys"][0]
+    assert key_a["rate_limited"] == 1
+    assert key_a["cooldown_seconds"] == pytest.approx(30, abs=1)
+    assert key_a["in_flight"] == 0
+
+
+def test_call_with_key_raises_once_every_key_is_rate_limited():
+    pool = ApiKeyPool(["key-a", "key-b"])
+
+    def call(key):
+        # Wrapped the way the embeddings client reports errors
+        try:
+            raise ResourceExhausted("quota exceeded, retry_delay { seconds: 12 }")
+        except ResourceExhausted as e:
+            raise RuntimeError("Error embedding content") from e
+
+    with pytest.raises(RuntimeError):
+        call_with_key(pool, call)
+
+    cooldowns = [key["cooldown_seconds"] for key in pool.snapshot()["keys"]]
+    assert cooldowns == [pytest.approx(12, abs=1)] * 2
+
+
+def test_call_with_key_does_not_retry_other_errors():
+    pool = ApiKeyPool(["key-a", "key-b"])
+    calls = []
+
+    def call(key):
+        calls.append(key)
+        raise ValueError("invalid argument")
+
+    with pytest.raises(ValueError):
+        call_with_key(pool, call)
+    assert calls == ["key-a"]
+
+
+def test_acall_with_key_counts_actual_tokens():
+    pool = ApiKeyPool(["key-a"], tpm=1000)
+
+    async def call(key):
+        await asyncio.sleep(0)
+        return {"total_tokens": 300}
+
+    result = asyncio.run(
+        acall_with_key(
+            pool, call, tokens=10, count_tokens=lambda result: result["total_tokens"]
+        )
+    )
+
+    assert result == {"total_tokens": 300}
+    assert pool.snapshot()["keys"][0]["tokens_last_minute"] == 300
+
+
+def test_rate_limit_detection():
+    assert is_rate_limited(ResourceExhausted("quota"))
+    assert is_rate_limited(RuntimeError("429 RESOURCE_EXHAUSTED"))
+    assert not is_rate_limited(ValueError("invalid"))
+    assert get_retry_after(RuntimeError('"retryDelay": "34s"')) == 34
+    assert get_retry_after(RuntimeError("quota")) is None
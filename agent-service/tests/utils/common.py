@@ -2,6 +2,7 @@
 from src.common.common import (
     get_percent_space,
     merge_chunks,
+    percentile,
     split_by_size,
 )
 
@@ -23,3 +24,13 @@ def test_merge_chunks():
 def test_get_percent_space():
     assert get_percent_space("This is a test.") <= 35
     assert get_percent_space("t h i s i s a s p l i t t e x t") >= 35
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 100) == 100
+    assert round(percentile(values, 99), 2) == 99.01
+    assert percentile([], 99) == 0.0
+    assert percentile([7.0], 90) == 7.0
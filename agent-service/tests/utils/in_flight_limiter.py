@@ -0,0 +1,62 @@
+# tests.common.in_flight_limiter
+import asyncio
+import threading
+import time
+
+from src.common.in_flight_limiter import InFlightLimiter
+
+
+def test_limiter_caps_threads_and_coroutines_together():
+    limiter = InFlightLimiter(2)
+    peak, current = [0], [0]
+    lock = threading.Lock()
+
+    def track(delta):
+        with lock:
+            current[0] += delta
+            peak[0] = max(peak[0], current[0])
+
+    def sync_call():
+        with limiter:
+            track(1)
+            time.sleep(0.02)
+            track(-1)
+
+    async def async_call():
+        async with limiter:
+            track(1)
+            await asyncio.sleep(0.02)
+            track(-1)
+
+    async def run_coroutines():
+        await asyncio.gather(*(async_call() for _ in range(4)))
+
+    threads = [threading.Thread(target=sync_call) for _ in range(4)]
+    threads.append(threading.Thread(target=lambda: asyncio.run(run_coroutines())))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = limiter.snapshot()
+    assert peak[0] == 2
+    assert snapshot["max_in_flight"] == 2
+    assert snapshot["acquired"] == 8
+    assert snapshot["in_flight"] == 0 and snapshot["waiting"] == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    limiter = InFlightLimiter(1)
+
+    async def run():
+        await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release()
+        await asyncio.wait_for(limiter.aacquire(), timeout=1)
+        limiter.release()
+
+    asyncio.run(run())
+    assert limiter.snapshot()["in_flight"] == 0
@@ -0,0 +1,94 @@
+# tests.common.pool_metrics
+import os
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.common.pool_metrics import (
+    MeteredBlockingConnectionPool,
+    MeteredQueuePool,
+    get_engine_pool_status,
+    get_redis_pool_status,
+    instrument_engine,
+)
+
+
+def test_metered_queue_pool_records_checkouts_and_timeouts():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_engine(engine)
+
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    status = get_engine_pool_status(engine)
+    assert status["checkouts"] == 3
+    assert status["connects"] == 1
+    assert status["checked_out"] == 0
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    status = get_engine_pool_status(engine)
+    assert status["timeouts"] == 1
+    assert status["wait_max_ms"] >= 50
+
+    # Metrics survive the pool being recreated
+    engine.dispose()
+    assert get_engine_pool_status(engine)["timeouts"] == 1
+
+
+def test_clients_are_shared():
+    from src.settings import get_db_engine, get_redis_client
+
+    assert get_db_engine() is get_db_engine()
+    assert get_redis_client() is get_redis_client()
+
+
+class FakeRedisConnection:
+    def __init__(self, **kwargs):
+        self.pid = os.getpid()
+
+    def connect(self):
+        pass
+
+    def can_read(self):
+        return False
+
+    def disconnect(self):
+        pass
+
+    def should_reconnect(self):
+        return False
+
+
+def test_metered_redis_pool_reuses_connections():
+    pool = MeteredBlockingConnectionPool(
+        connection_class=FakeRedisConnection, max_connections=1, timeout=0.05
+    )
+
+    for _ in range(3):
+        pool.release(pool.get_connection())
+
+    status = get_redis_pool_status(pool)
+    assert status["created"] == 1
+    assert status["in_use"] == 0
+    assert status["checkouts"] == 3
+    assert status["connects"] == 1
+
+    connection = pool.get_connection()
+    assert get_redis_pool_status(pool)["in_use"] == 1
+    with pytest.raises(RedisConnectionError):
+        pool.get_connection()
+    pool.release(connection)
+
+    assert get_redis_pool_status(pool)["timeouts"] == 1